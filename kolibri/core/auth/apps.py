@@ -9,6 +9,7 @@ class KolibriAuthConfig(AppConfig):
     def ready(self):
         from .signals import cascade_delete_membership  # noqa: F401
         from .signals import cascade_delete_user  # noqa: F401
+        from .signals import clear_role_cache  # noqa: F401
 
         from kolibri.core.auth.sync_event_hook_utils import (
             pre_sync_transfer_handler,
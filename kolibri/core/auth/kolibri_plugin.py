@@ -4,6 +4,7 @@ from morango.sync.operations import LocalOperation
 
 from kolibri.core.auth.hooks import FacilityDataSyncHook
 from kolibri.core.auth.models import FacilityUser
+from kolibri.core.auth.models import role_cache
 from kolibri.core.auth.sync_operations import KolibriSingleUserSyncOperation
 from kolibri.core.auth.sync_operations import KolibriSyncOperationMixin
 from kolibri.core.auth.tasks import cleanupsync
@@ -62,3 +63,18 @@ class CleanUpTaskOperation(KolibriSyncOperationMixin, LocalOperation):
 class AuthSyncHook(FacilityDataSyncHook):
     serializing_operations = [SingleFacilityUserChangeClearingOperation()]
     cleanup_operations = [CleanUpTaskOperation()]
+
+    def post_transfer(
+        self,
+        dataset_id,
+        local_is_single_user,
+        remote_is_single_user,
+        single_user_id,
+        context,
+    ):
+        """
+        Clears any cached roles and memberships once we have received data,
+        as roles and memberships may have been changed by the sync.
+        """
+        if context.is_receiver:
+            role_cache.clear()
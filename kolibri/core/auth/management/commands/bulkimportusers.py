@@ -5,7 +5,6 @@ import re
 from uuid import UUID
 
 from django.conf import settings
-from django.contrib.auth.hashers import make_password
 from django.core.exceptions import ValidationError
 from django.core.management.base import CommandError
 from django.utils import translation
@@ -20,6 +19,9 @@ from kolibri.core.auth.models import Classroom
 from kolibri.core.auth.models import Facility
 from kolibri.core.auth.models import FacilityUser
 from kolibri.core.auth.models import Membership
+from kolibri.core.auth.models import Role
+from kolibri.core.auth.utils.bulk import bulk_upsert
+from kolibri.core.auth.utils.passwords import make_passwords
 from kolibri.core.tasks.management.commands.base import AsyncCommand
 from kolibri.core.tasks.utils import get_current_job
 from kolibri.core.utils.csv import open_csv_for_reading
@@ -506,13 +508,7 @@ class Command(AsyncCommand):
 
         return has_header
 
-    def get_field_values(self, user_row):
-        password = user_row.get(self.header_translation["PASSWORD"], None)
-        if password != "*":
-            password = make_password(password)
-        else:
-            password = None
-
+    def get_field_values(self, user_row, password):
         gender = user_row.get(self.header_translation["GENDER"], "").strip().upper()
         gender = "" if gender == DEFERRED else gender
         birth_year = (
@@ -562,12 +558,23 @@ class Command(AsyncCommand):
             .values_list("id", flat=True)
         )
 
+        # hash all the passwords concurrently, before the users are created,
+        # except those set to "*", which keep the password of an existing user:
+        raw_passwords = {
+            user: user_row.get(self.header_translation["PASSWORD"], None)
+            for user, user_row in users.items()
+        }
+        to_hash = [user for user in users if raw_passwords[user] != "*"]
+        hashed_passwords = dict(
+            zip(to_hash, make_passwords(raw_passwords[user] for user in to_hash))
+        )
+
         # creating the users takes half of the time
         progress = (100 / self.number_lines) * 0.5
         for user in users:
             self.progress_update(progress)
             user_row = users[user]
-            values = self.get_field_values(user_row)
+            values = self.get_field_values(user_row, hashed_passwords.get(user))
             if values["uuid"] in existing_users:
                 user_obj = FacilityUser.objects.get(
                     id=values["uuid"], facility=self.default_facility
@@ -697,7 +704,6 @@ class Command(AsyncCommand):
                         classes[1][real_name] = classes[1].pop(classroom)
             else:
                 class_obj = Classroom(name=classroom, parent=self.default_facility)
-                class_obj.id = class_obj.calculate_uuid()
                 new_classes.append(class_obj)
         self.progress_update(1)
         return (new_classes, update_classes, classes)
@@ -765,29 +771,88 @@ class Command(AsyncCommand):
         assigned = classes[1]
         classes = {k.name: k for k in db_classes}
 
+        memberships = []
         for classroom in enrolled:
             db_class = classes[classroom]
             for username in enrolled[classroom]:
                 # db validation might have rejected a csv validated user:
                 if username in users:
                     user = self.get_user(username, users)
-                    if not user.is_member_of(db_class):
-                        db_class.add_member(user)
+                    memberships.append(Membership(user=user, collection=db_class))
+        existing_memberships = set(
+            Membership.objects.filter(
+                collection__in=[m.collection for m in memberships]
+            ).values_list("user_id", "collection_id")
+        )
+        bulk_upsert(
+            Membership,
+            [
+                m
+                for m in memberships
+                if (m.user_id, m.collection_id) not in existing_memberships
+            ],
+        )
+
+        coach_roles = []
         for classroom in assigned:
             db_class = classes[classroom]
             for username in assigned[classroom]:
                 # db validation might have rejected a csv validated user:
                 if username in users:
                     user = self.get_user(username, users)
-                    db_class.add_coach(user)
+                    coach_roles.append(
+                        Role(user=user, collection=db_class, kind=role_kinds.COACH)
+                    )
+        existing_coach_roles = set(
+            Role.objects.filter(
+                collection__in=[r.collection for r in coach_roles],
+                kind=role_kinds.COACH,
+            ).values_list("user_id", "collection_id")
+        )
+        coach_roles = [
+            r
+            for r in coach_roles
+            if (r.user_id, r.collection_id) not in existing_coach_roles
+        ]
+        # As when saving a classroom coach role, coaches without a role for the
+        # facility are given the assignable coach role for it:
+        users_with_facility_role = set(
+            Role.objects.filter(
+                collection=self.default_facility,
+                user_id__in=[r.user_id for r in coach_roles],
+            ).values_list("user_id", flat=True)
+        )
+        assignable_coach_roles = {
+            r.user_id: Role(
+                user=r.user,
+                collection=self.default_facility,
+                kind=role_kinds.ASSIGNABLE_COACH,
+            )
+            for r in coach_roles
+            if r.user_id not in users_with_facility_role
+        }
+        bulk_upsert(Role, list(assignable_coach_roles.values()) + coach_roles)
 
     def add_roles(self, users, roles):
+        facility_roles = []
         for role in roles.keys():
             for username in roles[role]:
                 # db validation might have rejected a csv validated user:
                 if username in users:
                     user = self.get_user(username, users)
-                    self.default_facility.add_role(user, role)
+                    facility_roles.append(
+                        Role(user=user, collection=self.default_facility, kind=role)
+                    )
+        existing_roles = set(
+            Role.objects.filter(
+                collection=self.default_facility,
+                user_id__in=[r.user_id for r in facility_roles],
+            ).values_list("user_id", "kind")
+        )
+        bulk_upsert(
+            Role,
+            [r for r in facility_roles if (r.user_id, r.kind) not in existing_roles],
+        )
 
     def exit_if_error(self):
         if self.overall_error:
@@ -918,23 +983,13 @@ class Command(AsyncCommand):
                 # clear users from classes not included in the csv:
                 Membership.objects.filter(collection__in=classes_to_clear).delete()
 
-                # bulk_create and bulk_update are not possible with current Morango:
                 db_users = db_new_users + db_update_users
-                for user in db_users:
-                    user.save()
+                bulk_upsert(FacilityUser, db_users)
                 # assign roles to users:
                 users_data = {u.username: u for u in db_users}
                 self.add_roles(users_data, roles)
 
-                db_created_classes = []
-                for classroom in db_new_classes:
-                    created_class = Classroom.objects.create(
-                        name=classroom.name, parent=classroom.parent
-                    )
-
-                    db_created_classes.append(created_class)
-                # hack to get ids created by Morango:
-                db_new_classes = db_created_classes
+                bulk_upsert(Classroom, db_new_classes)
 
                 self.add_classes_memberships(
                     classes, users_data, db_new_classes + db_update_classes
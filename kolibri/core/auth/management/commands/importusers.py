@@ -15,6 +15,7 @@ from kolibri.core.auth.csv_utils import transform_inputs
 from kolibri.core.auth.models import Classroom
 from kolibri.core.auth.models import Facility
 from kolibri.core.auth.models import FacilityUser
+from kolibri.core.auth.utils.passwords import make_passwords
 from kolibri.core.utils.csv import open_csv_for_reading
 
 logger = logging.getLogger(__name__)
@@ -95,7 +96,36 @@ def get_facility(user, default_facility):
         )
 
 
-def create_user(user, default_facility=None):
+def create_facility_user(full_name, username, facility, password, password_hash):
+    if not password_hash:
+        return FacilityUser.objects.create_user(
+            full_name=full_name,
+            username=username,
+            facility=facility,
+            password=password,
+        )
+    # As in FacilityUser.objects.create_user, but with the password already hashed
+    if FacilityUser.objects.filter(
+        username__iexact=username, facility=facility
+    ).exists():
+        raise ValidationError("An account with that username already exists")
+    new_user = FacilityUser(
+        full_name=full_name,
+        username=username,
+        facility=facility,
+        password=password_hash,
+    )
+    new_user.full_clean()
+    new_user.save()
+    return new_user
+
+
+def create_user(user, default_facility=None, password_hash=None):
+    """
+    Create or update a user from a row of the CSV file.
+    password_hash is the hash of the password of the row, or of the default password
+    if the row has none, if it has already been made.
+    """
     validate_username(user)
     facility = get_facility(user, default_facility)
     classroom = infer_and_create_class(user.get("class", None), facility)
@@ -104,7 +134,10 @@ def create_user(user, default_facility=None):
     try:
         user_obj = FacilityUser.objects.get(username=username, facility=facility)
         if password:
-            user_obj.set_password(password)
+            if password_hash:
+                user_obj.password = password_hash
+            else:
+                user_obj.set_password(password)
             user_obj.save()
         update_user_demographics(user, user_obj)
 
@@ -122,11 +155,8 @@ def create_user(user, default_facility=None):
         password = user.get("password", DEFAULT_PASSWORD) or DEFAULT_PASSWORD
         full_name = user.get("full_name", "") or username
         try:
-            new_user = FacilityUser.objects.create_user(
-                full_name=full_name,
-                username=username,
-                facility=facility,
-                password=password,
+            new_user = create_facility_user(
+                full_name, username, facility, password, password_hash
             )
 
             update_user_demographics(user, new_user)
@@ -150,6 +180,30 @@ def create_user(user, default_facility=None):
             return False
 
 
+def make_user_password_hashes(users):
+    """
+    Hash the passwords that create_user will set for users concurrently, before the
+    users are created, returning None for the users whose password will not be set.
+    """
+    existing_usernames = set(
+        FacilityUser.objects.filter(
+            username__in=[user.get("username") for user in users]
+        ).values_list("username", flat=True)
+    )
+    # Existing users only have their password set if the CSV file includes it,
+    # while new users are given the default password otherwise.
+    passwords = [
+        user.get("password")
+        or (None if user.get("username") in existing_usernames else DEFAULT_PASSWORD)
+        for user in users
+    ]
+    to_hash = [i for i, password in enumerate(passwords) if password]
+    password_hashes = [None] * len(users)
+    for i, password_hash in zip(to_hash, make_passwords(passwords[i] for i in to_hash)):
+        password_hashes[i] = password_hash
+    return password_hashes
+
+
 class Command(BaseCommand):
     help = """
     Imports a user list from CSV file and creates
@@ -219,10 +273,16 @@ class Command(BaseCommand):
                 reader = csv.DictReader(f, strict=True)
             else:
                 reader = csv.DictReader(f, fieldnames=input_fields, strict=True)
+            users = [map_input(row) for row in reader]
+            password_hashes = make_user_password_hashes(users)
             with transaction.atomic():
                 total = 0
-                for row in reader:
+                for user, password_hash in zip(users, password_hashes):
                     total += int(
-                        create_user(map_input(row), default_facility=default_facility)
+                        create_user(
+                            user,
+                            default_facility=default_facility,
+                            password_hash=password_hash,
+                        )
                     )
                 logger.info("{total} users created".format(total=total))
@@ -10,6 +10,8 @@ from django.db.models.signals import post_delete
 from django.db.models.signals import post_save
 from django.utils.functional import SimpleLazyObject
 
+from kolibri.core.auth.models import role_cache
+
 
 def get_anonymous_user_model():
     """
@@ -95,6 +97,20 @@ class CustomAuthenticationMiddleware(AuthenticationMiddleware):
         request.user = SimpleLazyObject(lambda: _get_user(request))
 
 
+class RoleCacheMiddleware(object):
+    """
+    Caches the roles and memberships of users for the duration of each request,
+    so that the permission checks made while handling it can share them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with role_cache:
+            return self.get_response(request)
+
+
 class XhrPreventLoginPromptMiddleware(object):
     """
     By default, HTTP 401 responses are sent with a ``WWW-Authenticate``
@@ -141,6 +141,66 @@ class DatasetCache(local):
 dataset_cache = DatasetCache()
 
 
+class RoleCache(local):
+    """
+    While active, caches the roles and memberships of users, so that the permission checks
+    made while handling a request only need to query them once for each user.
+    """
+
+    def __init__(self):
+        self.deactivate()
+
+    def __enter__(self):
+        self.activate()
+
+    def activate(self):
+        self._active = True
+
+    def __exit__(self, type, value, traceback):
+        self.deactivate()
+
+    def deactivate(self):
+        self._active = False
+        self.clear()
+
+    def clear(self):
+        self._roles = {}
+        self._memberships = {}
+
+    def get_roles(self, user_id):
+        """
+        Returns a list of (collection_id, kind) tuples for the roles of the user,
+        or None if the cache is not active.
+        """
+        if not self._active:
+            return None
+        if user_id not in self._roles:
+            self._roles[user_id] = list(
+                Role.objects.filter(user_id=user_id)
+                .values_list("collection_id", "kind")
+                .order_by()
+            )
+        return self._roles[user_id]
+
+    def get_memberships(self, user_id):
+        """
+        Returns a set of the ids of the collections that the user is a member of,
+        or None if the cache is not active.
+        """
+        if not self._active:
+            return None
+        if user_id not in self._memberships:
+            self._memberships[user_id] = set(
+                Membership.objects.filter(user_id=user_id)
+                .values_list("collection_id", flat=True)
+                .order_by()
+            )
+        return self._memberships[user_id]
+
+
+role_cache = RoleCache()
+
+
 def _has_permissions_class(obj):
     return hasattr(obj, "permissions") and isinstance(obj.permissions, BasePermissions)
 
@@ -921,6 +981,9 @@ class FacilityUser(AbstractBaseUser, KolibriBaseUserMixin, AbstractFacilityDataM
             return False
         if coll.kind == collection_kinds.FACILITY:
             return self.facility_id == coll.id
+        memberships = role_cache.get_memberships(self.id)
+        if memberships is not None:
+            return coll.id in memberships
         return Membership.objects.filter(user=self, collection=coll).exists()
 
     def has_role_for_user(self, kinds, user):
@@ -932,6 +995,16 @@ class FacilityUser(AbstractBaseUser, KolibriBaseUserMixin, AbstractFacilityDataM
             return False
         if not hasattr(user, "dataset_id") or self.dataset_id != user.dataset_id:
             return False
+        roles = role_cache.get_roles(self.id)
+        if roles is not None:
+            collection_ids = {
+                collection_id for collection_id, kind in roles if kind in kinds
+            }
+            if not collection_ids:
+                return False
+            if user.facility_id in collection_ids:
+                return True
+            return not collection_ids.isdisjoint(role_cache.get_memberships(user.id))
         return Role.objects.filter(
             Q(user=self, collection_id=user.facility_id, kind__in=kinds)
             | Q(
@@ -958,6 +1031,12 @@ class FacilityUser(AbstractBaseUser, KolibriBaseUserMixin, AbstractFacilityDataM
             or coll.kind == collection_kinds.ADHOCLEARNERSGROUP
         ):
             coll_id = coll.parent_id
+        roles = role_cache.get_roles(self.id)
+        if roles is not None:
+            return any(
+                kind in kinds and collection_id in (self.facility_id, coll_id)
+                for collection_id, kind in roles
+            )
         return Role.objects.filter(
             Q(user=self, collection_id=self.facility_id, kind__in=kinds)
             | Q(user=self, collection_id=coll_id, kind__in=kinds)
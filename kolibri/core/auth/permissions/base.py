@@ -178,15 +178,24 @@ class RoleBasedPermissions(BasePermissions):
 
     def readable_by_user_filter(self, user):
         from kolibri.core.auth.models import Role
+        from kolibri.core.auth.models import role_cache
 
         if user.is_anonymous:
             return q_none
 
-        roles = list(
-            Role.objects.filter(user=user.id, kind__in=self.can_be_read_by)
-            .values("collection_id", "kind")
-            .order_by()
-        )
+        cached_roles = role_cache.get_roles(user.id)
+        if cached_roles is not None:
+            roles = [
+                {"collection_id": collection_id, "kind": kind}
+                for collection_id, kind in cached_roles
+                if kind in self.can_be_read_by
+            ]
+        else:
+            roles = list(
+                Role.objects.filter(user=user.id, kind__in=self.can_be_read_by)
+                .values("collection_id", "kind")
+                .order_by()
+            )
         # If the user has any of the can_be_read_by roles at the facility level, then we know they can read
         # anything in the facility.
         if any(r["collection_id"] == user.facility_id for r in roles):
@@ -1,8 +1,12 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
 from django.db.models.signals import pre_delete
 from django.dispatch import receiver
 
 from .models import FacilityUser
 from .models import Membership
+from .models import Role
+from .models import role_cache
 from kolibri.core.notifications.models import LearnerProgressNotification
 
 
@@ -24,3 +28,15 @@ def cascade_delete_user(sender, instance=None, *args, **kwargs):
     objects whose user is the instance's user.
     """
     LearnerProgressNotification.objects.filter(user_id=instance.id).delete()
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def clear_role_cache(sender, instance=None, *args, **kwargs):
+    """
+    When any role or membership changes, clear the roles and memberships
+    that have been cached for the current request.
+    """
+    role_cache.clear()
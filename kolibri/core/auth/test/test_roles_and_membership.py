@@ -10,6 +10,8 @@ from ..models import FacilityUser
 from ..models import KolibriAnonymousUser
 from ..models import LearnerGroup
 from ..models import Membership
+from ..models import role_cache
+from ..permissions.base import RoleBasedPermissions
 from .helpers import create_dummy_facility_data
 from .helpers import create_superuser
 
@@ -228,3 +230,67 @@ class AnonymousUserRolesTestCase(TestCase):
                         [role_kinds.ADMIN, role_kinds.COACH], self.anon_user
                     )
                 )
+
+
+class RoleCacheMixin(object):
+    def setUp(self):
+        super(RoleCacheMixin, self).setUp()
+        role_cache.activate()
+        self.addCleanup(role_cache.deactivate)
+
+
+class CachedRolesWithinFacilityTestCase(RoleCacheMixin, RolesWithinFacilityTestCase):
+    pass
+
+
+class CachedMembershipWithinFacilityTestCase(
+    RoleCacheMixin, MembershipWithinFacilityTestCase
+):
+    pass
+
+
+class RoleCacheTestCase(RoleCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = create_dummy_facility_data()
+
+    def test_roles_queried_once_per_user(self):
+        coach0 = self.data["classroom_coaches"][0]
+        classroom0, classroom1 = self.data["classrooms"]
+        # Fetch the device permissions of the coach up front
+        coach0.is_superuser
+        with self.assertNumQueries(1):
+            self.assertTrue(coach0.has_role_for(role_kinds.COACH, classroom0))
+            self.assertFalse(coach0.has_role_for(role_kinds.COACH, classroom1))
+            self.assertTrue(
+                coach0.has_role_for(role_kinds.ASSIGNABLE_COACH, self.data["facility"])
+            )
+            RoleBasedPermissions(
+                target_field="collection",
+                can_be_created_by=(),
+                can_be_read_by=(role_kinds.COACH,),
+                can_be_updated_by=(),
+                can_be_deleted_by=(),
+            ).readable_by_user_filter(coach0)
+        learner0 = self.data["learners_one_group"][0][0]
+        with self.assertNumQueries(1):
+            self.assertTrue(coach0.has_role_for(role_kinds.COACH, learner0))
+            self.assertTrue(coach0.has_role_for(role_kinds.COACH, learner0))
+
+    def test_role_changes_clear_cache(self):
+        coach0 = self.data["classroom_coaches"][0]
+        classroom1 = self.data["classrooms"][1]
+        self.assertFalse(coach0.has_role_for(role_kinds.COACH, classroom1))
+        classroom1.add_coach(coach0)
+        self.assertTrue(coach0.has_role_for(role_kinds.COACH, classroom1))
+        classroom1.remove_coach(coach0)
+        self.assertFalse(coach0.has_role_for(role_kinds.COACH, classroom1))
+
+    def test_membership_changes_clear_cache(self):
+        learner = self.data["unattached_users"][0]
+        classroom0 = self.data["classrooms"][0]
+        self.assertFalse(learner.is_member_of(classroom0))
+        classroom0.add_member(learner)
+        self.assertTrue(learner.is_member_of(classroom0))
+        classroom0.remove_member(learner)
+        self.assertFalse(learner.is_member_of(classroom0))
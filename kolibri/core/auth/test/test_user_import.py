@@ -2,13 +2,16 @@ import csv
 import os
 import tempfile
 
+from django.contrib.auth.hashers import check_password
 from django.core.management import call_command
 from django.core.management.base import CommandError
 from django.test import TestCase
 
 from ..csv_utils import infer_facility
 from ..management.commands.importusers import create_user
+from ..management.commands.importusers import DEFAULT_PASSWORD
 from ..management.commands.importusers import infer_and_create_class
+from ..management.commands.importusers import make_user_password_hashes
 from ..management.commands.importusers import validate_username
 from ..models import Classroom
 from ..models import FacilityUser
@@ -94,6 +97,17 @@ class UserImportTestCase(TestCase):
             self.superuser.is_member_of(Classroom.objects.get(name="testclass"))
         )
 
+    def test_make_user_password_hashes_only_hashes_set_passwords(self):
+        users = [
+            {"username": self.superuser.username},
+            {"username": self.superuser.username, "password": "newpassword"},
+            {"username": "testuser"},
+        ]
+        password_hashes = make_user_password_hashes(users)
+        self.assertIsNone(password_hashes[0])
+        self.assertTrue(check_password("newpassword", password_hashes[1]))
+        self.assertTrue(check_password(DEFAULT_PASSWORD, password_hashes[2]))
+
     def test_create_user_not_exist(self):
         user = {"username": "testuser"}
         self.assertTrue(create_user(user, default_facility=self.facility))
@@ -1,9 +1,12 @@
 import datetime
 import random
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 
 import factory
 import mock
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.hashers import is_password_usable
 from django.core.management.base import CommandError
 from django.test import TestCase
 from morango.registry import syncable_models
@@ -17,14 +20,17 @@ from kolibri.core.auth.models import AdHocGroup
 from kolibri.core.auth.models import Classroom
 from kolibri.core.auth.models import FacilityUser
 from kolibri.core.auth.models import LearnerGroup
+from kolibri.core.auth.models import Membership
 from kolibri.core.auth.sync_event_hook_utils import _local_event_handler
 from kolibri.core.auth.test.test_api import ClassroomFactory
 from kolibri.core.auth.test.test_api import FacilityFactory
 from kolibri.core.auth.test.test_api import FacilityUserFactory
 from kolibri.core.auth.test.test_api import LearnerGroupFactory
+from kolibri.core.auth.utils.bulk import bulk_upsert
 from kolibri.core.auth.utils.delete import get_delete_group_for_facility
 from kolibri.core.auth.utils.migrate import fork_facility
 from kolibri.core.auth.utils.migrate import merge_users
+from kolibri.core.auth.utils.passwords import make_passwords
 from kolibri.core.logger import models as log_models
 
 
@@ -715,3 +721,93 @@ class TestLocalEventHandler(TestCase):
         context = CompositeSessionContext([network_context1, network_context2])
         _local_event_handler(self.method)(context)
         self.mock_method.assert_not_called()
+
+
+class BulkUpsertTestCase(TestCase):
+    def setUp(self):
+        self.facility = FacilityFactory.create()
+        self.classroom = ClassroomFactory.create(parent=self.facility)
+
+    def test_create_users(self):
+        users = [
+            FacilityUser(username="user{}".format(i), facility=self.facility)
+            for i in range(3)
+        ]
+        created, updated = bulk_upsert(FacilityUser, users)
+        self.assertEqual(created, users)
+        self.assertEqual(updated, [])
+        for user in FacilityUser.objects.filter(username__startswith="user"):
+            self.assertEqual(user.dataset_id, self.facility.dataset_id)
+            self.assertEqual(
+                user._morango_partition,
+                "{}:user-ro:{}".format(self.facility.dataset_id, user.id),
+            )
+            self.assertEqual(
+                user.id,
+                user.compute_namespaced_id(
+                    user.calculate_partition(),
+                    user._morango_source_id,
+                    user.morango_model_name,
+                ),
+            )
+            self.assertTrue(user._morango_dirty_bit)
+
+    def test_update_users(self):
+        user = FacilityUserFactory.create(facility=self.facility)
+        FacilityUser.objects.filter(id=user.id).update(update_dirty_bit_to=False)
+        user = FacilityUser.objects.get(id=user.id)
+        user.full_name = "Updated Name"
+        created, updated = bulk_upsert(FacilityUser, [user])
+        self.assertEqual(created, [])
+        self.assertEqual(updated, [user])
+        user = FacilityUser.objects.get(id=user.id)
+        self.assertEqual(user.full_name, "Updated Name")
+        self.assertTrue(user._morango_dirty_bit)
+
+    def test_memberships_have_saved_ids(self):
+        user = FacilityUserFactory.create(facility=self.facility)
+        membership = Membership.objects.create(user=user, collection=self.classroom)
+        created, updated = bulk_upsert(
+            Membership, [Membership(user=user, collection=self.classroom)]
+        )
+        self.assertEqual(created, [])
+        self.assertEqual([m.id for m in updated], [membership.id])
+        self.assertEqual(updated[0]._morango_partition, membership._morango_partition)
+        self.assertEqual(Membership.objects.filter(user=user).count(), 1)
+
+    def test_repeated_memberships_created_once(self):
+        user = FacilityUserFactory.create(facility=self.facility)
+        created, updated = bulk_upsert(
+            Membership,
+            [
+                Membership(user=user, collection=self.classroom),
+                Membership(user=user, collection=self.classroom),
+            ],
+        )
+        self.assertEqual(len(created), 1)
+        self.assertEqual(Membership.objects.filter(user=user).count(), 1)
+
+
+class MakePasswordsTestCase(TestCase):
+    def _assert_hashes(self, passwords, hashes):
+        self.assertEqual(len(hashes), len(passwords))
+        for password, password_hash in zip(passwords, hashes):
+            if password is None:
+                self.assertFalse(is_password_usable(password_hash))
+            else:
+                self.assertTrue(check_password(password, password_hash))
+
+    def test_make_passwords(self):
+        passwords = ["password{}".format(i) for i in range(5)] + [None, "password"]
+        self._assert_hashes(passwords, make_passwords(passwords))
+
+    def test_make_passwords_salted(self):
+        hashes = make_passwords(["password", "password"])
+        self.assertNotEqual(hashes[0], hashes[1])
+
+    def test_make_passwords_process_pool(self):
+        passwords = ["password{}".format(i) for i in range(3)]
+        with mock.patch(
+            "kolibri.core.auth.utils.passwords.PoolExecutor", ProcessPoolExecutor
+        ):
+            self._assert_hashes(passwords, make_passwords(passwords))
@@ -0,0 +1,87 @@
+"""
+Create and update many facility data models at a time, such as the users, classrooms,
+memberships and roles written by a bulk import of users.
+
+Models are written with bulk queries rather than saved one at a time, so the fields that
+saving a syncable model would otherwise set (its dataset, and the Morango id, partition
+and dirty bit) are calculated here for each batch, before it is written.
+"""
+from django.db import connections
+from django.db import transaction
+from django.db.models.signals import post_save
+from morango.sync.backends.utils import calculate_max_sqlite_variables
+
+from kolibri.core.auth.models import dataset_cache
+
+
+def _get_batch_size(Model):
+    if connections[Model.objects.db].vendor == "sqlite":
+        return min(calculate_max_sqlite_variables() // len(Model._meta.fields), 500)
+    return 750
+
+
+def prepare_for_bulk_save(obj):
+    """
+    Set the dataset, id, partition and dirty bit of a facility data model, as they are
+    set when it is saved, so that it can be written with a bulk query.
+    """
+    obj.pre_save()
+    if not obj.id:
+        obj.id = obj.calculate_uuid()
+    else:
+        obj._morango_partition = obj.calculate_partition().replace(
+            obj.ID_PLACEHOLDER, obj.id
+        )
+    obj._morango_dirty_bit = True
+
+
+def bulk_upsert(Model, objs, update_fields=None):
+    """
+    Create or update objs, which are instances of the facility data model Model, in
+    batches, and return a tuple of the lists of created and updated objs.
+    Objs whose id is already in the database have update_fields, or all of their fields if
+    update_fields is None, updated, and all other objs are created.
+    As with other bulk queries, the checks made by the save method of Model are not made,
+    so objs must already be valid, but post_save is sent for each obj once it is written.
+    """
+    if update_fields is None:
+        update_fields = [
+            f.name for f in Model._meta.concrete_fields if not f.primary_key
+        ]
+    elif "_morango_dirty_bit" not in update_fields:
+        update_fields = list(update_fields) + ["_morango_dirty_bit"]
+    batch_size = _get_batch_size(Model)
+    created = []
+    updated = []
+    objs = list(objs)
+    with transaction.atomic(), dataset_cache:
+        for i in range(0, len(objs), batch_size):
+            # Models with the same id, such as repeated memberships, are only written once
+            batch = {}
+            for obj in objs[i : i + batch_size]:
+                prepare_for_bulk_save(obj)
+                batch[obj.id] = obj
+            existing_ids = set(
+                Model._base_manager.filter(id__in=batch.keys()).values_list(
+                    "id", flat=True
+                )
+            )
+            to_create = [obj for obj in batch.values() if obj.id not in existing_ids]
+            to_update = [obj for obj in batch.values() if obj.id in existing_ids]
+            Model.objects.bulk_create(to_create)
+            Model.objects.bulk_update(to_update, update_fields)
+            created.extend(to_create)
+            updated.extend(to_update)
+    using = Model.objects.db
+    for obj in created:
+        post_save.send(sender=Model, instance=obj, created=True, raw=False, using=using)
+    for obj in updated:
+        post_save.send(
+            sender=Model,
+            instance=obj,
+            created=False,
+            raw=False,
+            using=using,
+            update_fields=update_fields,
+        )
+    return created, updated
@@ -0,0 +1,49 @@
+"""
+Hash the passwords of many users at a time, such as those of users imported from a CSV file.
+
+Hashing a password is deliberately slow, so when many users are written at once, hashing
+their passwords one after another takes most of the time. Instead, the passwords are hashed
+concurrently by a pool of workers, one for each CPU, before the users are written.
+"""
+import os
+from itertools import repeat
+
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.hashers import make_password
+
+from kolibri.utils.multiprocessing_compat import PoolExecutor
+
+
+def _encode_password(hasher, password, salt):
+    return hasher.encode(password, salt)
+
+
+def make_passwords(passwords):
+    """
+    Return the hashes of a list of raw passwords, in the same order, as returned by make_password.
+    Passwords that are None are given unusable password hashes.
+    """
+    passwords = list(passwords)
+    to_hash = [i for i, password in enumerate(passwords) if password is not None]
+    hashes = [
+        make_password(None) if password is None else None for password in passwords
+    ]
+    if len(to_hash) < 2:
+        for i in to_hash:
+            hashes[i] = make_password(passwords[i])
+        return hashes
+    hasher = get_hasher()
+    max_workers = min(os.cpu_count() or 1, len(to_hash))
+    # When multiprocessing is not used, the workers are threads, which still hash
+    # concurrently, as the PBKDF2 implementation in hashlib releases the GIL.
+    with PoolExecutor(max_workers=max_workers) as executor:
+        encoded = executor.map(
+            _encode_password,
+            repeat(hasher),
+            [passwords[i] for i in to_hash],
+            [hasher.salt() for _ in to_hash],
+            chunksize=max(1, len(to_hash) // (max_workers * 4)),
+        )
+        for i, password_hash in zip(to_hash, encoded):
+            hashes[i] = password_hash
+    return hashes
@@ -4,10 +4,10 @@ import re
 from base64 import urlsafe_b64decode
 from collections import OrderedDict
 from functools import reduce
-from random import sample
 from uuid import UUID
 
 from django.core.cache import cache
+from django.core.cache import caches
 from django.core.exceptions import ValidationError
 from django.db.models import Exists
 from django.db.models import OuterRef
@@ -77,6 +77,11 @@ from kolibri.core.content.utils.importability_annotation import (
 from kolibri.core.content.utils.paths import get_channel_lookup_url
 from kolibri.core.content.utils.paths import get_local_content_storage_file_url
 from kolibri.core.content.utils.search import get_available_metadata_labels
+from kolibri.core.content.utils.search_index import build_search_query
+from kolibri.core.content.utils.search_index import filter_by_search_index
+from kolibri.core.content.utils.search_index import search_index_filter
+from kolibri.core.content.utils.search_index import search_index_ready
+from kolibri.core.content.utils.search_index import search_query_is_complete
 from kolibri.core.content.utils.stopwords import stopwords_set
 from kolibri.core.decorators import query_params_required
 from kolibri.core.device.models import ContentCacheKey
@@ -90,6 +95,7 @@ from kolibri.core.lessons.models import Lesson
 from kolibri.core.logger.models import ContentSessionLog
 from kolibri.core.logger.models import ContentSummaryLog
 from kolibri.core.logger.models import MasteryLog
+from kolibri.core.logger.utils.popularity import get_popular_content_ids
 from kolibri.core.query import SQSum
 from kolibri.core.utils.pagination import ValuesViewsetCursorPagination
 from kolibri.core.utils.pagination import ValuesViewsetLimitOffsetPagination
@@ -109,9 +115,46 @@ def get_cache_key(*args, **kwargs):
     return str(ContentCacheKey.get_cache_key())
 
 
+def _get_memory_cached_response(cache_key):
+    cached = caches["response_cache"].get(cache_key)
+    if cached is None:
+        return None
+    status_code, headers, content = cached
+    response = HttpResponse(content, status=status_code)
+    for header, value in headers:
+        response[header] = value
+    return response
+
+
+def _set_memory_cached_response(cache_key, response):
+    # Store only the rendered content and headers, so that each request gets
+    # its own response object that can be modified by middleware.
+    caches["response_cache"].set(
+        cache_key,
+        (response.status_code, tuple(response.items()), response.content),
+        timeout=3600,
+    )
+
+
+def _get_cached_response(cache_key):
+    response = _get_memory_cached_response(cache_key)
+    if response is None:
+        response = cache.get(cache_key)
+        if response is not None:
+            _set_memory_cached_response(cache_key, response)
+    return response
+
+
+def _set_cached_response(cache_key, response):
+    cache.set(cache_key, response, timeout=3600)
+    _set_memory_cached_response(cache_key, response)
+
+
 def metadata_cache(view_func, cache_key_func=get_cache_key):
     """
     Decorator to apply an Etag sensitive page cache
+    Responses are cached in an in process cache in front of the main cache,
+    both keyed by the cache key, so that any change to it invalidates both.
     """
 
     @etag(cache_key_func)
@@ -131,7 +174,7 @@ def metadata_cache(view_func, cache_key_func=get_cache_key):
         response = None
         if key_prefix is not None:
             cache_key = "{}:{}".format(key_prefix, url_key)
-            response = cache.get(cache_key)
+            response = _get_cached_response(cache_key)
         if response is None:
             response = view_func(*args, **kwargs)
             if response.status_code == 200:
@@ -144,7 +187,7 @@ def metadata_cache(view_func, cache_key_func=get_cache_key):
                 ):
                     cache_key = "{}:{}".format(key_prefix, url_key)
                     response.add_post_render_callback(
-                        lambda r: cache.set(cache_key, r, timeout=3600)
+                        lambda r: _set_cached_response(cache_key, r)
                     )
             else:
                 # Don't cache responses that returned an error code
@@ -1248,12 +1291,37 @@ class ContentNodeSearchViewset(ContentNodeViewset):
         # only execute if query is meaningful
         all_queries = [query for query in all_queries if query]
 
+        search_words = critical_words or all_words
+        search_query = build_search_query(search_words)
+        if search_query is not None and search_index_ready():
+            return self.indexed_search(
+                queryset,
+                search_query,
+                max_results,
+                all_queries,
+                search_query_is_complete(search_words),
+            )
+
         results = []
         content_ids = set()
+        self.add_query_results(queryset, all_queries, results, content_ids, max_results)
+
+        results = queryset.filter_by_uuids(results, validate=False)
+
+        # If no queries, just use an empty Q.
+        all_queries_filter = union(all_queries) or Q()
+
+        return self.search_metadata(results, queryset, all_queries_filter)
+
+    def add_query_results(self, queryset, queries, results, content_ids, max_results):
+        """
+        Add the ids of nodes matching each query in turn to results, skipping
+        nodes with content_ids already in content_ids, until there are max_results.
+        """
         BUFFER_SIZE = max_results * 2  # grab some extras, but not too many
 
         # iterate over each query type, and build up search results
-        for query in all_queries:
+        for query in queries:
 
             # in each pass, don't take any items already in the result set
             matches = (
@@ -1277,13 +1345,13 @@ class ContentNodeSearchViewset(ContentNodeViewset):
             if len(results) >= max_results:
                 break
 
-        results = queryset.filter_by_uuids(results, validate=False)
-
-        # If no queries, just use an empty Q.
-        all_queries_filter = union(all_queries) or Q()
-
+    def search_metadata(self, results, queryset, matches_filter):
+        """
+        Returns the results along with the total number of matching results, and the
+        channel_ids and kinds of all matches, ignoring any filters.
+        """
         total_results = (
-            queryset.filter(all_queries_filter)
+            queryset.filter(matches_filter)
             .values_list("content_id", flat=True)
             .distinct()
             .count()
@@ -1293,14 +1361,14 @@ class ContentNodeSearchViewset(ContentNodeViewset):
         unfiltered_queryset = self.get_queryset()
 
         channel_ids = (
-            unfiltered_queryset.filter(all_queries_filter)
+            unfiltered_queryset.filter(matches_filter)
             .values_list("channel_id", flat=True)
             .order_by("channel_id")
             .distinct()
         )
 
         content_kinds = (
-            unfiltered_queryset.filter(all_queries_filter)
+            unfiltered_queryset.filter(matches_filter)
             .values_list("kind", flat=True)
             .order_by("kind")
             .distinct()
@@ -1308,6 +1376,39 @@ class ContentNodeSearchViewset(ContentNodeViewset):
 
         return (results, channel_ids, content_kinds, total_results)
 
+    def indexed_search(self, queryset, search_query, max_results, queries, complete):
+        """
+        Use the full text search index to rank matches in a single query,
+        rather than querying for each word and relevance priority separately.
+        Unless the search query is complete, the index may miss substrings of words
+        that queries match, so their matches are added if the index finds too few.
+        """
+        matches = filter_by_search_index(queryset, search_query, rank=True).values(
+            "content_id", "id", "search_rank"
+        )
+
+        results = []
+        content_ids = set()
+
+        for match in matches.iterator():
+            # filter the dupes
+            if match["content_id"] in content_ids:
+                continue
+            content_ids.add(match["content_id"])
+            results.append(match["id"])
+            # bail out as soon as we reach the quota
+            if len(results) >= max_results:
+                break
+
+        matches_filter = search_index_filter(search_query)
+        if len(results) < max_results and not complete and queries:
+            self.add_query_results(queryset, queries, results, content_ids, max_results)
+            matches_filter |= union(queries)
+
+        results = queryset.filter_by_uuids(results, validate=False)
+
+        return self.search_metadata(results, queryset, matches_filter)
+
     def list(self, request, **kwargs):
         value = self.kwargs["search"]
         max_results = self.kwargs["max_results"]
@@ -1576,6 +1677,58 @@ class UserContentNodeFilter(ContentNodeFilter):
         )
         return queryset.filter(content_id__in=content_ids)
 
+    def _get_next_steps_node_ids(self, user):
+        """
+        Return the ids of available content nodes that have user completed content as a
+        prerequisite, or leftward sibling, and that the user has not engaged in.
+        These are cached for each user until the user's logs, or the available content, change,
+        so that the prerequisite and sibling queries are not repeated on every request.
+        """
+        log_counts = ContentSummaryLog.objects.filter(user=user).aggregate(
+            total=Count("id"), completed=Count("id", filter=Q(progress=1))
+        )
+        # If no logs, don't bother doing the other queries
+        if not log_counts["completed"]:
+            return []
+        cache_key = "next_steps_{}_{}_{}_{}".format(
+            user.id, get_cache_key(), log_counts["total"], log_counts["completed"]
+        )
+        node_ids = cache.get(cache_key)
+        if node_ids is None:
+            queryset = models.ContentNode.objects.filter(available=True)
+            completed_content_nodes = queryset.filter_by_content_ids(
+                ContentSummaryLog.objects.filter(user=user, progress=1).values_list(
+                    "content_id", flat=True
+                )
+            ).order_by()
+
+            # Filter to only show content that the user has not engaged in, so as not to be redundant with resume
+            node_ids = list(
+                queryset.exclude_by_content_ids(
+                    ContentSummaryLog.objects.filter(user=user).values_list(
+                        "content_id", flat=True
+                    ),
+                    validate=False,
+                )
+                .filter(
+                    Q(has_prerequisite__in=completed_content_nodes)
+                    | Q(
+                        lft__in=[
+                            rght + 1
+                            for rght in completed_content_nodes.values_list(
+                                "rght", flat=True
+                            )
+                        ]
+                    )
+                )
+                .order_by()
+                .values_list("id", flat=True)
+                .distinct()
+            )
+            # cache the next steps for 24 hours, as the key changes when they may have changed
+            cache.set(cache_key, node_ids, 60 * 60 * 24)
+        return node_ids
+
     def filter_by_next_steps(self, queryset, name, value):
         """
         Recommend content that has user completed content as a prerequisite, or leftward sibling.
@@ -1588,38 +1741,10 @@ class UserContentNodeFilter(ContentNodeFilter):
         # if person requesting is not the data they are requesting for, also return no nodes
         if not user.is_facility_user:
             return queryset.none()
-        completed_content_ids = ContentSummaryLog.objects.filter(
-            user=user, progress=1
-        ).values_list("content_id", flat=True)
-
-        # If no logs, don't bother doing the other queries
-        if not completed_content_ids.exists():
+        node_ids = self._get_next_steps_node_ids(user)
+        if not node_ids:
             return queryset.none()
-        completed_content_nodes = queryset.filter_by_content_ids(
-            completed_content_ids
-        ).order_by()
-
-        # Filter to only show content that the user has not engaged in, so as not to be redundant with resume
-        queryset = (
-            queryset.exclude_by_content_ids(
-                ContentSummaryLog.objects.filter(user=user).values_list(
-                    "content_id", flat=True
-                ),
-                validate=False,
-            )
-            .filter(
-                Q(has_prerequisite__in=completed_content_nodes)
-                | Q(
-                    lft__in=[
-                        rght + 1
-                        for rght in completed_content_nodes.values_list(
-                            "rght", flat=True
-                        )
-                    ]
-                )
-            )
-            .order_by()
-        )
+        queryset = queryset.filter_by_uuids(node_ids, validate=False)
         if not (
             user.roles.exists() or user.is_superuser
         ):  # must have coach role or higher
@@ -1639,34 +1764,29 @@ class UserContentNodeFilter(ContentNodeFilter):
         content_ids = cache.get(cache_key)
 
         if content_ids is None:
-            if len(ContentSessionLog.objects.values_list("pk")[:50]) < 50:
-                # return 25 random content nodes if not enough session logs
-                pks = queryset.values_list("pk", flat=True).exclude(
-                    kind=content_kinds.TOPIC
-                )
-                # .count scales with table size, so can get slow on larger channels
-                count_cache_key = "content_count_for_popular"
-                count = cache.get(count_cache_key) or min(pks.count(), 25)
-                return queryset.filter_by_uuids(
-                    sample(list(pks), count), validate=False
-                )
-            # get the most accessed content nodes
-            # search for content nodes that currently exist in the database
-            content_nodes = models.ContentNode.objects.filter(available=True)
-            content_counts_sorted = (
-                ContentSessionLog.objects.filter(
-                    content_id__in=content_nodes.values_list(
+            content_ids = []
+            if len(ContentSessionLog.objects.values_list("pk")[:50]) == 50:
+                # get the most accessed content nodes
+                # search for content nodes that currently exist in the database
+                content_ids = get_popular_content_ids(
+                    models.ContentNode.objects.filter(available=True).values_list(
                         "content_id", flat=True
-                    ).distinct()
+                    ),
+                    20,
                 )
-                .values_list("content_id", flat=True)
-                .annotate(Count("content_id"))
-                .order_by("-content_id__count")
+            if content_ids:
+                # cache the popular results content_ids for 10 minutes, for efficiency
+                cache.set(cache_key, content_ids, 60 * 10)
+
+        if not content_ids:
+            # return 25 random content nodes if not enough session logs,
+            # or if the session logs have not yet been counted
+            pks = (
+                queryset.exclude(kind=content_kinds.TOPIC)
+                .order_by("?")
+                .values_list("pk", flat=True)[:25]
             )
-
-            content_ids = list(content_counts_sorted[:20])
-            # cache the popular results content_ids for 10 minutes, for efficiency
-            cache.set(cache_key, content_ids, 60 * 10)
+            return queryset.filter_by_uuids(list(pks), validate=False)
 
         return queryset.filter_by_content_ids(content_ids, validate=False)
 
@@ -1755,47 +1875,52 @@ class ContentNodeProgressViewset(TreeQueryMixin, BaseValuesViewset, ListModelMix
     def generate_response(self, request, queryset):
         if request.user.is_anonymous:
             return Response([])
-        logs = list(
-            ContentSummaryLog.objects.filter(
-                user=self.request.user,
-                content_id__in=queryset.exclude(kind=content_kinds.TOPIC).values_list(
-                    "content_id", flat=True
-                ),
-            )
+        content_ids = queryset.exclude(kind=content_kinds.TOPIC).values_list(
+            "content_id", flat=True
+        )
+        summarylogs = ContentSummaryLog.objects.filter(
+            user=self.request.user, content_id__in=content_ids
+        )
+        logs = list(summarylogs.values("id", "content_id", "progress"))
+        if not logs:
+            return Response([])
+
+        # Count the attempts of every mastery log for these summary logs in one grouped query,
+        # rather than with subqueries for each summary log, keeping only the most recent
+        # mastery log for each summary log.
+        attempt_counts = {}
+        for masterylog in (
+            MasteryLog.objects.filter(summarylog__in=summarylogs)
             .annotate(
-                num_question_answered=Subquery(
-                    MasteryLog.objects.filter(
-                        user=self.request.user,
-                        summarylog__content_id=OuterRef("content_id"),
-                    )
-                    .annotate(
-                        num_question_answered=Count("attemptlogs"),
-                    )
-                    .values("num_question_answered")
-                    .order_by("-end_timestamp")[:1]
-                ),
-                num_question_answered_correctly=Subquery(
-                    MasteryLog.objects.filter(
-                        user=self.request.user,
-                        summarylog__content_id=OuterRef("content_id"),
-                    )
-                    .annotate(
-                        num_question_answered_correctly=Count(
-                            "attemptlogs",
-                            filter=Q(attemptlogs__correct=1),
-                        ),
-                    )
-                    .values("num_question_answered_correctly")
-                    .order_by("-end_timestamp")[:1]
-                ),
-                total_questions=Subquery(
-                    models.ContentNode.objects.filter(
-                        content_id=OuterRef("content_id"),
-                    ).values("assessmentmetadata__number_of_assessments")[:1]
+                num_question_answered=Count("attemptlogs"),
+                num_question_answered_correctly=Count(
+                    "attemptlogs",
+                    filter=Q(attemptlogs__correct=1),
                 ),
             )
-            .values(*self.values)
-        )
+            .values(
+                "summarylog_id",
+                "num_question_answered",
+                "num_question_answered_correctly",
+            )
+            .order_by("-end_timestamp")
+        ):
+            attempt_counts.setdefault(masterylog["summarylog_id"], masterylog)
+
+        total_questions = {}
+        for content_id, number_of_assessments in models.ContentNode.objects.filter(
+            content_id__in=summarylogs.values("content_id")
+        ).values_list("content_id", "assessmentmetadata__number_of_assessments"):
+            total_questions.setdefault(content_id, number_of_assessments)
+
+        for log in logs:
+            summarylog_id = log.pop("id")
+            attempt_count = attempt_counts.get(summarylog_id, {})
+            log["num_question_answered"] = attempt_count.get("num_question_answered")
+            log["num_question_answered_correctly"] = attempt_count.get(
+                "num_question_answered_correctly"
+            )
+            log["total_questions"] = total_questions.get(log["content_id"])
         return Response(logs)
 
     def list(self, request, *args, **kwargs):
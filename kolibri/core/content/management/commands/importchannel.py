@@ -12,6 +12,7 @@ from kolibri.core.content.utils.importability_annotation import clear_channel_st
 from kolibri.core.device.models import ContentCacheKey
 from kolibri.core.errors import KolibriUpgradeError
 from kolibri.core.tasks.management.commands.base import AsyncCommand
+from kolibri.core.tasks.utils import fd_safe_max_connections
 from kolibri.utils import conf
 from kolibri.utils import file_transfer as transfer
 
@@ -150,7 +151,12 @@ class Command(AsyncCommand):
             url = paths.get_content_database_file_url(channel_id, baseurl=baseurl)
             logger.debug("URL to fetch: {}".format(url))
             filetransfer = transfer.FileDownload(
-                url, dest, cancel_check=self.is_cancelled
+                url,
+                dest,
+                cancel_check=self.is_cancelled,
+                max_connections=fd_safe_max_connections(
+                    conf.OPTIONS["Tasks"]["FILE_DOWNLOAD_CONNECTIONS"]
+                ),
             )
         elif method == COPY_METHOD:
             # if there is a new channel version db, set that as source path
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from kolibri.core.content.utils.search_index import create_search_index
+from kolibri.core.content.utils.search_index import drop_search_index
+from kolibri.core.content.utils.search_index import update_search_index
+
+
+def create_and_populate_search_index(apps, schema_editor):
+    if create_search_index():
+        update_search_index()
+
+
+def remove_search_index(apps, schema_editor):
+    drop_search_index()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0039_channelmetadata_ordered_fields"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_and_populate_search_index, remove_search_index)
+    ]
@@ -45,6 +45,7 @@ from kolibri.core.content import base_models
 from kolibri.core.content.errors import InvalidStorageFilenameError
 from kolibri.core.content.utils.search import bitmask_fieldnames
 from kolibri.core.content.utils.search import metadata_bitmasks
+from kolibri.core.content.utils.search_index import delete_search_index
 from kolibri.core.device.models import ContentCacheKey
 from kolibri.core.fields import DateTimeTzField
 from kolibri.core.fields import JSONField
@@ -420,6 +421,7 @@ class ChannelMetadata(base_models.ChannelMetadata):
                     qs.delete()
                     left_value += BATCH_SIZE
             self.root.delete()
+        delete_search_index(self.id)
         ContentCacheKey.update_cache_key()
 
 
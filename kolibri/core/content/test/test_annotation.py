@@ -1,3 +1,5 @@
+import os
+import shutil
 import tempfile
 import uuid
 
@@ -31,6 +33,9 @@ from kolibri.core.content.utils.annotation import (
 )
 from kolibri.core.content.utils.annotation import set_leaf_nodes_invisible
 from kolibri.core.content.utils.annotation import set_local_file_availability_from_disk
+from kolibri.core.content.utils.paths import get_content_file_name
+from kolibri.core.content.utils.paths import VALID_STORAGE_FILENAME
+from kolibri.utils.tests.helpers import override_option
 
 
 def get_engine(connection_string):
@@ -745,6 +750,73 @@ class AnnotationTreeRecursion(TransactionTestCase):
         self.assertFalse(root_node.available)
         self.assertFalse(root_node.coach_content)
 
+    def _get_annotations(self):
+        return list(
+            ContentNode.objects.order_by("id").values_list(
+                "id",
+                "available",
+                "coach_content",
+                "num_coach_contents",
+                "on_device_resources",
+            )
+        )
+
+    def test_incremental_matches_full_annotation(self):
+        ContentNode.objects.exclude(kind=content_kinds.TOPIC).update(
+            available=True, coach_content=True
+        )
+        recurse_annotation_up_tree(channel_id=test_channel_id)
+        leaf = ContentNode.objects.get(id="32a941fb77c2576e8f6b294cde4c3b0c")
+        ContentNode.objects.filter(id=leaf.id).update(available=False)
+        recurse_annotation_up_tree(channel_id=test_channel_id, node_ids=[leaf.id])
+        incremental = self._get_annotations()
+        recurse_annotation_up_tree(channel_id=test_channel_id)
+        self.assertEqual(incremental, self._get_annotations())
+        self.assertEqual(
+            ContentNode.objects.get(parent__isnull=True).on_device_resources,
+            ContentNode.objects.exclude(kind=content_kinds.TOPIC)
+            .filter(available=True)
+            .count(),
+        )
+
+    def test_incremental_topic_node_ids_matches_full_annotation(self):
+        recurse_annotation_up_tree(channel_id=test_channel_id)
+        topic = ContentNode.objects.get(id="da7ecc42e62553eebc8121242746e88a")
+        topic.get_descendants().exclude(kind=content_kinds.TOPIC).update(available=True)
+        recurse_annotation_up_tree(channel_id=test_channel_id, node_ids=[topic.id])
+        incremental = self._get_annotations()
+        recurse_annotation_up_tree(channel_id=test_channel_id)
+        self.assertEqual(incremental, self._get_annotations())
+        self.assertTrue(ContentNode.objects.get(id=topic.id).available)
+
+    def test_incremental_only_annotates_ancestors(self):
+        ContentNode.objects.exclude(kind=content_kinds.TOPIC).update(available=True)
+        recurse_annotation_up_tree(channel_id=test_channel_id)
+        leaf = ContentNode.objects.get(id="32a941fb77c2576e8f6b294cde4c3b0c")
+        ancestor_ids = list(leaf.get_ancestors().values_list("id", flat=True))
+        other_topic = (
+            ContentNode.objects.filter(kind=content_kinds.TOPIC, available=True)
+            .exclude(id__in=ancestor_ids)
+            .first()
+        )
+        ContentNode.objects.filter(id=other_topic.id).update(on_device_resources=100)
+        ContentNode.objects.filter(id=leaf.id).update(available=False)
+        recurse_annotation_up_tree(channel_id=test_channel_id, node_ids=[leaf.id])
+        other_topic.refresh_from_db()
+        self.assertEqual(other_topic.on_device_resources, 100)
+        parent = ContentNode.objects.get(id=leaf.parent_id)
+        self.assertEqual(
+            parent.on_device_resources,
+            parent.children.filter(available=True)
+            .exclude(kind=content_kinds.TOPIC)
+            .count()
+            + sum(
+                parent.children.filter(
+                    available=True, kind=content_kinds.TOPIC
+                ).values_list("on_device_resources", flat=True)
+            ),
+        )
+
     def tearDown(self):
         call_command("flush", interactive=False)
         super(AnnotationTreeRecursion, self).tearDown()
@@ -939,6 +1011,86 @@ class LocalFileByDisk(TransactionTestCase):
         super(LocalFileByDisk, self).tearDown()
 
 
+@patch("kolibri.core.content.utils.sqlalchemybridge.get_engine", new=get_engine)
+class LocalFileByStorageScan(TransactionTestCase):
+
+    fixtures = ["content_test.json"]
+
+    def setUp(self):
+        super(LocalFileByStorageScan, self).setUp()
+        self.content_dir = tempfile.mkdtemp()
+        self.fallback_dir = tempfile.mkdtemp()
+        # Files with invalid storage filenames are left as they are
+        self.local_files = [
+            local_file
+            for local_file in LocalFile.objects.all().order_by("id")
+            if VALID_STORAGE_FILENAME.match(get_content_file_name(local_file))
+        ]
+        LocalFile.objects.exclude(
+            id__in=[local_file.id for local_file in self.local_files]
+        ).delete()
+
+    def _create_file(self, local_file, content_dir=None, shard=None):
+        filename = get_content_file_name(local_file)
+        shard_path = os.path.join(
+            content_dir or self.content_dir, "storage", *(shard or filename[:2])
+        )
+        if not os.path.exists(shard_path):
+            os.makedirs(shard_path)
+        with open(os.path.join(shard_path, filename), "w") as f:
+            f.write("test")
+
+    def _scan(self, **kwargs):
+        with override_option("Paths", "CONTENT_DIR", self.content_dir), override_option(
+            "Paths", "CONTENT_FALLBACK_DIRS", [self.fallback_dir]
+        ):
+            set_local_file_availability_from_disk(scan_storage=True, **kwargs)
+
+    def test_set_all_files_none_exist(self):
+        LocalFile.objects.update(available=True)
+        self._scan()
+        self.assertEqual(LocalFile.objects.filter(available=True).count(), 0)
+
+    def test_set_all_files_all_exist(self):
+        LocalFile.objects.update(available=False)
+        for local_file in self.local_files:
+            self._create_file(local_file)
+        self._scan()
+        self.assertEqual(LocalFile.objects.exclude(available=True).count(), 0)
+
+    def test_set_files_some_exist(self):
+        LocalFile.objects.update(available=True)
+        self._create_file(self.local_files[0])
+        self._create_file(self.local_files[1], content_dir=self.fallback_dir)
+        self._scan()
+        self.assertEqual(
+            set(LocalFile.objects.filter(available=True).values_list("id", flat=True)),
+            {self.local_files[0].id, self.local_files[1].id},
+        )
+
+    def test_set_files_some_exist_thread_pool(self):
+        LocalFile.objects.update(available=False)
+        self._create_file(self.local_files[0])
+        self._create_file(self.local_files[1])
+        self._scan(max_workers=4)
+        self.assertEqual(
+            set(LocalFile.objects.filter(available=True).values_list("id", flat=True)),
+            {self.local_files[0].id, self.local_files[1].id},
+        )
+
+    def test_file_in_wrong_shard_not_available(self):
+        LocalFile.objects.update(available=True)
+        self._create_file(self.local_files[0], shard="zz")
+        self._scan()
+        self.assertEqual(LocalFile.objects.filter(available=True).count(), 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.content_dir)
+        shutil.rmtree(self.fallback_dir)
+        call_command("flush", interactive=False)
+        super(LocalFileByStorageScan, self).tearDown()
+
+
 class SetChannelMetadataFieldsTestCase(TestCase):
     def setUp(self):
         self.node = ContentNode.objects.create(
@@ -45,7 +45,10 @@ from kolibri.core.content.utils.channel_import import BATCH_SIZE
 from kolibri.core.content.utils.channel_import import ChannelImport
 from kolibri.core.content.utils.channel_import import import_channel_from_data
 from kolibri.core.content.utils.channel_import import import_channel_from_local_db
+from kolibri.core.content.utils.channel_import import iterate_batches
 from kolibri.core.content.utils.channel_import import topological_sort
+from kolibri.core.content.utils.search import annotate_label_bitmasks
+from kolibri.core.content.utils.search import bitmask_fieldnames
 from kolibri.core.content.utils.sqlalchemybridge import get_default_db_string
 from kolibri.core.content.utils.sqlalchemybridge import load_metadata
 
@@ -225,6 +228,89 @@ class BaseChannelImportClassGenRowMapperTestCase(TestCase):
             mapper(record, "test_attr")
 
 
+@patch("kolibri.core.content.utils.channel_import.Bridge")
+@patch("kolibri.core.content.utils.channel_import.ChannelImport.find_unique_tree_id")
+@patch("kolibri.core.content.utils.channel_import.apps")
+class BaseChannelImportClassCompileRowMapperTestCase(TestCase):
+    """
+    Testcase for the base channel import class row mapper compilation
+    """
+
+    def _get_columns(self, *names, **defaults):
+        columns = []
+        for name in names:
+            column = MagicMock()
+            column.name = name
+            column.k_memoized_default = defaults.get(name)
+            columns.append((name, column))
+        return columns
+
+    def test_base_mapper(self, apps_mock, tree_id_mock, BridgeMock):
+        channel_import = ChannelImport(uuid.uuid4().hex, "")
+        columns = self._get_columns("a", "b", "c", b="default_b")
+        record = {"a": 1, "b": None}
+        map_row = channel_import.compile_row_mapper(
+            channel_import.generate_row_mapper(), columns, record
+        )
+        self.assertEqual(map_row(record), (1, "default_b", None))
+        self.assertEqual(map_row({"a": 2, "b": 3, "c": 4}), (2, 3, 4))
+
+    def test_database_row(self, apps_mock, tree_id_mock, BridgeMock):
+        channel_import = ChannelImport(uuid.uuid4().hex, "")
+        columns = self._get_columns("a", "b", "missing")
+        engine = create_engine("sqlite:///:memory:")
+        with engine.connect() as connection:
+            rows = connection.execute("SELECT 1 AS a, 'b' AS b").fetchall()
+        map_row = channel_import.compile_row_mapper(
+            channel_import.generate_row_mapper(), columns, rows[0]
+        )
+        self.assertEqual(map_row(rows[0]), (1, "b", None))
+
+    def test_mappings(self, apps_mock, tree_id_mock, BridgeMock):
+        channel_import = ChannelImport(uuid.uuid4().hex, "")
+        channel_import.test_map_method = lambda record: record.a * 2
+        channel_import.test_map_constant = "constant"
+        columns = self._get_columns("a", "b", "c", "d")
+        row_mapper = channel_import.generate_row_mapper(
+            mappings={
+                "b": "test_map_method",
+                "c": "test_map_constant",
+                "d": "a",
+            }
+        )
+        record = Mock(spec=["a"], a=2)
+        map_row = channel_import.compile_row_mapper(row_mapper, columns, record)
+        expected = tuple(row_mapper(record, name) for name, _ in columns)
+        self.assertEqual(map_row(record), expected)
+        self.assertEqual(expected, (2, 4, "constant", 2))
+
+    def test_other_mapper(self, apps_mock, tree_id_mock, BridgeMock):
+        channel_import = ChannelImport(uuid.uuid4().hex, "")
+        columns = self._get_columns("a", "b")
+        map_row = channel_import.compile_row_mapper(
+            lambda record, column: column + str(record), columns, 1
+        )
+        self.assertEqual(map_row(1), ("a1", "b1"))
+
+
+class IterateBatchesTestCase(TestCase):
+    def test_iterator(self):
+        batches = list(iterate_batches((i for i in range(5)), batch_size=2))
+        self.assertEqual(batches, [[0, 1], [2, 3], [4]])
+
+    def test_database_result(self):
+        engine = create_engine("sqlite:///:memory:")
+        with engine.connect() as connection:
+            result = connection.execute(
+                "WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < 4) SELECT i FROM n"
+            )
+            batches = [
+                [row[0] for row in batch]
+                for batch in iterate_batches(result, batch_size=2)
+            ]
+        self.assertEqual(batches, [[0, 1], [2, 3], [4]])
+
+
 @patch("kolibri.core.content.utils.channel_import.Bridge")
 @patch("kolibri.core.content.utils.channel_import.ChannelImport.find_unique_tree_id")
 @patch("kolibri.core.content.utils.channel_import.apps")
@@ -769,6 +855,14 @@ class NaiveImportTestBase(ContentNodeTestBase):
             1,
         )
 
+    def test_label_bitmasks_set_on_import(self):
+        nodes = ContentNode.objects.filter(
+            channel_id="6199dde695db4ee4ab392222d5af1e5c"
+        ).order_by("id")
+        imported = list(nodes.values_list(*bitmask_fieldnames))
+        annotate_label_bitmasks(nodes)
+        self.assertEqual(imported, list(nodes.values_list(*bitmask_fieldnames)))
+
     def test_existing_localfiles_are_not_overwritten(self):
 
         with patch(
@@ -10,6 +10,7 @@ from base64 import urlsafe_b64decode
 import mock
 from django.conf import settings
 from django.core.cache import cache
+from django.db.models import Q
 from django.test import LiveServerTestCase
 from django.test import TestCase
 from django.urls import reverse
@@ -25,6 +26,8 @@ from kolibri.core.auth.models import LearnerGroup
 from kolibri.core.auth.test.helpers import provision_device
 from kolibri.core.content import models as content
 from kolibri.core.content.test.test_channel_upgrade import ChannelBuilder
+from kolibri.core.content.utils.search_index import search_index_ready
+from kolibri.core.content.utils.search_index import update_search_index
 from kolibri.core.device.models import ContentCacheKey
 from kolibri.core.device.models import DevicePermissions
 from kolibri.core.device.models import DeviceSettings
@@ -33,8 +36,11 @@ from kolibri.core.discovery.utils.network.errors import NetworkLocationConnectio
 from kolibri.core.discovery.utils.network.errors import NetworkLocationResponseFailure
 from kolibri.core.lessons.models import Lesson
 from kolibri.core.lessons.models import LessonAssignment
+from kolibri.core.logger.models import AttemptLog
 from kolibri.core.logger.models import ContentSessionLog
 from kolibri.core.logger.models import ContentSummaryLog
+from kolibri.core.logger.models import MasteryLog
+from kolibri.core.utils.cache import InMemoryCache
 from kolibri.utils.tests.helpers import override_option
 
 DUMMY_PASSWORD = "password"
@@ -646,6 +652,33 @@ class ContentNodeAPITestCase(ContentNodeAPIBase, APITestCase):
 
     maxDiff = None
 
+    def test_contentnode_response_memory_cache(self):
+        response_cache = InMemoryCache(
+            "test_response_cache", {"OPTIONS": {"MAX_SIZE": 1000000}}
+        )
+        response_cache.clear()
+        root = content.ContentNode.objects.get(title="root")
+        url = reverse("kolibri:core:contentnode-detail", kwargs={"pk": root.id})
+        with mock.patch(
+            "kolibri.core.content.api.caches", {"response_cache": response_cache}
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response_cache.stats()["entries"], 1)
+            content.ContentNode.objects.filter(id=root.id).update(title="changed")
+            # Served from the in process cache, as the content cache key is unchanged
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["title"], "root")
+            self.assertEqual(
+                response["ETag"], '"{}"'.format(ContentCacheKey.get_cache_key())
+            )
+            self.assertEqual(response_cache.stats()["hits"], 1)
+            time.sleep(0.01)
+            ContentCacheKey.update_cache_key()
+            response = self.client.get(url)
+            self.assertEqual(response.json()["title"], "changed")
+
     def test_prerequisite_for_filter(self):
         c1_id = content.ContentNode.objects.get(title="c1").id
         response = self.client.get(
@@ -1343,6 +1376,57 @@ class ContentNodeAPITestCase(ContentNodeAPIBase, APITestCase):
 
         self.assertEqual(get_progress_fraction(c2c1), 0.7)
 
+    def test_contentnode_progress_question_counts(self):
+        facility, root, c1, c2, c2c1, c2c3 = self._setup_contentnode_progress()
+        content.AssessmentMetaData.objects.filter(
+            contentnode__content_id=c2c1.content_id
+        ).update(number_of_assessments=5)
+        user = FacilityUser.objects.get(username="learner")
+        summarylog = ContentSummaryLog.objects.get(
+            user=user, content_id=c2c1.content_id
+        )
+        now = timezone.now()
+        for mastery_level, end_timestamp, correct in (
+            (1, now - datetime.timedelta(hours=1), [1, 1, 1]),
+            (2, now, [1, 0]),
+        ):
+            masterylog = MasteryLog.objects.create(
+                user=user,
+                summarylog=summarylog,
+                mastery_level=mastery_level,
+                start_timestamp=end_timestamp,
+                end_timestamp=end_timestamp,
+            )
+            for i, item_correct in enumerate(correct):
+                AttemptLog.objects.create(
+                    user=user,
+                    masterylog=masterylog,
+                    sessionlog=ContentSessionLog.objects.create(
+                        user=user,
+                        content_id=c2c1.content_id,
+                        channel_id=self.the_channel_id,
+                        start_timestamp=end_timestamp,
+                        kind="exercise",
+                    ),
+                    item="item_{}".format(i),
+                    correct=item_correct,
+                    start_timestamp=end_timestamp,
+                    end_timestamp=end_timestamp,
+                    complete=True,
+                )
+        self.client.login(username="learner", password="pass", facility=facility)
+
+        response = self.client.get(reverse("kolibri:core:contentnodeprogress-list"))
+
+        progress = {log["content_id"]: log for log in response.data}
+        self.assertEqual(progress[c2c1.content_id]["num_question_answered"], 2)
+        self.assertEqual(
+            progress[c2c1.content_id]["num_question_answered_correctly"], 1
+        )
+        self.assertEqual(progress[c2c1.content_id]["total_questions"], 5)
+        self.assertIsNone(progress[c2c3.content_id]["num_question_answered"])
+        self.assertIsNone(progress[c2c3.content_id]["total_questions"])
+
     def test_filtering_coach_content_anon(self):
         response = self.client.get(
             reverse("kolibri:core:contentnode-list"),
@@ -2166,3 +2250,102 @@ class ChannelThumbnailViewTestCase(APITestCase):
             reverse("kolibri:core:channel-thumbnail", args=[self.channel_metadata.id])
         )
         self.assertEqual(response.status_code, 404)
+
+
+class ContentNodeSearchIndexTestCase(APITestCase):
+    databases = "__all__"
+    fixtures = ["content_test.json"]
+    the_channel_id = "6199dde695db4ee4ab392222d5af1e5c"
+
+    @classmethod
+    def setUpTestData(cls):
+        provision_device()
+        content.ContentNode.objects.filter(title="c2c1").update(
+            description="Subtraction"
+        )
+        content.ContentNode.objects.filter(title="c2c2").update(description="加法和减法")
+        update_search_index(cls.the_channel_id)
+
+    def _search(self, value):
+        return self.client.get(
+            reverse("kolibri:core:contentnode_search-list"), data={"search": value}
+        )
+
+    def _result_titles(self, response):
+        return sorted(node["title"] for node in response.data["results"])
+
+    def test_search_index_ready(self):
+        self.assertTrue(search_index_ready())
+
+    def test_search_index_ready_is_cached(self):
+        search_index_ready()
+        with self.assertNumQueries(0):
+            self.assertTrue(search_index_ready())
+
+    def test_search_title(self):
+        response = self._search("root")
+        self.assertEqual(self._result_titles(response), ["root"])
+        self.assertEqual(response.data["total_results"], 1)
+        self.assertEqual(list(response.data["content_kinds"]), [content_kinds.TOPIC])
+        self.assertEqual(list(response.data["channel_ids"]), [self.the_channel_id])
+
+    def test_search_prefix(self):
+        response = self._search("c2")
+        self.assertEqual(self._result_titles(response), ["c2", "c2c1", "c2c2", "c2c3"])
+
+    def test_search_tags(self):
+        response = self._search("tag_2")
+        self.assertEqual(self._result_titles(response), ["c2", "root"])
+
+    def test_search_description(self):
+        response = self._search("balbla1")
+        self.assertEqual(self._result_titles(response), ["root"])
+
+    def test_search_middle_of_word(self):
+        response = self._search("traction")
+        self.assertEqual(self._result_titles(response), ["c2c1"])
+        self.assertEqual(response.data["total_results"], 1)
+
+    def test_search_words_without_spaces(self):
+        response = self._search("减法")
+        self.assertEqual(self._result_titles(response), ["c2c2"])
+        self.assertEqual(response.data["total_results"], 1)
+
+    def test_search_dedupes_content_ids(self):
+        response = self._search("c1 copy")
+        content_ids = [node["content_id"] for node in response.data["results"]]
+        self.assertEqual(len(content_ids), len(set(content_ids)))
+        self.assertEqual(
+            response.data["total_results"],
+            content.ContentNode.objects.filter(
+                Q(title__icontains="c1") | Q(title__icontains="copy"), available=True
+            )
+            .values("content_id")
+            .distinct()
+            .count(),
+        )
+
+    def test_search_ranks_title_matches_first(self):
+        response = self.client.get(
+            reverse("kolibri:core:contentnode_search-list"),
+            data={"search": "copy balbla5", "max_results": 1},
+        )
+        self.assertEqual(self._result_titles(response), ["copy"])
+
+    def test_search_max_results(self):
+        response = self.client.get(
+            reverse("kolibri:core:contentnode_search-list"),
+            data={"search": "c2", "max_results": 2},
+        )
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["total_results"], 4)
+
+    def test_search_no_words(self):
+        response = self._search("!?,")
+        self.assertEqual(len(response.data["results"]), 0)
+
+    def test_delete_channel_removes_index(self):
+        content.ChannelMetadata.objects.get(
+            id=self.the_channel_id
+        ).delete_content_tree_and_files()
+        self.assertFalse(search_index_ready())
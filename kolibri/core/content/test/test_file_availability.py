@@ -4,18 +4,26 @@ import tempfile
 import uuid
 from collections import namedtuple
 
+from django.test import TestCase
 from django.test import TransactionTestCase
+from mock import MagicMock
 from mock import patch
 
 from .sqlalchemytesting import django_connection_engine
 from kolibri.core.content.models import LocalFile
+from kolibri.core.content.utils.file_availability import generate_checksum_bitset
+from kolibri.core.content.utils.file_availability import (
+    generate_checksum_integer_mask,
+)
 from kolibri.core.content.utils.file_availability import (
     get_available_checksums_from_disk,
 )
 from kolibri.core.content.utils.file_availability import (
     get_available_checksums_from_remote,
 )
+from kolibri.core.content.utils.file_availability import get_checksums_from_mask
 from kolibri.core.discovery.models import NetworkLocation
+from kolibri.core.discovery.utils.network.errors import NetworkLocationResponseFailure
 from kolibri.core.utils.cache import process_cache
 
 
@@ -196,3 +204,78 @@ class LocalFileRemote(TransactionTestCase):
             test_channel_id, self.location.id
         )
         self.assertIsNone(checksums)
+
+    @patch("kolibri.core.content.utils.file_availability.NetworkClient")
+    def test_bitset_remote_checksum_response(self, networkclient_mock):
+        self.location.kolibri_version = "0.18.0"
+        self.location.save()
+        network_client = networkclient_mock.build_for_address.return_value
+        network_client.base_url = "test"
+        network_client.post.return_value.status_code = 200
+        network_client.post.return_value.content = b"\x03"
+        checksums = get_available_checksums_from_remote(
+            test_channel_id, self.location.id
+        )
+        self.assertIn("v2/file_checksums", network_client.post.call_args[0][0])
+        self.assertEqual(len(checksums), 2)
+        self.assertTrue(local_file_qs.filter(id=list(checksums)[0]).exists())
+        self.assertTrue(local_file_qs.filter(id=list(checksums)[1]).exists())
+
+    @patch("kolibri.core.content.utils.file_availability.NetworkClient")
+    def test_older_peer_uses_integer_mask(self, networkclient_mock):
+        self.location.kolibri_version = "0.17.0"
+        self.location.save()
+        network_client = networkclient_mock.build_for_address.return_value
+        network_client.base_url = "test"
+        network_client.post.return_value.status_code = 200
+        network_client.post.return_value.content = "3"
+        checksums = get_available_checksums_from_remote(
+            test_channel_id, self.location.id
+        )
+        self.assertIn("v1/file_checksums", network_client.post.call_args[0][0])
+        self.assertEqual(len(checksums), 2)
+
+    @patch("kolibri.core.content.utils.file_availability.NetworkClient")
+    def test_peer_without_v2_endpoint_uses_integer_mask(self, networkclient_mock):
+        self.location.kolibri_version = "0.18.0a1"
+        self.location.save()
+        network_client = networkclient_mock.build_for_address.return_value
+        network_client.base_url = "test"
+        v1_response = MagicMock(status_code=200, content="3")
+
+        def post(url, **kwargs):
+            if "v2/file_checksums" in url:
+                raise NetworkLocationResponseFailure(
+                    response=MagicMock(status_code=404)
+                )
+            return v1_response
+
+        network_client.post.side_effect = post
+        checksums = get_available_checksums_from_remote(
+            test_channel_id, self.location.id
+        )
+        self.assertIn("v1/file_checksums", network_client.post.call_args[0][0])
+        self.assertEqual(len(checksums), 2)
+
+
+class ChecksumMaskTestCase(TestCase):
+    checksums = [uuid.uuid4().hex for _ in range(20)]
+
+    def test_bitset_round_trip(self):
+        available = set(self.checksums[::3])
+        bitset = generate_checksum_bitset(self.checksums, available)
+        self.assertEqual(len(bitset), 3)
+        self.assertEqual(
+            get_checksums_from_mask(self.checksums, bitset, bitset=True), available
+        )
+
+    def test_integer_mask_matches_bitset(self):
+        available = set(self.checksums[1::2])
+        integer_mask = generate_checksum_integer_mask(self.checksums, available)
+        self.assertEqual(
+            integer_mask,
+            sum(1 << i for i, c in enumerate(self.checksums) if c in available),
+        )
+        self.assertEqual(
+            get_checksums_from_mask(self.checksums, str(integer_mask)), available
+        )
@@ -38,6 +38,7 @@ from kolibri.core.content.utils.resource_import import (
     RemoteChannelResourceImportManager,
 )
 from kolibri.core.device.models import ContentCacheKey
+from kolibri.utils import conf
 from kolibri.utils.file_transfer import Transfer
 from kolibri.utils.file_transfer import TransferCanceled
 from kolibri.utils.file_transfer import TransferFailed
@@ -505,7 +506,10 @@ class ImportChannelTestCase(TestCase):
         is_cancelled_mock.assert_called_with()
         # Check that the FileDownload initiated
         FileDownloadMock.assert_called_with(
-            "notest", local_path, cancel_check=is_cancelled_mock
+            "notest",
+            local_path,
+            cancel_check=is_cancelled_mock,
+            max_connections=conf.OPTIONS["Tasks"]["FILE_DOWNLOAD_CONNECTIONS"],
         )
         # Check that cancel was called
         cancel_mock.assert_called_with()
@@ -774,6 +778,7 @@ class ImportContentTestCase(TestCase):
             session=Any(Session),
             cancel_check=is_cancelled_mock,
             timeout=Transfer.DEFAULT_TIMEOUT,
+            max_connections=conf.OPTIONS["Tasks"]["FILE_DOWNLOAD_CONNECTIONS"],
         )
         # Check that the command itself was also cancelled.
         cancel_mock.assert_called_with()
@@ -2121,6 +2126,7 @@ class ImportContentTestCase(TestCase):
             session=Any(Session),
             cancel_check=is_cancelled_mock,
             timeout=5,
+            max_connections=conf.OPTIONS["Tasks"]["FILE_DOWNLOAD_CONNECTIONS"],
         )
 
 
@@ -7,7 +7,9 @@ from parameterized import parameterized
 from kolibri.core.content.models import ContentNode
 from kolibri.core.content.test.test_channel_upgrade import ChannelBuilder
 from kolibri.core.content.utils.search import annotate_label_bitmasks
+from kolibri.core.content.utils.search import bitmask_label_fieldnames
 from kolibri.core.content.utils.search import get_available_metadata_labels
+from kolibri.core.content.utils.search import get_label_bitmask
 from kolibri.core.content.utils.search import metadata_lookup
 
 
@@ -31,6 +33,32 @@ class RandomBitMaskTestCase(TestCase):
         )
 
 
+class GetLabelBitmaskTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        builder = ChannelBuilder()
+        builder.insert_into_default_db()
+        annotate_label_bitmasks(ContentNode.objects.all())
+
+    def test_matches_annotation(self):
+        for node in ContentNode.objects.all():
+            for (
+                bitmask_field_name,
+                label_field_name,
+            ) in bitmask_label_fieldnames.items():
+                self.assertEqual(
+                    getattr(node, bitmask_field_name),
+                    get_label_bitmask(
+                        bitmask_field_name, getattr(node, label_field_name)
+                    ),
+                )
+
+    def test_no_labels(self):
+        for bitmask_field_name in bitmask_label_fieldnames:
+            self.assertEqual(get_label_bitmask(bitmask_field_name, None), 0)
+            self.assertEqual(get_label_bitmask(bitmask_field_name, ""), 0)
+
+
 class ConstrainedBitMaskTestCase(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -7,10 +7,14 @@ from wsgiref.util import setup_testing_defaults
 from django.test import override_settings
 from django.test import TestCase
 from django.utils.http import http_date
+from mock import patch
 
 from kolibri.core.content.utils.paths import get_content_storage_file_path
+from kolibri.core.content.zip_wsgi import _html_cache
+from kolibri.core.content.zip_wsgi import _zipfile_cache
 from kolibri.core.content.zip_wsgi import generate_zip_content_response
 from kolibri.core.content.zip_wsgi import INITIALIZE_HASHI_FROM_IFRAME
+from kolibri.core.content.zip_wsgi import parse_html
 from kolibri.utils.tests.helpers import override_option
 
 
@@ -84,6 +88,9 @@ class ZipContentTestCase(TestCase):
         self.environ = {}
         setup_testing_defaults(self.environ)
 
+        _zipfile_cache.clear()
+        _html_cache.clear()
+
     def _get_file(self, file_name, base_url=None, **kwargs):
         if base_url is None:
             base_url = self.zip_file_base_url
@@ -100,6 +107,57 @@ class ZipContentTestCase(TestCase):
         response = self._get_file(self.test_name_2)
         self.assertEqual(next(response.streaming_content).decode(), self.test_str_2)
 
+    def test_zip_file_opened_once_for_multiple_requests(self):
+        with patch(
+            "kolibri.core.content.zip_wsgi.zipfile.ZipFile", wraps=zipfile.ZipFile
+        ) as zipfile_mock:
+            self._get_file(self.test_name_1)
+            self._get_file(self.test_name_2)
+            self._get_file(self.embedded_file_name)
+        zipfile_mock.assert_called_once_with(self.zip_path)
+
+    def test_modified_zip_file_reopened(self):
+        self._get_file(self.test_name_1)
+        with zipfile.ZipFile(self.zip_path, "a") as zf:
+            zf.writestr("new.txt", "New file")
+        response = self._get_file("new.txt")
+        self.assertEqual(next(response.streaming_content).decode(), "New file")
+
+    def test_etag_set_on_response(self):
+        response = self._get_file(self.test_name_1)
+        self.assertIsNotNone(response.get("ETag"))
+
+    def test_etag_set_on_html_response(self):
+        response = self._get_file(self.index_name)
+        self.assertEqual(
+            response.get("ETag"),
+            '"{}"'.format(hashlib.md5(response.content).hexdigest()),
+        )
+
+    def test_not_modified_response_when_if_none_match_header_matches(self):
+        etag = self._get_file(self.test_name_1).get("ETag")
+        response = self._get_file(self.test_name_1, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get("ETag"), etag)
+
+    def test_not_modified_response_when_if_none_match_header_matches_html(self):
+        etag = self._get_file(self.index_name).get("ETag")
+        response = self._get_file(self.index_name, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_full_response_when_if_none_match_header_does_not_match(self):
+        response = self._get_file(self.test_name_1, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_html_rewritten_once_for_multiple_requests(self):
+        with patch(
+            "kolibri.core.content.zip_wsgi.parse_html", wraps=parse_html
+        ) as parse_html_mock:
+            first = self._get_file(self.script_name)
+            second = self._get_file(self.script_name)
+        parse_html_mock.assert_called_once()
+        self.assertEqual(first.content, second.content)
+
     def test_nonexistent_zip_file_access(self):
         bad_base_url = self.zip_file_base_url.replace(
             self.zip_file_base_url[20:25], "aaaaa"
@@ -1,6 +1,8 @@
 import datetime
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from itertools import groupby
 from math import ceil
 
@@ -21,9 +23,11 @@ from sqlalchemy import String
 from sqlalchemy.sql.expression import literal
 from sqlalchemy.sql.functions import coalesce
 
+from .paths import get_all_content_dir_paths
 from .paths import get_content_file_name
 from .paths import get_content_storage_file_path
 from .paths import using_remote_storage
+from .paths import VALID_STORAGE_FILENAME
 from .sqlalchemybridge import Bridge
 from .sqlalchemybridge import filter_by_uuids
 from kolibri.core.content.apps import KolibriContentConfig
@@ -475,7 +479,78 @@ def _check_file_availability(files):
     return checksums_to_set_available, checksums_to_set_unavailable
 
 
-def set_local_file_availability_from_disk(checksums=None, destination=None):
+def _scandir_names(path, directories=False):
+    """
+    Return the names of the files, or of the directories, in path,
+    or an empty list if path cannot be read.
+    """
+    try:
+        with os.scandir(path) as entries:
+            return [entry.name for entry in entries if entry.is_dir() == directories]
+    except OSError:
+        return []
+
+
+def _list_storage_shard(shard):
+    path, prefix = shard
+    # Only files in the shard directory that their name maps to can be found
+    return [name for name in _scandir_names(path) if name.startswith(prefix)]
+
+
+def _get_storage_shards():
+    shards = []
+    for content_dir in get_all_content_dir_paths():
+        storage_path = os.path.join(content_dir, "storage")
+        for first in _scandir_names(storage_path, directories=True):
+            first_path = os.path.join(storage_path, first)
+            for second in _scandir_names(first_path, directories=True):
+                shards.append((os.path.join(first_path, second), first + second))
+    return shards
+
+
+def get_content_storage_file_names(max_workers=1):
+    """
+    Return the set of file names present in the content storage directories,
+    listing each shard directory once, rather than checking every file individually.
+    If max_workers is greater than one, the shard directories are listed in a thread pool.
+    """
+    shards = _get_storage_shards()
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            listings = list(executor.map(_list_storage_shard, shards))
+    else:
+        listings = map(_list_storage_shard, shards)
+    return set(chain.from_iterable(listings))
+
+
+def _check_file_availability_from_storage_scan(files, max_workers=1):
+    checksums_to_set_available = []
+    checksums_to_set_unavailable = []
+    file_names = get_content_storage_file_names(max_workers=max_workers)
+    for file in files:
+        file_name = get_content_file_name({"id": file[0], "extension": file[2]})
+        if not VALID_STORAGE_FILENAME.match(file_name):
+            continue
+        if file_name in file_names:
+            if not file[1]:
+                checksums_to_set_available.append(file[0])
+        elif file[1]:
+            checksums_to_set_unavailable.append(file[0])
+
+    return checksums_to_set_available, checksums_to_set_unavailable
+
+
+def set_local_file_availability_from_disk(
+    checksums=None, destination=None, scan_storage=False, max_workers=1
+):
+    """
+    Set the availability of LocalFile objects based on whether their files are on disk.
+
+    If scan_storage is True and all files are being checked, the content storage directories
+    are listed up front, and the files diffed against that listing, rather than checking
+    for each file separately, which is much faster on slow storage media.
+    max_workers sets the number of threads used to list the storage directories.
+    """
     if isinstance(checksums, list) and len(checksums) > CHUNKSIZE:
         for i in range(0, len(checksums), CHUNKSIZE):
             set_local_file_availability_from_disk(
@@ -514,9 +589,16 @@ def set_local_file_availability_from_disk(checksums=None, destination=None):
 
     files = connection.execute(query).fetchall()
 
-    checksums_to_set_available, checksums_to_set_unavailable = _check_file_availability(
-        files
-    )
+    if scan_storage and checksums is None and not using_remote_storage():
+        (
+            checksums_to_set_available,
+            checksums_to_set_unavailable,
+        ) = _check_file_availability_from_storage_scan(files, max_workers=max_workers)
+    else:
+        (
+            checksums_to_set_available,
+            checksums_to_set_unavailable,
+        ) = _check_file_availability(files)
 
     bridge.end()
 
@@ -526,38 +608,21 @@ def set_local_file_availability_from_disk(checksums=None, destination=None):
     )
 
 
-def recurse_annotation_up_tree(channel_id):
-    bridge = Bridge(app_name=CONTENT_APP_NAME)
-
-    ContentNodeTable = bridge.get_table(ContentNode)
-
-    connection = bridge.get_connection()
-
-    node_depth = get_channel_node_depth(bridge, channel_id)
-
-    logger.info(
-        "Annotating ContentNode objects with children for {levels} levels".format(
-            levels=node_depth
-        )
-    )
+# Maximum number of MPTT constraints to OR together in a single query,
+# to stay well within the SQLite expression depth limit.
+MPTT_CONSTRAINT_CHUNKSIZE = 100
 
-    child = ContentNodeTable.alias()
 
-    # start a transaction
-
-    trans = connection.begin()
-    start = datetime.datetime.now()
-
-    # Update all leaf ContentNodes to have num_coach_content to 1 or 0
-    # Update all leaf ContentNodes to have on_device_resources to 1 or 0
-    connection.execute(
+def _reset_leaf_annotation(ContentNodeTable, *conditions):
+    # Update leaf ContentNodes to have num_coach_content to 1 or 0
+    # Update leaf ContentNodes to have on_device_resources to 1 or 0
+    return (
         ContentNodeTable.update()
         .where(
             and_(
-                # In this channel
-                ContentNodeTable.c.channel_id == channel_id,
                 # That are not topics
                 ContentNodeTable.c.kind != content_kinds.TOPIC,
+                *conditions
             )
         )
         .values(
@@ -566,15 +631,16 @@ def recurse_annotation_up_tree(channel_id):
         )
     )
 
-    # Before starting set availability to False on all topics.
-    connection.execute(
+
+def _reset_topic_annotation(ContentNodeTable, *conditions):
+    # Set availability to False on topics before propagating availability up the tree.
+    return (
         ContentNodeTable.update()
         .where(
             and_(
-                # In this channel
-                ContentNodeTable.c.channel_id == channel_id,
                 # That are topics
                 ContentNodeTable.c.kind == content_kinds.TOPIC,
+                *conditions
             )
         )
         .values(
@@ -583,6 +649,102 @@ def recurse_annotation_up_tree(channel_id):
         )
     )
 
+
+def _reset_annotation_for_nodes(bridge, connection, channel_id, node_ids):
+    """
+    Reset the annotation of the leaves that are the nodes in node_ids, or their descendants,
+    and of the topics that are their ancestors, which are the only topics whose annotation
+    can be changed by a change to those leaves.
+    Returns the ids of those topics.
+    """
+    ContentNodeTable = bridge.get_table(ContentNode)
+    node_ids = list(node_ids)
+    topic_ids = set()
+    for i in range(0, len(node_ids), CHUNKSIZE):
+        mptt_values = connection.execute(
+            select(
+                [
+                    ContentNodeTable.c.tree_id,
+                    ContentNodeTable.c.parent_id,
+                    ContentNodeTable.c.lft,
+                    ContentNodeTable.c.rght,
+                ]
+            )
+            .order_by(
+                ContentNodeTable.c.tree_id,
+                ContentNodeTable.c.parent_id,
+                ContentNodeTable.c.lft,
+            )
+            .where(
+                and_(
+                    ContentNodeTable.c.channel_id == channel_id,
+                    filter_by_uuids(ContentNodeTable.c.id, node_ids[i : i + CHUNKSIZE]),
+                )
+            )
+        ).fetchall()
+        if not mptt_values:
+            continue
+        descendant_queries = _generate_MPTT_descendants_statement(
+            mptt_values, ContentNodeTable
+        )
+        ancestor_queries = [
+            and_(
+                ContentNodeTable.c.tree_id == tree_id,
+                ContentNodeTable.c.lft < lft,
+                ContentNodeTable.c.rght > rght,
+            )
+            for tree_id, _, lft, rght in mptt_values
+        ]
+        for j in range(0, len(descendant_queries), MPTT_CONSTRAINT_CHUNKSIZE):
+            descendants = or_(*descendant_queries[j : j + MPTT_CONSTRAINT_CHUNKSIZE])
+            connection.execute(
+                _reset_leaf_annotation(
+                    ContentNodeTable,
+                    ContentNodeTable.c.channel_id == channel_id,
+                    descendants,
+                )
+            )
+            topic_ids.update(
+                row[0]
+                for row in connection.execute(
+                    select(ContentNodeTable.c.id).where(
+                        and_(
+                            ContentNodeTable.c.channel_id == channel_id,
+                            ContentNodeTable.c.kind == content_kinds.TOPIC,
+                            descendants,
+                        )
+                    )
+                )
+            )
+        for j in range(0, len(ancestor_queries), MPTT_CONSTRAINT_CHUNKSIZE):
+            topic_ids.update(
+                row[0]
+                for row in connection.execute(
+                    select(ContentNodeTable.c.id).where(
+                        and_(
+                            ContentNodeTable.c.channel_id == channel_id,
+                            or_(*ancestor_queries[j : j + MPTT_CONSTRAINT_CHUNKSIZE]),
+                        )
+                    )
+                )
+            )
+
+    topic_ids = sorted(topic_ids)
+    for i in range(0, len(topic_ids), CHUNKSIZE):
+        connection.execute(
+            _reset_topic_annotation(
+                ContentNodeTable,
+                filter_by_uuids(ContentNodeTable.c.id, topic_ids[i : i + CHUNKSIZE]),
+            )
+        )
+    return topic_ids
+
+
+def _annotate_topics_at_level(bridge, connection, channel_id, level, topic_ids):
+    ContentNodeTable = bridge.get_table(ContentNode)
+
+    child = ContentNodeTable.alias()
+
     # Expression to capture all available child nodes of a contentnode
     available_nodes = select(child.c.available).where(
         and_(
@@ -632,6 +794,87 @@ def recurse_annotation_up_tree(channel_id):
         )
     )
 
+    # Only modify topic availability here
+    statement = (
+        ContentNodeTable.update()
+        .where(
+            and_(
+                ContentNodeTable.c.level == level - 1,
+                ContentNodeTable.c.channel_id == channel_id,
+                ContentNodeTable.c.kind == content_kinds.TOPIC,
+            )
+        )
+        # Because we have set availability to False on all topics as a starting point
+        # we only need to make updates to topics with available children.
+        .where(exists(available_nodes))
+        .values(
+            available=exists(available_nodes),
+            coach_content=coach_content_nodes.scalar_subquery(),
+            num_coach_contents=coach_content_num.scalar_subquery(),
+            on_device_resources=on_device_num.scalar_subquery(),
+        )
+    )
+
+    if topic_ids is None:
+        connection.execute(statement)
+        return
+
+    for i in range(0, len(topic_ids), CHUNKSIZE):
+        connection.execute(
+            statement.where(
+                filter_by_uuids(ContentNodeTable.c.id, topic_ids[i : i + CHUNKSIZE])
+            )
+        )
+
+
+def recurse_annotation_up_tree(channel_id, node_ids=None):
+    """
+    Annotate the topics in a channel with their availability, coach content
+    and the number of resources on the device, based on their descendants.
+    If node_ids is passed, only the leaves that are those nodes, or their descendants,
+    are treated as having changed, and only their ancestor topics are annotated,
+    rather than every topic in the channel.
+    """
+    bridge = Bridge(app_name=CONTENT_APP_NAME)
+
+    ContentNodeTable = bridge.get_table(ContentNode)
+
+    connection = bridge.get_connection()
+
+    node_depth = get_channel_node_depth(bridge, channel_id)
+
+    logger.info(
+        "Annotating ContentNode objects with children for {levels} levels".format(
+            levels=node_depth
+        )
+    )
+
+    # start a transaction
+
+    trans = connection.begin()
+    start = datetime.datetime.now()
+
+    if node_ids is None:
+        topic_ids = None
+        connection.execute(
+            _reset_leaf_annotation(
+                ContentNodeTable,
+                # In this channel
+                ContentNodeTable.c.channel_id == channel_id,
+            )
+        )
+        connection.execute(
+            _reset_topic_annotation(
+                ContentNodeTable,
+                # In this channel
+                ContentNodeTable.c.channel_id == channel_id,
+            )
+        )
+    else:
+        topic_ids = _reset_annotation_for_nodes(
+            bridge, connection, channel_id, node_ids
+        )
+
     # Go from the deepest level to the shallowest
     for level in range(node_depth, 0, -1):
 
@@ -640,26 +883,7 @@ def recurse_annotation_up_tree(channel_id):
                 level=level
             )
         )
-        # Only modify topic availability here
-        connection.execute(
-            ContentNodeTable.update()
-            .where(
-                and_(
-                    ContentNodeTable.c.level == level - 1,
-                    ContentNodeTable.c.channel_id == channel_id,
-                    ContentNodeTable.c.kind == content_kinds.TOPIC,
-                )
-            )
-            # Because we have set availability to False on all topics as a starting point
-            # we only need to make updates to topics with available children.
-            .where(exists(available_nodes))
-            .values(
-                available=exists(available_nodes),
-                coach_content=coach_content_nodes.scalar_subquery(),
-                num_coach_contents=coach_content_num.scalar_subquery(),
-                on_device_resources=on_device_num.scalar_subquery(),
-            )
-        )
+        _annotate_topics_at_level(bridge, connection, channel_id, level, topic_ids)
 
     # commit the transaction
     trans.commit()
@@ -714,15 +938,26 @@ def reannotate_all_channels():
 
 
 def update_content_metadata(
-    channel_id, node_ids=None, exclude_node_ids=None, public=None, admin_imported=None
+    channel_id,
+    node_ids=None,
+    exclude_node_ids=None,
+    public=None,
+    admin_imported=None,
+    incremental=False,
 ):
+    """
+    Annotate the availability of the nodes in node_ids, and their descendants, and of their topics.
+    If incremental is True, only the topics that are ancestors of the nodes in node_ids
+    are reannotated. This should only be used when the rest of the channel's topics
+    are known to be correctly annotated already.
+    """
     set_leaf_node_availability_from_local_file_availability(
         channel_id,
         node_ids=node_ids,
         exclude_node_ids=exclude_node_ids,
         admin_imported=admin_imported,
     )
-    recurse_annotation_up_tree(channel_id)
+    recurse_annotation_up_tree(channel_id, node_ids=node_ids if incremental else None)
     set_channel_metadata_fields(channel_id, public=public)
     ContentCacheKey.update_cache_key()
     # Do this call after refreshing the content cache key
@@ -745,11 +980,13 @@ def set_content_visibility(
         exclude_node_ids=exclude_node_ids,
         public=public,
         admin_imported=admin_imported,
+        # Resources are only imported into channels that have already been annotated
+        incremental=True,
     )
 
 
 def set_content_visibility_from_disk(channel_id):
-    set_local_file_availability_from_disk()
+    set_local_file_availability_from_disk(scan_storage=True)
     update_content_metadata(channel_id)
 
 
@@ -760,7 +997,7 @@ def set_content_invisible(channel_id, node_ids, exclude_node_ids, clear_admin_im
         exclude_node_ids,
         clear_admin_imported=clear_admin_imported,
     )
-    recurse_annotation_up_tree(channel_id)
+    recurse_annotation_up_tree(channel_id, node_ids=node_ids)
     set_channel_metadata_fields(channel_id)
     ContentCacheKey.update_cache_key()
     # Do this call after refreshing the content cache key
@@ -3,10 +3,14 @@ import json
 import logging
 import time
 from itertools import islice
+from operator import attrgetter
+from operator import itemgetter
 
 from django.apps import apps
 from django.db.models.fields.related import ForeignKey
 from sqlalchemy import and_
+from sqlalchemy import BigInteger
+from sqlalchemy import Column
 from sqlalchemy import or_
 from sqlalchemy import String as sa_String
 from sqlalchemy.dialects.postgresql import insert
@@ -38,7 +42,9 @@ from kolibri.core.content.models import File
 from kolibri.core.content.models import Language
 from kolibri.core.content.models import LocalFile
 from kolibri.core.content.utils.annotation import set_channel_ancestors
-from kolibri.core.content.utils.search import annotate_label_bitmasks
+from kolibri.core.content.utils.search import bitmask_label_fieldnames
+from kolibri.core.content.utils.search import get_label_bitmask
+from kolibri.core.content.utils.search_index import update_search_index
 from kolibri.utils.time_utils import local_now
 
 logger = logging.getLogger(__name__)
@@ -140,6 +146,15 @@ class StringIteratorIO(io.TextIOBase):
 
 BATCH_SIZE = 1000
 
+LABEL_BITMASK_SQLITE_FUNCTION = "kolibri_label_bitmask"
+
+# The label bitmask columns are not part of the published content schema that we import to,
+# but are calculated from the labels of each content node as it is imported.
+label_bitmask_columns = {
+    bitmask_field_name: Column(bitmask_field_name, BigInteger)
+    for bitmask_field_name in bitmask_label_fieldnames
+}
+
 
 def _get_dependencies(content_models):
     references = {}
@@ -194,6 +209,40 @@ def get_attribute(obj, key, default):
     return obj.get(key, default)
 
 
+def compile_attribute_getter(record, key):
+    """
+    Return a function that does the equivalent of get_attribute(obj, key, None)
+    for objects of the same shape as record, without rechecking its type each time.
+    """
+    if isinstance(record, dict):
+        return lambda obj: obj.get(key)
+    fields = getattr(record, "_fields", None)
+    if isinstance(fields, tuple) and key in fields:
+        # Database rows and namedtuples can be indexed directly
+        return itemgetter(fields.index(key))
+    if hasattr(record, key):
+        return attrgetter(key)
+    return lambda obj: None
+
+
+def iterate_batches(results, batch_size=BATCH_SIZE):
+    """
+    Yield lists of up to batch_size results. Database results are read with fetchmany,
+    so that a whole table is never held in memory at once.
+    """
+    if hasattr(results, "fetchmany"):
+        batch = results.fetchmany(batch_size)
+        while batch:
+            yield batch
+            batch = results.fetchmany(batch_size)
+    else:
+        results = iter(results)
+        batch = list(islice(results, batch_size))
+        while batch:
+            yield batch
+            batch = list(islice(results, batch_size))
+
+
 class ChannelImport(object):
     """
     The ChannelImport class has two functions:
@@ -208,6 +257,8 @@ class ChannelImport(object):
 
     _sqlite_db_attached = False
 
+    _label_bitmask_function_registered = False
+
     # Specific instructions and exceptions for importing table from previous versions of Kolibri
     # Mappings can be:
     # 1) 'per_row', specifying mappings for an entire row, string can either be an attribute
@@ -413,15 +464,100 @@ class ChannelImport(object):
                 # Otherwise, we can just get the value directly from the record
                 return self.base_row_mapper(record, column)
 
+        # Keep the mappings so that the mapper can be compiled by compile_row_mapper
+        mapper.mappings = mappings
+
         # Return the mapper function for repeated use
         return mapper
 
+    def _compile_column_mapper(self, mappings, column, record):
+        if column not in mappings:
+            return compile_attribute_getter(record, column)
+        # Resolve the mapping in the same order as the mapper from generate_row_mapper
+        col_map = mappings[column]
+        if hasattr(record, col_map):
+            return compile_attribute_getter(record, col_map)
+        if hasattr(self, col_map):
+            mapping = getattr(self, col_map)
+            if callable(mapping):
+                return mapping
+            return lambda record: mapping
+        raise AttributeError(
+            "Column mapping specified but no valid column name or method found"
+        )
+
+    def _wrap_row_mapper(self, row_mapper, column_name):
+        return lambda record: row_mapper(record, column_name)
+
+    def _label_bitmask_mapper(self, bitmask_field_name, label_mapper):
+        # Calculate label bitmasks from the imported labels, rather than importing them
+        return lambda record: get_label_bitmask(
+            bitmask_field_name, label_mapper(record)
+        )
+
+    def add_label_bitmasks_to_row_mapper(self, row_mapper):
+        """
+        Wrap row_mapper so that label bitmask columns are calculated from the labels of each row.
+        """
+
+        def mapper(record, column):
+            if column in bitmask_label_fieldnames:
+                return get_label_bitmask(
+                    column, row_mapper(record, bitmask_label_fieldnames[column])
+                )
+            return row_mapper(record, column)
+
+        return mapper
+
+    def compile_row_mapper(self, row_mapper, columns, record):
+        """
+        Return a function that maps a record to a tuple of values for columns,
+        substituting column defaults for None.
+        How each column value is read is resolved once from record, which should be
+        representative of the records of the table, rather than for every column of
+        every record, when row_mapper was returned by generate_row_mapper.
+        """
+        defaults = [self.get_and_set_column_default(column) for _, column in columns]
+        if row_mapper == self.base_row_mapper or hasattr(row_mapper, "mappings"):
+            mappings = getattr(row_mapper, "mappings", None) or {}
+
+            def get_column_mapper(column_name):
+                return self._compile_column_mapper(mappings, column_name, record)
+
+        else:
+
+            def get_column_mapper(column_name):
+                return self._wrap_row_mapper(row_mapper, column_name)
+
+        column_mappers = []
+        for _, column in columns:
+            if column.name in bitmask_label_fieldnames:
+                column_mappers.append(
+                    self._label_bitmask_mapper(
+                        column.name,
+                        get_column_mapper(bitmask_label_fieldnames[column.name]),
+                    )
+                )
+            else:
+                column_mappers.append(get_column_mapper(column.name))
+        column_mappers_with_defaults = list(zip(column_mappers, defaults))
+
+        def map_row(record):
+            values = []
+            for column_mapper, default in column_mappers_with_defaults:
+                value = column_mapper(record)
+                values.append(default if value is None else value)
+            return tuple(values)
+
+        return map_row
+
     def base_table_mapper(self, SourceTable):
         # If SourceTable is none, then the source table does not exist in the DB
         if SourceTable is not None:
             if self.source_data is not None:
                 return self.source_data.get(SourceTable.name, [])
-            return self.source.execute(select(SourceTable)).fetchall()
+            # Return the result without fetching it all, so that it can be read in batches
+            return self.source.execute(select(SourceTable))
         return []
 
     def base_row_mapper(self, record, column):
@@ -445,17 +581,43 @@ class ChannelImport(object):
         # primary keys are intermediary tables for ManyToMany fields, and so nothing should be Foreign Keying
         # to these ids.
         # By filtering them here, the database should autoset an incremented id.
-        return [
+        columns = [
             (column_name, column_obj)
             for column_name, column_obj in DestinationTable.columns.items()
             if column_not_auto_integer_pk(column_obj)
         ]
+        if DestinationTable.name == ContentNode._meta.db_table:
+            columns.extend(
+                (column_name, column_obj)
+                for column_name, column_obj in label_bitmask_columns.items()
+                if column_name not in DestinationTable.columns
+            )
+        return columns
 
     def _sqlite_method(self, model):
         if model in models_not_to_overwrite:
             return "INSERT OR IGNORE"
         return "INSERT OR REPLACE"
 
+    def _attached_label_bitmask_value(self, col, field_constants, source_table):
+        label_field = bitmask_label_fieldnames[col]
+        if label_field in field_constants:
+            return convert_to_sqlite_value(
+                get_label_bitmask(col, field_constants[label_field])
+            )
+        if label_field in source_table.columns.keys():
+            if not self._label_bitmask_function_registered:
+                # Calculate the bitmasks in the INSERT ... SELECT statement using a Python function,
+                # so that they do not have to be annotated by a separate pass over the imported rows.
+                self.destination.connection.connection.create_function(
+                    LABEL_BITMASK_SQLITE_FUNCTION, 2, get_label_bitmask
+                )
+                self._label_bitmask_function_registered = True
+            return "{function}('{col}', source.{label_field})".format(
+                function=LABEL_BITMASK_SQLITE_FUNCTION, col=col, label_field=label_field
+            )
+        return convert_to_sqlite_value(get_label_bitmask(col, None))
+
     def raw_attached_sqlite_table_import(self, model, table_mapper):
         self.check_cancelled()
 
@@ -490,7 +652,11 @@ class ChannelImport(object):
         # build a list of values (constants or source table column references) to be inserted
         source_vals = []
         for col in dest_columns:
-            if col in field_constants:
+            if col in bitmask_label_fieldnames:
+                val = self._attached_label_bitmask_value(
+                    col, field_constants, source_table
+                )
+            elif col in field_constants:
                 # insert the literal constant value, if we have one
                 val = convert_to_sqlite_value(field_constants[col])
             elif col in source_table.columns.keys():
@@ -529,7 +695,7 @@ class ChannelImport(object):
 
         # wrap column names in parentheses in case names are sql keywords (ex. order)
         dest_columns = ["'{}'".format(col.name) for _, col in columns]
-        source_vals = [":{}".format(col.name) for _, col in columns]
+        source_vals = ["?"] * len(columns)
         # build and execute a raw SQL query to transfer the data in one fell swoop
         query = "{method} INTO {table} ({destcols}) VALUES ({sourcevals})".format(
             method=self._sqlite_method(model),
@@ -538,25 +704,15 @@ class ChannelImport(object):
             sourcevals=", ".join(source_vals),
         )
 
-        def create_data_dict_with_default(record):
-            output = {}
-            for col_name, column_obj in columns:
-                default = self.get_and_set_column_default(column_obj)
-                value = row_mapper(record, column_obj.name)
-                output[col_name] = value if value is not None else default
-            return output
-
         results = table_mapper(SourceTable)
 
-        i = 0
-        results_slice = list(islice(results, i, i + BATCH_SIZE))
-        while results_slice:
+        map_row = None
+        for results_slice in iterate_batches(results):
+            if map_row is None:
+                map_row = self.compile_row_mapper(row_mapper, columns, results_slice[0])
             self.destination.execute(
-                query,
-                [create_data_dict_with_default(record) for record in results_slice],
+                query, [map_row(record) for record in results_slice]
             )
-            i += BATCH_SIZE
-            results_slice = list(islice(results, i, i + BATCH_SIZE))
 
     def get_and_set_column_default(self, column_obj):
         if hasattr(column_obj, "k_memoized_default"):
@@ -595,6 +751,7 @@ class ChannelImport(object):
         cursor = raw_connection.cursor()
 
         results = table_mapper(SourceTable)
+        row_mapper = self.add_label_bitmasks_to_row_mapper(row_mapper)
 
         def generate_data_with_default(record):
             for col_name, column_obj in columns:
@@ -635,9 +792,7 @@ class ChannelImport(object):
 
             pk_name = DestinationTable.primary_key.columns.values()[0].name
 
-            i = 0
-            results_slice = list(islice(results, i, i + BATCH_SIZE))
-            while results_slice:
+            for results_slice in iterate_batches(results):
                 insert_statement = insert(DestinationTable)
                 if do_not_overwrite:
                     self.destination.execute(
@@ -690,9 +845,6 @@ class ChannelImport(object):
                         )
                     )
                     cursor.execute(insert_sql)
-
-                i += BATCH_SIZE
-                results_slice = list(islice(results, i, i + BATCH_SIZE))
         cursor.close()
 
     def can_use_sqlite_attach_method(self, model, table_mapper):
@@ -1005,10 +1157,8 @@ class ChannelImport(object):
                     channel_id=self.channel_id,
                 )
 
-            annotate_label_bitmasks(
-                ContentNode.objects.filter(channel_id=self.channel_id)
-            )
             set_channel_ancestors(self.channel_id)
+            update_search_index(self.channel_id)
 
             channel.save()
 
@@ -1042,6 +1192,20 @@ class NoLearningActivitiesChannelImport(ChannelImport):
     }
 
     def set_learning_activities_from_kind(self, ContentNodeTable):
+        # The label bitmask columns are not in the destination schema, so update them with raw SQL
+        bitmask_field_names = [
+            bitmask_field_name
+            for bitmask_field_name, label_field_name in bitmask_label_fieldnames.items()
+            if label_field_name == "learning_activities"
+        ]
+        bitmask_query = text(
+            "UPDATE {table} SET {assignments} WHERE kind = :kind AND channel_id = :channel_id".format(
+                table=ContentNodeTable.name,
+                assignments=", ".join(
+                    "{name} = :{name}".format(name=name) for name in bitmask_field_names
+                ),
+            )
+        )
         for kind, la in kind_activity_map.items():
             self.destination.execute(
                 ContentNodeTable.update()
@@ -1053,6 +1217,9 @@ class NoLearningActivitiesChannelImport(ChannelImport):
                 )
                 .values(learning_activities=la)
             )
+            params = {name: get_label_bitmask(name, la) for name in bitmask_field_names}
+            params.update(kind=kind, channel_id=self.channel_id)
+            self.destination.execute(bitmask_query, params)
 
 
 class NoVersionChannelImport(NoLearningActivitiesChannelImport):
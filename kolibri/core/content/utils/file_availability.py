@@ -25,10 +25,25 @@ class LocationError(Exception):
     pass
 
 
+# Peers from this version onwards serve the v2 file checksums endpoint
+CHECKSUM_BITSET_VERSION = ">=0.18.0"
+
+
+def generate_checksum_bitset(checksums, available_checksums):
+    """
+    Pack the availability of each checksum into a bitset, with the nth checksum
+    represented by bit n % 8 of byte n // 8.
+    """
+    bitset = bytearray((len(checksums) + 7) // 8)
+    for i, checksum in enumerate(checksums):
+        if checksum in available_checksums:
+            bitset[i >> 3] |= 1 << (i & 7)
+    return bytes(bitset)
+
+
 def generate_checksum_integer_mask(checksums, available_checksums):
-    return sum(
-        int(checksum in available_checksums) << i
-        for i, checksum in enumerate(checksums)
+    return int.from_bytes(
+        generate_checksum_bitset(checksums, available_checksums), "little"
     )
 
 
@@ -38,6 +53,52 @@ def _generate_mask_from_integer(integer_mask):
         integer_mask //= 2
 
 
+def _generate_mask_from_bitset(bitset):
+    for byte in bitset:
+        for bit in range(8):
+            yield bool(byte >> bit & 1)
+
+
+def peer_supports_checksum_bitset(network_location):
+    """
+    Whether the peer can return file availability as a bitset from the v2 file checksums
+    endpoint, rather than only as the decimal encoded integer mask of the v1 endpoint.
+    """
+    return bool(network_location.kolibri_version) and network_location.matches_version(
+        CHECKSUM_BITSET_VERSION
+    )
+
+
+def post_file_checksums(network_location, post):
+    """
+    Request file availability from the file checksums endpoint of a peer, where post is
+    called with whether to request a bitset from the v2 endpoint, and returns the response.
+    If the peer should serve the v2 endpoint but the request fails, as pre-release versions
+    may not, the v1 endpoint is requested instead.
+    Returns a tuple of the response, and whether its content is a bitset.
+    """
+    if peer_supports_checksum_bitset(network_location):
+        try:
+            return post(True), True
+        except NetworkLocationResponseFailure:
+            pass
+    return post(False), False
+
+
+def get_checksums_from_mask(checksums, content, bitset=False):
+    """
+    Return the set of checksums that the content of a file checksums endpoint response
+    marks as available, decoding it as a bitset if requested from the v2 endpoint,
+    or as a decimal encoded integer mask otherwise.
+    Raises a ValueError if an integer mask cannot be parsed.
+    """
+    if bitset:
+        mask = _generate_mask_from_bitset(content)
+    else:
+        mask = _generate_mask_from_integer(int(content))
+    return set(compress(checksums, mask))
+
+
 def get_available_checksums_from_remote(channel_id, peer_id):
     """
     The current implementation prioritizes minimising requests to the remote server.
@@ -47,11 +108,10 @@ def get_available_checksums_from_remote(channel_id, peer_id):
     the local server has changed in the interim.
     """
     try:
-        baseurl = NetworkLocation.objects.values_list("base_url", flat=True).get(
-            id=peer_id
-        )
+        network_location = NetworkLocation.objects.get(id=peer_id)
     except NetworkLocation.DoesNotExist:
         raise LocationError("Peer with id {} does not exist".format(peer_id))
+    baseurl = network_location.base_url
 
     CACHE_KEY = "PEER_AVAILABLE_CHECKSUMS_{baseurl}_{channel_id}".format(
         baseurl=baseurl, channel_id=channel_id
@@ -66,14 +126,22 @@ def get_available_checksums_from_remote(channel_id, peer_id):
             .distinct()
         )
         client = NetworkClient.build_for_address(baseurl)
-        try:
-            response = client.post(
-                get_file_checksums_url(channel_id, baseurl),
-                data=compress_string(
-                    bytes(json.dumps(list(channel_checksums)).encode("utf-8"))
+        data = compress_string(
+            bytes(json.dumps(list(channel_checksums)).encode("utf-8"))
+        )
+
+        def post(bitset):
+            return client.post(
+                get_file_checksums_url(
+                    channel_id, baseurl, version="2" if bitset else "1"
                 ),
+                data=data,
                 headers={"content-type": "application/gzip"},
             )
+
+        bitset = False
+        try:
+            response, bitset = post_file_checksums(network_location, post)
         except NetworkLocationResponseFailure as e:
             response = e.response
 
@@ -82,13 +150,9 @@ def get_available_checksums_from_remote(channel_id, peer_id):
         # Do something if we got a successful return
         if response.status_code == 200:
             try:
-                integer_mask = int(response.content)
-
                 # Filter to avoid passing in bad checksums
-                checksums = set(
-                    compress(
-                        channel_checksums, _generate_mask_from_integer(integer_mask)
-                    )
+                checksums = get_checksums_from_mask(
+                    channel_checksums, response.content, bitset=bitset
                 )
                 process_cache.set(CACHE_KEY, checksums, 3600)
             except (ValueError, TypeError):
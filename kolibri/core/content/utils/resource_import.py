@@ -15,8 +15,9 @@ from kolibri.core.content.utils import annotation
 from kolibri.core.content.utils import paths
 from kolibri.core.content.utils.channels import get_mounted_drive_by_id
 from kolibri.core.content.utils.content_manifest import ContentManifest
-from kolibri.core.content.utils.file_availability import generate_checksum_integer_mask
+from kolibri.core.content.utils.file_availability import get_checksums_from_mask
 from kolibri.core.content.utils.file_availability import LocationError
+from kolibri.core.content.utils.file_availability import post_file_checksums
 from kolibri.core.content.utils.import_export_content import get_import_export_data
 from kolibri.core.content.utils.paths import get_channel_lookup_url
 from kolibri.core.content.utils.paths import get_content_file_name
@@ -28,6 +29,8 @@ from kolibri.core.discovery.utils.network.errors import NetworkLocationResponseF
 from kolibri.core.discovery.utils.network.errors import NetworkLocationResponseTimeout
 from kolibri.core.discovery.well_known import CENTRAL_CONTENT_BASE_INSTANCE_ID
 from kolibri.core.tasks.utils import fd_safe_executor
+from kolibri.core.tasks.utils import fd_safe_max_connections
+from kolibri.core.tasks.utils import fd_safe_max_workers
 from kolibri.core.tasks.utils import JobProgressMixin
 from kolibri.core.utils.urls import reverse_path
 from kolibri.utils import conf
@@ -63,6 +66,10 @@ def lookup_channel_listing_status(channel_id, baseurl=None):
 
 class ResourceImportManagerBase(JobProgressMixin, metaclass=ABCMeta):
     public = None
+    # Allow for two open file descriptors per file transfer:
+    # The temporary download file that the file is streamed to initially, and then
+    # the actual destination file that it is moved to.
+    fds_per_transfer = 2
 
     def __init__(
         self,
@@ -279,10 +286,7 @@ class ResourceImportManagerBase(JobProgressMixin, metaclass=ABCMeta):
             self.transferred_file_size = self.total_bytes_to_transfer
         else:
             self.remaining_bytes_to_transfer = self.total_bytes_to_transfer
-            # Allow for two open file descriptors per download:
-            # The temporary download file that the file is streamed to initially, and then
-            # the actual destination file that it is moved to.
-            with fd_safe_executor(fds_per_task=2) as executor:
+            with fd_safe_executor(fds_per_task=self.fds_per_transfer) as executor:
                 self.executor = executor
                 batch_size = 100
                 # ThreadPoolExecutor allows us to download files concurrently,
@@ -391,7 +395,25 @@ class RemoteResourceImportManagerBase(ResourceImportManagerBase):
             channel_id=channel_id, baseurl=baseurl
         )
 
-        self.session = requests.Session()
+        self.max_connections = fd_safe_max_connections(
+            conf.OPTIONS["Tasks"]["FILE_DOWNLOAD_CONNECTIONS"]
+        )
+        # Each connection of a download has a socket and a chunk file open
+        self.fds_per_transfer = 2 * self.max_connections
+        # Share a session between all file transfers for this import, with a connection
+        # pool large enough for every connection of every concurrent file transfer,
+        # so that connections to the same server are kept alive and reused.
+        self.session = transfer.create_session(
+            pool_size=int(fd_safe_max_workers(fds_per_task=self.fds_per_transfer))
+            * self.max_connections
+        )
+
+    def run_import(self):
+        try:
+            return super(RemoteResourceImportManagerBase, self).run_import()
+        finally:
+            # Close any connections that are being kept alive
+            self.session.close()
 
     def create_file_transfer(self, f, filename, dest):
         url = paths.get_content_storage_remote_url(filename, baseurl=self.baseurl)
@@ -402,6 +424,7 @@ class RemoteResourceImportManagerBase(ResourceImportManagerBase):
             session=self.session,
             cancel_check=self.is_cancelled,
             timeout=self.timeout,
+            max_connections=self.max_connections,
         )
 
 
@@ -587,27 +610,29 @@ class ContentDownloadRequestResourceImportManager(RemoteChannelResourceImportMan
     def run(self):
         node = ContentNode.objects.get(pk=self.download_request.contentnode_id)
         if self.peer.id != CENTRAL_CONTENT_BASE_INSTANCE_ID:
-            required_checksums = (
+            required_checksums = list(
                 node.files.all()
                 .filter(supplementary=False)
                 .values_list("local_file_id", flat=True)
             )
             with NetworkClient.build_from_network_location(self.peer) as client:
-                try:
-                    response = client.post(
+
+                def post(bitset):
+                    return client.post(
                         reverse_path(
                             "kolibri:core:get_public_file_checksums",
-                            kwargs={"version": "v1"},
+                            kwargs={"version": "v2" if bitset else "v1"},
                         ),
-                        json=list(required_checksums),
+                        json=required_checksums,
                     )
-                    integer_mask = int(response.content)
 
-                    expected_mask = generate_checksum_integer_mask(
-                        required_checksums, required_checksums
+                try:
+                    response, bitset = post_file_checksums(self.peer, post)
+                    available_checksums = get_checksums_from_mask(
+                        required_checksums, response.content, bitset=bitset
                     )
 
-                    if integer_mask != expected_mask:
+                    if available_checksums != set(required_checksums):
                         raise ValueError("Checksums do not match")
                 except (
                     ValueError,
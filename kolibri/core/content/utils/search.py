@@ -3,6 +3,7 @@ Avoiding direct model imports in here so that we can import these functions into
 that should not initiate the Django app registry.
 """
 import hashlib
+from functools import lru_cache
 
 try:
     from django.contrib.postgres.aggregates import BitOr
@@ -40,6 +41,9 @@ metadata_bitmasks = {}
 
 bitmask_fieldnames = {}
 
+# Map of each bitmask field name to the name of the label field it is calculated from
+bitmask_label_fieldnames = {}
+
 empty_labels = {
     "languages": [],
     "channels": [],
@@ -52,6 +56,7 @@ for key, labels in metadata_lookup.items():
     while labels[i : i + 64]:
         bitmask_field_name = "{}_bitmask_{}".format(key, i)
         bitmask_fieldnames[bitmask_field_name] = []
+        bitmask_label_fieldnames[bitmask_field_name] = key
         for j, label in enumerate(labels):
             info = {
                 "bitmask_field_name": bitmask_field_name,
@@ -148,6 +153,22 @@ def get_all_contentnode_label_metadata():
     return get_available_metadata_labels(ContentNode.objects.filter(available=True))
 
 
+@lru_cache(maxsize=1024)
+def get_label_bitmask(bitmask_field_name, labels):
+    """
+    Calculate the value of a bitmask field from the comma separated labels of
+    the label field it is derived from, matching labels in the same way as
+    annotate_label_bitmasks, but for a single value rather than a queryset.
+    """
+    if not labels:
+        return 0
+    return sum(
+        info["bits"]
+        for info in bitmask_fieldnames[bitmask_field_name]
+        if info["label"] in labels
+    )
+
+
 def annotate_label_bitmasks(queryset):
     update_statements = {}
     for bitmask_fieldname, label_info in bitmask_fieldnames.items():
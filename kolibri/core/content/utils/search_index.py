@@ -0,0 +1,313 @@
+"""
+Full text search index over ContentNode titles, tags and descriptions.
+
+On SQLite the index is an FTS5 virtual table, on PostgreSQL it is a table of
+weighted tsvector documents with a GIN index. Where SQLite supports it, the FTS5 table
+uses the trigram tokenizer, so that, like unindexed searches, it matches any substring
+of at least three characters, including the middle of words and text in scripts that
+are written without spaces. Otherwise the index only matches word prefixes, and
+searches merge in unindexed matches when the index finds too few. Neither can be expressed as a
+Django model, so the table is managed with raw SQL here, created by a migration,
+populated per channel on channel import and cleared on channel deletion.
+
+If the database does not support full text search (e.g. an SQLite build without
+FTS5) the index is never created and search falls back to unindexed queries.
+
+Avoiding direct model imports in here so that these functions can be used
+from migrations.
+"""
+import logging
+import re
+import sqlite3
+from uuid import UUID
+
+from django.db import connection
+from django.db import DatabaseError
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+logger = logging.getLogger(__name__)
+
+
+SEARCH_INDEX_TABLE = "content_contentnode_search"
+
+# Relative weights of matches in each indexed column when ranking results.
+TITLE_WEIGHT = 10.0
+TAGS_WEIGHT = 5.0
+DESCRIPTION_WEIGHT = 1.0
+
+# The trigram tokenizer was added to FTS5 in SQLite 3.34.0
+TRIGRAM_SQLITE_VERSION = (3, 34, 0)
+# The trigram tokenizer only matches substrings of at least this many characters
+TRIGRAM_LENGTH = 3
+
+_word_re = re.compile(r"\w+", re.UNICODE)
+
+# Cache of whether the index is ready and whether it matches substrings,
+# which are checked on every search.
+_search_index_cache = {}
+
+
+def _tags_subquery(separator_aggregate):
+    return (
+        "(SELECT {aggregate} FROM content_contentnode_tags nt"
+        " INNER JOIN content_contenttag tag ON tag.id = nt.contenttag_id"
+        " WHERE nt.contentnode_id = node.id)"
+    ).format(aggregate=separator_aggregate)
+
+
+def _create_sqlite_index(cursor):
+    if sqlite3.sqlite_version_info >= TRIGRAM_SQLITE_VERSION:
+        tokenize = ", tokenize='trigram'"
+    else:
+        tokenize = ""
+    cursor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+        "contentnode_id UNINDEXED, channel_id UNINDEXED, title, tags, description{tokenize})".format(
+            table=SEARCH_INDEX_TABLE, tokenize=tokenize
+        )
+    )
+    # Persistently configure the rank column to weight the indexed columns.
+    cursor.execute(
+        "INSERT INTO {table}({table}, rank) VALUES ('rank', 'bm25(0.0, 0.0, {title}, {tags}, {description})')".format(
+            table=SEARCH_INDEX_TABLE,
+            title=TITLE_WEIGHT,
+            tags=TAGS_WEIGHT,
+            description=DESCRIPTION_WEIGHT,
+        )
+    )
+
+
+def _create_postgresql_index(cursor):
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS {table} ("
+        "contentnode_id varchar(32) PRIMARY KEY, "
+        "channel_id varchar(32) NOT NULL, "
+        "document tsvector NOT NULL)".format(table=SEARCH_INDEX_TABLE)
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS {table}_channel_id ON {table} (channel_id)".format(
+            table=SEARCH_INDEX_TABLE
+        )
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS {table}_document ON {table} USING GIN (document)".format(
+            table=SEARCH_INDEX_TABLE
+        )
+    )
+
+
+def create_search_index():
+    """
+    Create the search index table, returns False if the database
+    does not support full text search.
+    """
+    _search_index_cache.clear()
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                _create_sqlite_index(cursor)
+            elif connection.vendor == "postgresql":
+                _create_postgresql_index(cursor)
+            else:
+                return False
+    except DatabaseError as e:
+        logger.warning(
+            "Full text search is not supported by this database, "
+            "searches will not be indexed: {}".format(e)
+        )
+        return False
+    return True
+
+
+def drop_search_index():
+    _search_index_cache.clear()
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS {}".format(SEARCH_INDEX_TABLE))
+
+
+def search_index_exists():
+    return SEARCH_INDEX_TABLE in connection.introspection.table_names()
+
+
+def search_index_ready():
+    """
+    Only use the index if it has been populated for content that is
+    in the database. Once it has been, this is cached until index entries are deleted.
+    """
+    if _search_index_cache.get("ready"):
+        return True
+    if not search_index_exists():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM {table} INNER JOIN content_contentnode node"
+            " ON node.id = {table}.contentnode_id LIMIT 1".format(
+                table=SEARCH_INDEX_TABLE
+            )
+        )
+        ready = cursor.fetchone() is not None
+    if ready:
+        _search_index_cache["ready"] = True
+    return ready
+
+
+def search_index_matches_substrings():
+    """
+    Whether the index was created with the trigram tokenizer, and so matches
+    substrings of at least TRIGRAM_LENGTH characters rather than only word prefixes.
+    """
+    if "substrings" not in _search_index_cache:
+        substrings = False
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT sql FROM sqlite_master WHERE name = %s",
+                    [SEARCH_INDEX_TABLE],
+                )
+                row = cursor.fetchone()
+            substrings = row is not None and "trigram" in row[0]
+        _search_index_cache["substrings"] = substrings
+    return _search_index_cache["substrings"]
+
+
+def _channel_filter(channel_id):
+    if channel_id is None:
+        return "", []
+    return " WHERE channel_id = %s", [UUID(str(channel_id)).hex]
+
+
+def delete_search_index(channel_id=None):
+    """
+    Remove the index entries for a channel, or for all channels
+    if no channel_id is passed.
+    """
+    if not search_index_exists():
+        return
+    _search_index_cache.pop("ready", None)
+    where, params = _channel_filter(channel_id)
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM {}{}".format(SEARCH_INDEX_TABLE, where), params)
+
+
+def update_search_index(channel_id=None):
+    """
+    (Re)build the index entries for a channel, or for all channels
+    if no channel_id is passed.
+    """
+    if not search_index_exists():
+        return
+    delete_search_index(channel_id)
+    where, params = _channel_filter(channel_id)
+    if connection.vendor == "postgresql":
+        insert = (
+            "INSERT INTO {table} (contentnode_id, channel_id, document)"
+            " SELECT node.id, node.channel_id,"
+            " setweight(to_tsvector('simple', coalesce(node.title, '')), 'A')"
+            " || setweight(to_tsvector('simple', coalesce({tags}, '')), 'B')"
+            " || setweight(to_tsvector('simple', coalesce(node.description, '')), 'C')"
+            " FROM content_contentnode node{where}"
+        ).format(
+            table=SEARCH_INDEX_TABLE,
+            tags=_tags_subquery("string_agg(tag.tag_name, ' ')"),
+            where=where,
+        )
+    else:
+        insert = (
+            "INSERT INTO {table} (contentnode_id, channel_id, title, tags, description)"
+            " SELECT node.id, node.channel_id, node.title,"
+            " coalesce({tags}, ''), coalesce(node.description, '')"
+            " FROM content_contentnode node{where}"
+        ).format(
+            table=SEARCH_INDEX_TABLE,
+            tags=_tags_subquery("group_concat(tag.tag_name, ' ')"),
+            where=where,
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(insert, params)
+
+
+def _get_terms(words):
+    return [term for word in words for term in _word_re.findall(word)]
+
+
+def build_search_query(words):
+    """
+    Build a full text query that matches any of the passed words, as a substring if
+    the index matches substrings and otherwise as a prefix. Returns None if there is
+    nothing that the index can search for.
+    """
+    terms = _get_terms(words)
+    if search_index_matches_substrings():
+        terms = [term for term in terms if len(term) >= TRIGRAM_LENGTH]
+        if not terms:
+            return None
+        return " OR ".join('"{}"'.format(term) for term in terms)
+    if not terms:
+        return None
+    if connection.vendor == "postgresql":
+        return " | ".join("{}:*".format(term) for term in terms)
+    return " OR ".join('"{}"*'.format(term) for term in terms)
+
+
+def search_query_is_complete(words):
+    """
+    Whether the query built from words matches everything that unindexed substring
+    searches for the words would, so that they do not need to be made as well.
+    """
+    return search_index_matches_substrings() and all(
+        len(term) >= TRIGRAM_LENGTH for term in _get_terms(words)
+    )
+
+
+def search_index_filter(search_query):
+    """
+    Returns a Q object to filter a ContentNode queryset to the nodes matching
+    the search_query, which can be combined with other Q objects.
+    """
+    if connection.vendor == "postgresql":
+        match = "document @@ to_tsquery('simple', %s)"
+    else:
+        match = "{} MATCH %s".format(SEARCH_INDEX_TABLE)
+    return Q(
+        id__in=RawSQL(
+            "SELECT contentnode_id FROM {} WHERE {}".format(SEARCH_INDEX_TABLE, match),
+            [search_query],
+        )
+    )
+
+
+def filter_by_search_index(queryset, search_query, rank=False):
+    """
+    Filter a ContentNode queryset to the nodes matching the search_query
+    using the search index. If rank is True, the queryset is ordered by relevance
+    and a `search_rank` column is selected, which must be included in any `values` call.
+    """
+    where = ["{}.contentnode_id = content_contentnode.id".format(SEARCH_INDEX_TABLE)]
+    select = {}
+    select_params = []
+    if connection.vendor == "postgresql":
+        tsquery = "to_tsquery('simple', %s)"
+        where.append("{}.document @@ {}".format(SEARCH_INDEX_TABLE, tsquery))
+        if rank:
+            select["search_rank"] = "ts_rank({}.document, {})".format(
+                SEARCH_INDEX_TABLE, tsquery
+            )
+            select_params.append(search_query)
+    else:
+        where.append("{table} MATCH %s".format(table=SEARCH_INDEX_TABLE))
+        if rank:
+            # FTS5 rank is lower for better matches, so negate it to sort descending
+            select["search_rank"] = "-{}.rank".format(SEARCH_INDEX_TABLE)
+    queryset = queryset.extra(
+        select=select or None,
+        select_params=select_params or None,
+        tables=[SEARCH_INDEX_TABLE],
+        where=where,
+        params=[search_query],
+    )
+    if rank:
+        queryset = queryset.order_by("-search_rank")
+    return queryset
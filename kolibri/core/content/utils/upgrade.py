@@ -86,7 +86,9 @@ def diff_stats(channel_id, method, drive_id=None, baseurl=None):
         import_manager.end()
 
         # annotate file availability on destination db
-        annotation.set_local_file_availability_from_disk(destination=destination_path)
+        annotation.set_local_file_availability_from_disk(
+            destination=destination_path, scan_storage=True
+        )
         # get the diff count between whats on the default db and the annotated db
         (
             new_resource_ids,
@@ -1,9 +1,12 @@
+import hashlib
 import logging
 import mimetypes
 import os
 import re
+import sys
 import time
 import zipfile
+from contextlib import contextmanager
 from urllib.parse import unquote
 
 import html5lib
@@ -26,6 +29,7 @@ from kolibri.core.content.utils.paths import get_content_storage_file_path
 from kolibri.core.content.utils.paths import get_content_storage_remote_url
 from kolibri.core.content.utils.paths import get_zip_content_base_path
 from kolibri.utils.file_transfer import RemoteFile
+from kolibri.utils.memory_cache import MemoryCache
 from kolibri.utils.urls import validator
 
 
@@ -127,8 +131,67 @@ def parse_html(content):
         return content
 
 
+# The maximum number of zip files to keep open, and the maximum
+# total number of files listed in their parsed central directories.
+ZIPFILE_CACHE_MAX_FILES = 32
+ZIPFILE_CACHE_MAX_MEMBERS = 200000
+
+# Windows does not allow open files to be deleted, which would prevent
+# content from being deleted, so do not keep zip files open there.
+CACHE_ZIPFILES = sys.platform != "win32"
+
+# Open zip files, keyed by path, modification time and size, so that each request for a file
+# embedded in a zip file only has to read that file, and not parse the zip file's central directory.
+# Evicted zip files are not closed here, as a response may still be streaming from them,
+# but they are closed when the last reference to them is released.
+_zipfile_cache = MemoryCache(
+    ZIPFILE_CACHE_MAX_MEMBERS,
+    max_entries=ZIPFILE_CACHE_MAX_FILES,
+    sizeof=lambda zf: len(zf.filelist),
+)
+
+
+def get_zipfile(zipped_path):
+    stat = os.stat(zipped_path)
+    key = (zipped_path, stat.st_mtime_ns, stat.st_size)
+    zf = _zipfile_cache.get(key)
+    if zf is None:
+        zf = zipfile.ZipFile(zipped_path)
+        _zipfile_cache.set(key, zf)
+    return zf
+
+
+@contextmanager
+def open_zipfile(zipped_path):
+    if CACHE_ZIPFILES and not isinstance(zipped_path, RemoteFile):
+        yield get_zipfile(zipped_path)
+    else:
+        # Remote zip files are only partially downloaded, so are not cached
+        with zipfile.ZipFile(zipped_path) as zf:
+            yield zf
+
+
+HTML_CACHE_MAX_SIZE = 10 * 1024 * 1024
+
+# Rewritten HTML files and their ETags, keyed by the zip file name, which is its checksum,
+# and the path of the HTML file within it, so that each is only parsed and rewritten once.
+_html_cache = MemoryCache(HTML_CACHE_MAX_SIZE)
+
+
+def get_rewritten_html(zf, info, zipped_filename):
+    key = (zipped_filename, info.filename)
+    cached = _html_cache.get(key)
+    if cached is None:
+        html = parse_html(zf.open(info).read())
+        if not isinstance(html, bytes):
+            html = html.encode("utf-8")
+        cached = (html, '"{}"'.format(hashlib.md5(html).hexdigest()))
+        _html_cache.set(key, cached, size=len(html))
+    return cached
+
+
 def get_embedded_file(zipped_path, zipped_filename, embedded_filepath):
-    with zipfile.ZipFile(zipped_path) as zf:
+    with open_zipfile(zipped_path) as zf:
         # if no path, or a directory, is being referenced, look for an index.html file
         if not embedded_filepath or embedded_filepath.endswith("/"):
             embedded_filepath += "index.html"
@@ -151,14 +214,18 @@ def get_embedded_file(zipped_path, zipped_filename, embedded_filepath):
             mimetypes.guess_type(embedded_filepath)[0] or "application/octet-stream"
         )
         if embedded_filepath.endswith("htm") or embedded_filepath.endswith("html"):
-            content = zf.open(info).read()
-            html = parse_html(content)
+            html, etag = get_rewritten_html(zf, info, zipped_filename)
             response = HttpResponse(html, content_type=content_type)
             file_size = len(response.content)
         else:
             # generate a streaming response object, pulling data from within the zip file
             response = FileResponse(zf.open(info), content_type=content_type)
             file_size = info.file_size
+            # The zip file name is its checksum, so this uniquely identifies the embedded file
+            etag = '"{}-{:08x}-{}"'.format(
+                os.path.splitext(zipped_filename)[0], info.CRC, info.file_size
+            )
+        response.headers["ETag"] = etag
 
         # set the content-length header to the size of the embedded file
         if file_size:
@@ -275,7 +342,7 @@ def _zip_content_from_request(request):  # noqa: C901
     )
     cached_response = cache.get(CACHE_KEY)
     if cached_response is not None:
-        return cached_response
+        return not_modified_response(request, cached_response) or cached_response
 
     try:
         response = get_embedded_file(zipped_path, zipped_filename, embedded_filepath)
@@ -288,6 +355,10 @@ def _zip_content_from_request(request):  # noqa: C901
             )
         raise
 
+    not_modified = not_modified_response(request, response)
+    if not_modified is not None:
+        return not_modified
+
     # ensure the browser knows not to try byte-range requests, as we don't support them here
     response.headers["Accept-Ranges"] = "none"
 
@@ -302,6 +373,25 @@ def _zip_content_from_request(request):  # noqa: C901
     return response
 
 
+def not_modified_response(request, response):
+    """
+    Returns a 304 response if the client already has the version of
+    the response identified by its ETag, otherwise None.
+    """
+    etag = response.get("ETag")
+    if etag is None:
+        return None
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH", "")
+    if etag not in (tag.strip() for tag in if_none_match.split(",")):
+        return None
+    if response.streaming:
+        # Release the embedded file that was going to be streamed
+        response.close()
+    not_modified = HttpResponseNotModified()
+    not_modified.headers["ETag"] = etag
+    return not_modified
+
+
 def generate_zip_content_response(environ):
     request = WSGIRequest(environ)
     response = _zip_content_from_request(request)
@@ -30,6 +30,12 @@ class Command(BaseCommand):
                 "is created in the default location ~/.kolibri/backups"
             ),
         )
+        parser.add_argument(
+            "--compress",
+            action="store_true",
+            dest="compress",
+            help="Compress the backup with gzip",
+        )
 
     def handle(self, *args, **options):
 
@@ -49,7 +55,11 @@ class Command(BaseCommand):
 
         dest_folder = options.get("dest_folder", None)
 
-        backup = dbbackup(kolibri.__version__, dest_folder=dest_folder)
+        backup = dbbackup(
+            kolibri.__version__,
+            dest_folder=dest_folder,
+            compress=options["compress"],
+        )
         self.stdout.write(
             self.style.SUCCESS("Backed up database to: {path}".format(path=backup))
         )
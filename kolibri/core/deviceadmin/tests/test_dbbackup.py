@@ -1,7 +1,9 @@
 import os
+import tarfile
 import tempfile
 
 import pytest
+from django.conf import settings
 from django.core.management import call_command
 from mock import patch
 
@@ -47,6 +49,25 @@ def test_inactive_kolibri():
         assert os.path.getsize(os.path.join(dest_folder, files[0])) > 1000
 
 
+@pytest.mark.django_db(transaction=True)
+def test_backup_all_databases():
+    """
+    Tests that the backup contains a copy of each SQLite database
+    """
+    if not is_sqlite_settings():
+        return
+
+    dest_folder = tempfile.mkdtemp()
+    backup = dbbackup("0.0.1", dest_folder=dest_folder)
+    with tarfile.open(backup) as backup_file:
+        names = backup_file.getnames()
+    assert sorted(names) == sorted(
+        "{}.sqlite3".format(alias) for alias in settings.DATABASES
+    )
+    os.remove(backup)
+    os.rmdir(dest_folder)
+
+
 def test_not_sqlite():
     if is_sqlite_settings():
         return
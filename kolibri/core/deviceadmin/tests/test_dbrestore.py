@@ -1,5 +1,6 @@
 import os
 import random
+import tarfile
 import tempfile
 
 import pytest
@@ -220,6 +221,129 @@ def test_restore_from_file_to_file():
     _clear_backups(dest_folder)
 
 
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.filterwarnings("ignore:Overriding setting DATABASES")
+def test_restore_from_compressed_file_to_memory():
+    """
+    Restores from a compressed backup to a database stored in memory and reads contents
+    from the new database.
+    """
+    if not is_sqlite_settings():
+        return
+    with patch("kolibri.utils.server.get_status", side_effect=mock_status_not_running):
+        from kolibri.core.auth.models import Facility
+
+        Facility.objects.create(name="test compressed", kind=FACILITY)
+        dest_folder = tempfile.mkdtemp()
+        backup = dbbackup(kolibri.__version__, dest_folder=dest_folder, compress=True)
+
+        with override_settings(DATABASES=MOCK_DATABASES):
+            with patch("django.db.connections", ConnectionHandler()):
+                call_command("dbrestore", backup)
+                assert (
+                    Facility.objects.filter(
+                        name="test compressed", kind=FACILITY
+                    ).count()
+                    == 1
+                )
+    _clear_backups(dest_folder)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.filterwarnings("ignore:Overriding setting DATABASES")
+def test_backup_and_restore_without_backup_api():
+    """
+    Backs up to a dump file of SQL statements, and restores from it, where SQLite's
+    backup API is not available.
+    """
+    if not is_sqlite_settings():
+        return
+    with patch(
+        "kolibri.utils.server.get_status", side_effect=mock_status_not_running
+    ), patch("kolibri.core.deviceadmin.utils.backup_api_available", return_value=False):
+        from kolibri.core.auth.models import Facility
+
+        Facility.objects.create(name="test no backup api", kind=FACILITY)
+        dest_folder = tempfile.mkdtemp()
+        backup = dbbackup(kolibri.__version__, dest_folder=dest_folder)
+        assert not tarfile.is_tarfile(backup)
+
+        with override_settings(DATABASES=MOCK_DATABASES):
+            with patch("django.db.connections", ConnectionHandler()):
+                call_command("dbrestore", backup)
+                assert (
+                    Facility.objects.filter(
+                        name="test no backup api", kind=FACILITY
+                    ).count()
+                    == 1
+                )
+    _clear_backups(dest_folder)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.filterwarnings("ignore:Overriding setting DATABASES")
+def test_restore_from_file_without_backup_api():
+    """
+    Restores from a backup file made with SQLite's backup API, where the API is
+    not available.
+    """
+    if not is_sqlite_settings():
+        return
+    with patch("kolibri.utils.server.get_status", side_effect=mock_status_not_running):
+        from kolibri.core.auth.models import Facility
+
+        Facility.objects.create(name="test restore no api", kind=FACILITY)
+        dest_folder = tempfile.mkdtemp()
+        backup = dbbackup(kolibri.__version__, dest_folder=dest_folder)
+
+        with override_settings(DATABASES=MOCK_DATABASES), patch(
+            "kolibri.core.deviceadmin.utils.backup_api_available", return_value=False
+        ):
+            with patch("django.db.connections", ConnectionHandler()):
+                call_command("dbrestore", backup)
+                assert (
+                    Facility.objects.filter(
+                        name="test restore no api", kind=FACILITY
+                    ).count()
+                    == 1
+                )
+    _clear_backups(dest_folder)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.filterwarnings("ignore:Overriding setting DATABASES")
+def test_restore_from_sql_dump_to_memory():
+    """
+    Restores from a dump file of SQL statements, as created by previous versions,
+    to a database stored in memory and reads contents from the new database.
+    """
+    if not is_sqlite_settings():
+        return
+    with patch("kolibri.utils.server.get_status", side_effect=mock_status_not_running):
+        from django import db
+        from kolibri.core.auth.models import Facility
+
+        Facility.objects.create(name="test dump", kind=FACILITY)
+        dest_folder = tempfile.mkdtemp()
+        backup = os.path.join(
+            dest_folder, "db-v{}_2015-08-02_00-00-00.dump".format(kolibri.__version__)
+        )
+        if not db.connections["default"].connection:
+            db.connections["default"].connect()
+        with open(backup, "w", encoding="utf-8") as f:
+            for line in db.connections["default"].connection.iterdump():
+                f.write(line)
+
+        with override_settings(DATABASES=MOCK_DATABASES):
+            with patch("django.db.connections", ConnectionHandler()):
+                call_command("dbrestore", backup)
+                assert (
+                    Facility.objects.filter(name="test dump", kind=FACILITY).count()
+                    == 1
+                )
+    _clear_backups(dest_folder)
+
+
 def test_search_latest():
 
     search_root = tempfile.mkdtemp()
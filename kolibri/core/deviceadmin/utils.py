@@ -2,6 +2,10 @@ import io
 import logging
 import os
 import re
+import shutil
+import sqlite3
+import tarfile
+import tempfile
 from datetime import datetime
 
 from django import db
@@ -22,6 +26,14 @@ logger = logging.getLogger(__name__)
 KWARGS_IO_READ = {"mode": "r", "encoding": "utf-8"}
 KWARGS_IO_WRITE = {"mode": "w", "encoding": "utf-8"}
 
+# Number of database pages to copy in each step of a backup or restore,
+# which is 100MB with the default page size of 4096 bytes.
+BACKUP_PAGES_PER_STEP = 25600
+
+# Backup files are tar archives holding a copy of each SQLite database,
+# named after the alias of the database.
+BACKUP_MEMBER_SUFFIX = ".sqlite3"
+
 
 def default_backup_folder():
     return os.path.join(KOLIBRI_HOME, "backups")
@@ -69,12 +81,51 @@ def is_full_version(fname):
     return fname.startswith("db-v{}_".format(full_version))
 
 
-def dbbackup(old_version, dest_folder=None):
+def _sqlite_aliases():
+    return [
+        alias
+        for alias in db.connections
+        if "sqlite3" in db.connections[alias].settings_dict["ENGINE"]
+    ]
+
+
+def _get_sqlite_connection(alias):
+    # If the connection hasn't been opened yet, then open it
+    if not db.connections[alias].connection:
+        db.connections[alias].connect()
+    return db.connections[alias].connection
+
+
+def backup_api_available():
+    """
+    SQLite's online backup API is only available from Python 3.7
+    """
+    return hasattr(sqlite3.Connection, "backup")
+
+
+def _log_progress(action, alias):
+    def progress(status, remaining, total):
+        logger.info(
+            "{} {} database: {} of {} pages".format(
+                action, alias, total - remaining, total
+            )
+        )
+
+    return progress
+
+
+def dbbackup(old_version, dest_folder=None, compress=False):
     """
     Sqlite3 only
 
-    Backup database to dest_folder. Uses SQLite's built in iterdump():
-    https://docs.python.org/3/library/sqlite3.html#sqlite3.Connection.iterdump
+    Backup databases to dest_folder. Uses SQLite's online backup API to copy each
+    database page by page:
+    https://docs.python.org/3/library/sqlite3.html#sqlite3.Connection.backup
+
+    The copies of the default database and of the additional SQLite databases
+    are stored together in a tar archive, which is gzip compressed if compress is True.
+    Where the backup API is not available, the default database is instead written
+    to a dump file of SQL statements, as by previous versions.
 
     Notice that it's important to add at least version and date to the path
     of the backup, otherwise you risk that upgrade activities carried out on
@@ -103,48 +154,137 @@ def dbbackup(old_version, dest_folder=None):
 
     backup_path = os.path.join(dest_folder, fname)
 
+    if not backup_api_available():
+        logger.info(
+            "SQLite backup API not available, backing up the default database as SQL"
+        )
+        _write_sql_dump(backup_path)
+        return backup_path
+
+    with tarfile.open(backup_path, "w:gz" if compress else "w") as backup_file:
+        for alias in _sqlite_aliases():
+            # Copy each database into a temporary file first, as the size of each
+            # member of the archive must be known before it is written.
+            fd, copy_path = tempfile.mkstemp(
+                suffix=BACKUP_MEMBER_SUFFIX, dir=dest_folder
+            )
+            os.close(fd)
+            try:
+                copy = sqlite3.connect(copy_path)
+                try:
+                    _get_sqlite_connection(alias).backup(
+                        copy,
+                        pages=BACKUP_PAGES_PER_STEP,
+                        progress=_log_progress("Backing up", alias),
+                    )
+                finally:
+                    copy.close()
+                backup_file.add(copy_path, arcname=alias + BACKUP_MEMBER_SUFFIX)
+            finally:
+                os.remove(copy_path)
+
+    return backup_path
+
+
+def _write_sql_dump(backup_path):
+    """
+    Writes the default database to a dump file containing SQL statements,
+    using SQLite's built in iterdump().
+    """
     # Setting encoding=utf-8: io.open() is Python 2 compatible
     # See: https://github.com/learningequality/kolibri/issues/2875
     with io.open(backup_path, **KWARGS_IO_WRITE) as f:
-        # If the connection hasn't been opened yet, then open it
-        if not db.connections["default"].connection:
-            db.connections["default"].connect()
-        for line in db.connections["default"].connection.iterdump():
+        for line in _get_sqlite_connection("default").iterdump():
             f.write(line)
+            f.write("\n")
 
-    return backup_path
+
+def _execute_sql_dump(alias, sql):
+    """
+    Replaces the contents of a database with those of a dump of SQL statements.
+    """
+    dst_file = db.connections[alias].settings_dict["NAME"]
+
+    # Close connection
+    db.connections[alias].close()
+
+    # Wipe current database file
+    if not db.connections[alias].is_in_memory_db():
+        with open(dst_file, "w") as f:
+            f.truncate()
+    else:
+        logger.info("In memory database, not truncating: {}".format(dst_file))
+
+    db.connections[alias].connect()
+    db.connections[alias].connection.execute("PRAGMA foreign_keys=OFF")
+    db.connections[alias].connection.executescript(sql)
+    db.connections[alias].connection.execute("PRAGMA foreign_keys=ON")
+
+
+def _restore_sql_dump(from_file):
+    """
+    Restores the default database from a dump file containing SQL statements,
+    as created by previous versions of dbbackup.
+    """
+    # Close connections
+    db.connections.close_all()
+
+    with io.open(from_file, **KWARGS_IO_READ) as f:
+        _execute_sql_dump("default", f.read())
+
+
+def _restore_database(backup_file, member, alias):
+    dst_file = db.connections[alias].settings_dict["NAME"]
+    if db.connections[alias].is_in_memory_db():
+        copy_dir = None
+    else:
+        copy_dir = os.path.dirname(os.path.abspath(dst_file))
+    fd, copy_path = tempfile.mkstemp(suffix=BACKUP_MEMBER_SUFFIX, dir=copy_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            shutil.copyfileobj(backup_file.extractfile(member), f)
+        copy = sqlite3.connect(copy_path)
+        try:
+            if backup_api_available():
+                copy.backup(
+                    _get_sqlite_connection(alias),
+                    pages=BACKUP_PAGES_PER_STEP,
+                    progress=_log_progress("Restoring", alias),
+                )
+            else:
+                _execute_sql_dump(alias, "\n".join(copy.iterdump()))
+        finally:
+            copy.close()
+    finally:
+        os.remove(copy_path)
 
 
 def dbrestore(from_file):
     """
     Sqlite3 only
 
-    Restores the database given a special database dump file containing SQL
-    statements.
+    Restores the databases from a backup file created by dbbackup, or the default
+    database from a dump file containing SQL statements created by previous versions.
     """
 
     if "sqlite3" not in settings.DATABASES["default"]["ENGINE"]:
         raise IncompatibleDatabase()
 
-    dst_file = settings.DATABASES["default"]["NAME"]
-
-    # Close connections
-    db.connections.close_all()
-
-    # Wipe current database file
-    if not db.connections["default"].is_in_memory_db():
-        with open(dst_file, "w") as f:
-            f.truncate()
+    if tarfile.is_tarfile(from_file):
+        # Close connections
+        db.connections.close_all()
+        aliases = _sqlite_aliases()
+        with tarfile.open(from_file, "r:*") as backup_file:
+            for member in backup_file:
+                alias = member.name[: -len(BACKUP_MEMBER_SUFFIX)]
+                if alias not in aliases:
+                    logger.info(
+                        "Skipping backup of unknown database: {}".format(member.name)
+                    )
+                    continue
+                _restore_database(backup_file, member, alias)
     else:
-        logger.info("In memory database, not truncating: {}".format(dst_file))
-
-    # Setting encoding=utf-8: io.open() is Python 2 compatible
-    # See: https://github.com/learningequality/kolibri/issues/2875
-    with open(from_file, **KWARGS_IO_READ) as f:
-        db.connections["default"].connect()
-        db.connections["default"].connection.execute("PRAGMA foreign_keys=OFF")
-        db.connections["default"].connection.executescript(f.read())
-        db.connections["default"].connection.execute("PRAGMA foreign_keys=ON")
+        _restore_sql_dump(from_file)
 
     # Finally, it's okay to import models and open database connections.
     # We need this to avoid generating records with identical 'Instance ID'
@@ -1,7 +1,6 @@
 import logging
 from datetime import timedelta
 from itertools import groupby
-from math import ceil
 from random import randint
 
 from django.core.exceptions import PermissionDenied
@@ -51,6 +50,8 @@ from kolibri.core.logger.constants import interaction_types
 from kolibri.core.logger.constants.exercise_attempts import MAPPING
 from kolibri.core.logger.evaluation import attempts_diff
 from kolibri.core.logger.evaluation import LOG_ORDER_BY
+from kolibri.core.logger.write_behind import normalize_progress
+from kolibri.core.logger.write_behind import progress_queue
 from kolibri.core.notifications.api import create_summarylog
 from kolibri.core.notifications.api import parse_attemptslog
 from kolibri.core.notifications.api import parse_summarylog
@@ -243,7 +244,8 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
         """
         return None
 
-    def _precache_dataset_id(self, user):
+    @staticmethod
+    def _precache_dataset_id(user):
         if user is None or user.is_anonymous:
             return
         key = ContentSessionLog.get_related_dataset_cache_key(
@@ -251,7 +253,8 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
         )
         dataset_cache.set(key, user.dataset_id)
 
-    def _check_quiz_permissions(self, user, quiz_id):
+    @staticmethod
+    def _check_quiz_permissions(user, quiz_id):
         if user.is_anonymous:
             raise PermissionDenied("Cannot access a quiz if not logged in")
         if not Exam.objects.filter(
@@ -406,6 +409,11 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
             request.user, serializer.validated_data
         )
 
+        if not request.user.is_anonymous:
+            # Save any progress on this content that is held in memory,
+            # so that the progress and extra_fields returned are up to date
+            progress_queue.flush_content(request.user, content_id)
+
         with transaction.atomic(), dataset_cache:
 
             user = None if request.user.is_anonymous else request.user
@@ -461,7 +469,8 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
                 quiz_started_notification, masterylog, context["quiz_id"]
             )
 
-    def _check_quiz_log_permissions(self, masterylog):
+    @staticmethod
+    def _check_quiz_log_permissions(masterylog):
         if (
             masterylog
             and masterylog.complete
@@ -595,14 +604,16 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
             "correct": validated_data["correct"],
         }
 
-    def _process_masterylog_completed_notification(self, masterylog, context):
+    @staticmethod
+    def _process_masterylog_completed_notification(masterylog, context):
         if "quiz_id" in context:
             wrap_to_save_queue(
                 quiz_completed_notification, masterylog, context["quiz_id"]
             )
 
+    @classmethod
     def _update_and_return_mastery_log_id(
-        self, user, complete, time_spent_delta, summarylog_id, end_timestamp, context
+        cls, user, complete, time_spent_delta, summarylog_id, end_timestamp, context
     ):
         if not user.is_anonymous and context["mastery_level"] is not None:
             try:
@@ -624,9 +635,9 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
                         "complete",
                         "completion_timestamp",
                     )
-                    self._process_masterylog_completed_notification(masterylog, context)
+                    cls._process_masterylog_completed_notification(masterylog, context)
                 else:
-                    self._check_quiz_log_permissions(masterylog)
+                    cls._check_quiz_log_permissions(masterylog)
                 if update_fields:
                     if end_timestamp:
                         masterylog.end_timestamp = end_timestamp
@@ -784,7 +795,8 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
                 quiz_answered_notification, attemptlog, context["quiz_id"]
             )
 
-    def _get_session_log(self, session_id, user):
+    @staticmethod
+    def _get_session_log(session_id, user):
         try:
             if user.is_anonymous:
                 return ContentSessionLog.objects.get(id=session_id, user__isnull=True)
@@ -795,31 +807,31 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
                 "ContentSessionLog with id {} does not exist".format(session_id)
             )
 
-    def _normalize_progress(self, progress):
-        # Round progress to three decimal places
-        # but always rounding up.
-        progress = ceil(progress * 1000) / float(1000)
-        return max(0, min(1.0, progress))
+    @staticmethod
+    def _normalize_progress(progress):
+        return normalize_progress(progress)
 
-    def _update_content_log(self, log, end_timestamp, validated_data):
+    @classmethod
+    def _update_content_log(cls, log, end_timestamp, validated_data):
         update_fields = ("end_timestamp", "_morango_dirty_bit")
 
         log.end_timestamp = end_timestamp
         if "progress_delta" in validated_data:
             update_fields += ("progress",)
-            log.progress = self._normalize_progress(
+            log.progress = cls._normalize_progress(
                 log.progress + validated_data["progress_delta"]
             )
         elif "progress" in validated_data:
             update_fields += ("progress",)
-            log.progress = self._normalize_progress(validated_data["progress"])
+            log.progress = cls._normalize_progress(validated_data["progress"])
         if "time_spent_delta" in validated_data:
             update_fields += ("time_spent",)
             log.time_spent += validated_data["time_spent_delta"]
         return update_fields
 
+    @classmethod
     def _update_summary_log(
-        self, user, sessionlog, end_timestamp, validated_data, context
+        cls, user, sessionlog, end_timestamp, validated_data, context
     ):
         if user.is_anonymous:
             return
@@ -828,14 +840,14 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
         )
         was_complete = summarylog.progress >= 1
 
-        update_fields = self._update_content_log(
+        update_fields = cls._update_content_log(
             summarylog, end_timestamp, validated_data
         )
 
         if summarylog.progress >= 1 and not was_complete:
             summarylog.completion_timestamp = end_timestamp
             update_fields += ("completion_timestamp",)
-            self._process_completed_notification(summarylog, context)
+            cls._process_completed_notification(summarylog, context)
         if "extra_fields" in validated_data:
             update_fields += ("extra_fields",)
             summarylog.extra_fields = validated_data["extra_fields"]
@@ -843,20 +855,21 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
         summarylog.save(update_fields=update_fields)
         return summarylog
 
-    def _update_session(self, session_id, user, end_timestamp, validated_data):
-        sessionlog = self._get_session_log(session_id, user)
+    @classmethod
+    def _update_session(cls, session_id, user, end_timestamp, validated_data):
+        sessionlog = cls._get_session_log(session_id, user)
 
         context = LogContext(**sessionlog.extra_fields.get("context", {}))
 
         if "quiz_id" in context:
-            self._check_quiz_permissions(user, context["quiz_id"])
+            cls._check_quiz_permissions(user, context["quiz_id"])
 
-        update_fields = self._update_content_log(
+        update_fields = cls._update_content_log(
             sessionlog, end_timestamp, validated_data
         )
         sessionlog.save(update_fields=update_fields)
 
-        summarylog = self._update_summary_log(
+        summarylog = cls._update_summary_log(
             user, sessionlog, end_timestamp, validated_data, context
         )
 
@@ -867,13 +880,72 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
 
         return {"complete": complete}, summarylog.id if summarylog else None, context
 
-    def _process_completed_notification(self, summarylog, context):
+    @staticmethod
+    def _process_completed_notification(summarylog, context):
         if "node_id" in context:
             wrap_to_save_queue(
                 parse_summarylog,
                 summarylog,
             )
 
+    def _get_write_behind_state(self, session_id, user):
+        sessionlog = self._get_session_log(session_id, user)
+        context = LogContext(**sessionlog.extra_fields.get("context", {}))
+        if "quiz_id" in context:
+            # Quiz permissions must be checked as each update is made
+            return None
+        if user.is_anonymous:
+            return sessionlog.content_id, context, sessionlog.progress
+        try:
+            summarylog = ContentSummaryLog.objects.get(
+                content_id=sessionlog.content_id, user=user
+            )
+        except ContentSummaryLog.DoesNotExist:
+            return None
+        return sessionlog.content_id, context, summarylog.progress
+
+    @classmethod
+    def _apply_write_behind_update(cls, pending_session):
+        cls._precache_dataset_id(pending_session.user)
+        output, summarylog_id, context = cls._update_session(
+            pending_session.session_id,
+            pending_session.user,
+            pending_session.end_timestamp,
+            pending_session.validated_data,
+        )
+        cls._update_and_return_mastery_log_id(
+            pending_session.user,
+            output["complete"],
+            pending_session.validated_data.get("time_spent_delta"),
+            summarylog_id,
+            pending_session.end_timestamp,
+            context,
+        )
+
+    def _write_behind_update(self, session_id, user, end_timestamp, validated_data):
+        """
+        Hold the update in memory to be saved with other updates, if write behind is enabled,
+        returning the response output, or None if the update must be saved now.
+        """
+        if not progress_queue.enabled:
+            return None
+        if "interactions" in validated_data:
+            # Attempts are returned in the response, so they must be saved now,
+            # after any earlier updates to the session.
+            progress_queue.flush(session_id)
+            return None
+        progress = progress_queue.add(
+            session_id,
+            user,
+            validated_data,
+            end_timestamp,
+            self._get_write_behind_state,
+        )
+        if progress is None:
+            progress_queue.flush(session_id)
+            return None
+        return {"complete": progress >= 1}
+
     def update(self, request, pk=None):
         """
         Make a PUT request to update the current session
@@ -907,6 +979,12 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
         end_timestamp = local_now()
         validated_data = serializer.validated_data
 
+        output = self._write_behind_update(
+            pk, request.user, end_timestamp, validated_data
+        )
+        if output is not None:
+            return Response(output)
+
         with transaction.atomic(), dataset_cache:
             self._precache_dataset_id(request.user)
 
@@ -934,6 +1012,10 @@ class ProgressTrackingViewSet(viewsets.GenericViewSet):
             return Response(output)
 
 
+# Progress updates held in memory are saved in the same way as updates saved directly
+progress_queue.apply_update = ProgressTrackingViewSet._apply_write_behind_update
+
+
 class TotalContentProgressViewSet(viewsets.GenericViewSet):
     def get_serializer_class(self):
         """
@@ -7,4 +7,5 @@ class KolibriLoggerConfig(AppConfig):
     verbose_name = "Kolibri Logger"
 
     def ready(self):
-        pass
+        from .signals import invalidate_attemptlog_status_rollup  # noqa: F401
+        from .signals import invalidate_masterylog_status_rollup  # noqa: F401
@@ -32,6 +32,9 @@ CSV_EXPORT_FILENAMES = {
 
 CACHE_TIMEOUT = 60 * 10
 
+# Number of log rows to read from the database at a time when writing the CSV file
+CSV_EXPORT_CHUNK_SIZE = 2000
+
 
 def _optional_node_id(item):
     if (
@@ -109,6 +112,56 @@ def get_cached_ancestors(content_id):
     return ancestors
 
 
+class ContentMetadata(object):
+    """
+    Titles, ancestors and channel names for all the content referenced by a queryset of logs,
+    fetched in bulk up front, rather than looked up for each log.
+    """
+
+    def __init__(self, queryset):
+        self.nodes_by_id = {}
+        self.nodes_by_content = {}
+        nodes = (
+            ContentNode.objects.filter(content_id__in=queryset.values("content_id"))
+            .order_by("lft")
+            .values("id", "content_id", "channel_id", "title", "ancestors")
+        )
+        for node in nodes.iterator(chunk_size=CSV_EXPORT_CHUNK_SIZE):
+            data = (node["title"], node["ancestors"])
+            self.nodes_by_id[node["id"]] = data
+            # Match the first node that ContentNode.objects.filter(...).first() would return
+            self.nodes_by_content.setdefault(
+                (node["content_id"], node["channel_id"]), data
+            )
+        self.channel_names = dict(
+            ChannelMetadata.objects.filter(
+                id__in=queryset.values("channel_id")
+            ).values_list("id", "name")
+        )
+
+    def get_content_data(self, item):
+        node_id = _optional_node_id(item)
+        if node_id:
+            if node_id in self.nodes_by_id:
+                return self.nodes_by_id[node_id]
+            # The node may not share the content_id of the log, so look it up directly
+            return get_cached_content_data(item)
+        return self.nodes_by_content.get(
+            (item["content_id"], item["channel_id"]), ("", [])
+        )
+
+    def get_content_title(self, item):
+        title, _ = self.get_content_data(item)
+        return title
+
+    def get_ancestors(self, item):
+        _, ancestors = self.get_content_data(item)
+        return ancestors
+
+    def get_channel_name(self, item):
+        return self.channel_names.get(item["channel_id"], "")
+
+
 mappings = {
     "channel_name": get_cached_channel_name,
     "content_title": get_cached_content_title,
@@ -183,9 +236,20 @@ def add_ancestors_info(row, ancestors, max_depth):
     )
 
 
-def map_object(item, topic_headers_length):
-    mapped_item = output_mapper(item, labels=labels, output_mappings=mappings)
-    ancestors = get_cached_ancestors(item)
+def map_object(item, topic_headers_length, content_metadata=None):
+    if content_metadata is None:
+        mapped_item = output_mapper(item, labels=labels, output_mappings=mappings)
+        ancestors = get_cached_ancestors(item)
+    else:
+        output_mappings = dict(
+            mappings,
+            channel_name=content_metadata.get_channel_name,
+            content_title=content_metadata.get_content_title,
+        )
+        mapped_item = output_mapper(
+            item, labels=labels, output_mappings=output_mappings
+        )
+        ancestors = content_metadata.get_ancestors(item)
     add_ancestors_info(mapped_item, ancestors, topic_headers_length)
     return mapped_item
 
@@ -285,14 +349,18 @@ def csv_file_generator(
         label for _, label in topic_headers
     ]
 
+    content_metadata = ContentMetadata(queryset)
+
     csv_file = open_csv_for_writing(filepath)
 
     with csv_file as f:
         writer = csv.DictWriter(f, header_labels)
         logger.info("Creating csv file {filename}".format(filename=filepath))
         writer.writeheader()
-        for item in queryset.select_related("user", "user__facility").values(
-            *log_info["db_columns"]
+        for item in (
+            queryset.select_related("user", "user__facility")
+            .values(*log_info["db_columns"])
+            .iterator(chunk_size=CSV_EXPORT_CHUNK_SIZE)
         ):
-            writer.writerow(map_object(item, len(topic_headers)))
+            writer.writerow(map_object(item, len(topic_headers), content_metadata))
             yield
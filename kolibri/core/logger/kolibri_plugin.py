@@ -3,12 +3,16 @@ import logging
 from kolibri.core.auth.hooks import FacilityDataSyncHook
 from kolibri.core.auth.sync_operations import KolibriVersionedSyncOperation
 from kolibri.core.logger.models import AttemptLog
+from kolibri.core.logger.models import ContentSessionLog
 from kolibri.core.logger.models import ExamAttemptLog
 from kolibri.core.logger.models import ExamLog
+from kolibri.core.logger.models import MasteryLog
 from kolibri.core.logger.utils.attempt_log_consolidation import (
     consolidate_quiz_attempt_logs,
 )
 from kolibri.core.logger.utils.exam_log_migration import migrate_from_exam_logs
+from kolibri.core.logger.utils.popularity import recount_content_popularity
+from kolibri.core.logger.utils.status_rollup import invalidate_status_rollups
 from kolibri.plugins.hooks import register_hook
 
 
@@ -63,3 +67,42 @@ class LoggerSyncHook(FacilityDataSyncHook):
         ExamLogsCompatibilityOperation(),
         AttemptLogsConsolidationOperation(),
     ]
+
+    def post_transfer(
+        self,
+        dataset_id,
+        local_is_single_user,
+        remote_is_single_user,
+        single_user_id,
+        context,
+    ):
+        """
+        Invalidates the content status rollups of any summary logs whose mastery logs or attempt logs
+        we have received, and recounts the popularity of the content of any session logs
+        we have received, as these may have been saved without sending signals.
+        """
+        if context.is_receiver:
+            invalidate_status_rollups(
+                MasteryLog.objects.filter(
+                    id__in=context.transfer_session.get_touched_record_ids_for_model(
+                        MasteryLog
+                    )
+                ).values("summarylog_id")
+            )
+            invalidate_status_rollups(
+                AttemptLog.objects.filter(
+                    id__in=context.transfer_session.get_touched_record_ids_for_model(
+                        AttemptLog
+                    )
+                ).values("masterylog__summarylog_id")
+            )
+            recount_content_popularity(
+                ContentSessionLog.objects.filter(
+                    id__in=context.transfer_session.get_touched_record_ids_for_model(
+                        ContentSessionLog
+                    )
+                )
+                .order_by()
+                .values_list("content_id", flat=True)
+                .distinct()
+            )
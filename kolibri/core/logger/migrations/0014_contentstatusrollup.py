@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:28
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+import kolibri.core.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logger", "0013_generatecsvlogrequest_allow_null_timestamps"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContentStatusRollup",
+            fields=[
+                (
+                    "summarylog",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="status_rollup",
+                        serialize=False,
+                        to="logger.contentsummarylog",
+                    ),
+                ),
+                ("calculated", models.BooleanField(default=False)),
+                ("attempts_exist", models.BooleanField(default=False)),
+                ("tries", models.IntegerField(default=0)),
+                ("quiz_complete", models.BooleanField(blank=True, null=True)),
+                (
+                    "quiz_last_activity",
+                    kolibri.core.fields.DateTimeTzField(blank=True, null=True),
+                ),
+                ("num_correct", models.FloatField(blank=True, null=True)),
+                ("num_answered", models.IntegerField(blank=True, null=True)),
+                ("previous_num_correct", models.IntegerField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.25 on 2026-10-18 22:01
+import morango.models.fields.uuids
+from django.db import migrations
+from django.db import models
+from django.db.models import Count
+
+
+def populate_content_popularity(apps, schema_editor):
+    """
+    Count the existing session logs, so that popular content can be recommended
+    from all of them as soon as the device is upgraded.
+    """
+    ContentSessionLog = apps.get_model("logger", "ContentSessionLog")
+    ContentPopularity = apps.get_model("logger", "ContentPopularity")
+    ContentPopularity.objects.bulk_create(
+        (
+            ContentPopularity(content_id=content_id, session_count=session_count)
+            for content_id, session_count in ContentSessionLog.objects.order_by()
+            .values_list("content_id")
+            .annotate(session_count=Count("id"))
+            .values_list("content_id", "session_count")
+        ),
+        batch_size=500,
+    )
+
+
+def reverse(apps, schema_editor):
+    return
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logger", "0014_contentstatusrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContentPopularity",
+            fields=[
+                (
+                    "content_id",
+                    morango.models.fields.uuids.UUIDField(
+                        primary_key=True, serialize=False
+                    ),
+                ),
+                ("session_count", models.IntegerField(db_index=True, default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_content_popularity, reverse_code=reverse),
+    ]
@@ -410,3 +410,41 @@ class GenerateCSVLogRequest(models.Model):
     selected_end_date = DateTimeTzField(null=True, blank=True)
     date_requested = DateTimeTzField(default=local_now)
     log_type = models.CharField(max_length=7, choices=LOG_TYPE_CHOICES)
+
+
+class ContentStatusRollup(models.Model):
+    """
+    This model stores a summary of the MasteryLogs and AttemptLogs for a ContentSummaryLog,
+    so that coach reports do not need to recalculate it from every log on each request.
+    It is deleted whenever those logs change, and recalculated the next time it is read.
+    """
+
+    summarylog = models.OneToOneField(
+        ContentSummaryLog,
+        primary_key=True,
+        related_name="status_rollup",
+        on_delete=models.CASCADE,
+    )
+    # Is set once the summary has been calculated, so that a summary that is invalidated
+    # while it is being calculated is not saved.
+    calculated = models.BooleanField(default=False)
+    attempts_exist = models.BooleanField(default=False)
+    tries = models.IntegerField(default=0)
+    # The status of the most recent try of a quiz, null if there are no tries of a quiz.
+    quiz_complete = models.BooleanField(null=True, blank=True)
+    quiz_last_activity = DateTimeTzField(null=True, blank=True)
+    num_correct = models.FloatField(null=True, blank=True)
+    num_answered = models.IntegerField(null=True, blank=True)
+    previous_num_correct = models.IntegerField(null=True, blank=True)
+
+
+class ContentPopularity(models.Model):
+    """
+    This model stores the number of ContentSessionLogs for each content_id, so that
+    recommending popular content does not need to aggregate every session log.
+    It is incremented as session logs are created, and recounted after syncs
+    and periodically in the background.
+    """
+
+    content_id = UUIDField(primary_key=True)
+    session_count = models.IntegerField(default=0, db_index=True)
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import AttemptLog
+from .models import ContentSessionLog
+from .models import MasteryLog
+from .utils.popularity import increment_content_popularity
+from .utils.status_rollup import invalidate_status_rollups
+
+
+@receiver(post_save, sender=MasteryLog)
+@receiver(post_delete, sender=MasteryLog)
+def invalidate_masterylog_status_rollup(sender, instance=None, *args, **kwargs):
+    """
+    For a given mastery log, delete the rollup of its summary log.
+    """
+    invalidate_status_rollups([instance.summarylog_id])
+
+
+@receiver(post_save, sender=AttemptLog)
+@receiver(post_delete, sender=AttemptLog)
+def invalidate_attemptlog_status_rollup(sender, instance=None, *args, **kwargs):
+    """
+    For a given attempt log, delete the rollup of the summary log of its mastery log.
+    """
+    if instance.masterylog_id:
+        invalidate_status_rollups(
+            MasteryLog.objects.filter(id=instance.masterylog_id).values("summarylog_id")
+        )
+
+
+@receiver(post_save, sender=ContentSessionLog)
+def increment_sessionlog_content_popularity(
+    sender, instance=None, created=False, *args, **kwargs
+):
+    """
+    For a newly created session log, add it to the popularity of its content.
+    """
+    if created:
+        increment_content_popularity(instance.content_id)
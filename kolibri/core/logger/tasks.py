@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 
 from django.core.management import call_command
 from rest_framework import serializers
@@ -9,12 +10,15 @@ from kolibri.core.auth.management.commands.bulkexportusers import (
 from kolibri.core.auth.models import Facility
 from kolibri.core.logger.csv_export import CSV_EXPORT_FILENAMES
 from kolibri.core.logger.models import GenerateCSVLogRequest
+from kolibri.core.logger.utils.popularity import recount_content_popularity
 from kolibri.core.tasks.decorators import register_task
+from kolibri.core.tasks.exceptions import JobRunning
 from kolibri.core.tasks.permissions import IsAdminForJob
 from kolibri.core.tasks.validation import JobValidator
 from kolibri.utils import conf
 
 LOGS_CLEANUP_JOB_ID = "18"
+CONTENT_POPULARITY_JOB_ID = "content_popularity"
 
 
 def get_filepath(log_type, facility_id, start_date, end_date):
@@ -184,3 +188,21 @@ def log_exports_cleanup():
     for filename in os.listdir(logs_dir):
         if filename not in valid_filenames_set:
             os.remove(os.path.join(logs_dir, filename))
+
+
+@register_task(job_id=CONTENT_POPULARITY_JOB_ID)
+def update_content_popularity():
+    """
+    Recount the session logs for all content, to correct the popularity of any content
+    whose session logs have been deleted, or saved without sending signals.
+    """
+    recount_content_popularity()
+
+
+def schedule_content_popularity():
+    try:
+        update_content_popularity.enqueue_in(
+            timedelta(minutes=5), repeat=None, interval=24 * 60 * 60
+        )
+    except JobRunning:
+        pass
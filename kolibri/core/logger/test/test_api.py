@@ -13,6 +13,7 @@ import mock
 import pytz
 from django.core.management import call_command
 from django.urls import reverse
+from le_utils.constants import content_kinds
 from rest_framework.test import APITestCase
 
 from ..models import ContentSessionLog
@@ -108,6 +109,42 @@ class ContentSummaryLogCSVExportTestCase(APITestCase):
             ).exists()
         )
 
+    def test_csv_download_content_metadata(self):
+        channel = ChannelMetadata.objects.first()
+        # Only use content that appears once in the channel, so the title is unambiguous
+        nodes = [
+            node
+            for node in ContentNode.objects.filter(channel_id=channel.id).exclude(
+                kind=content_kinds.TOPIC
+            )
+            if not ContentNode.objects.filter(content_id=node.content_id)
+            .exclude(pk=node.pk)
+            .exists()
+        ]
+        self.assertTrue(nodes)
+        for node in nodes:
+            ContentSummaryLogFactory.create(
+                user=self.user1,
+                content_id=node.content_id,
+                channel_id=channel.id,
+            )
+        _, filepath = tempfile.mkstemp(suffix=".csv")
+        call_command(
+            "exportlogs",
+            log_type="summary",
+            output_file=filepath,
+            overwrite=True,
+            start_date=self.start_date,
+            end_date=self.end_date,
+        )
+        with open(filepath, "r", newline="") as f:
+            results = list(csv.DictReader(f))
+        rows = {row[str(labels["content_id"])]: row for row in results}
+        for node in nodes:
+            row = rows[node.content_id]
+            self.assertEqual(row[str(labels["content_title"])], node.title)
+            self.assertEqual(row[str(labels["channel_name"])], channel.name)
+
     def test_csv_download_unicode_username(self):
         user = FacilityUserFactory.create(
             facility=self.facility, username="كوليبري", full_name="كوليبري"
@@ -6,6 +6,7 @@ Also tests whether the users with permissions can create logs.
 import uuid
 
 from django.core.exceptions import MultipleObjectsReturned
+from django.db.utils import OperationalError
 from django.http.cookie import SimpleCookie
 from django.urls import reverse
 from le_utils.constants import content_kinds
@@ -32,12 +33,15 @@ from kolibri.core.exams.models import ExamAssignment
 from kolibri.core.lessons.models import Lesson
 from kolibri.core.lessons.models import LessonAssignment
 from kolibri.core.logger.constants import interaction_types
+from kolibri.core.logger.write_behind import MAX_APPLY_ATTEMPTS
+from kolibri.core.logger.write_behind import progress_queue
 from kolibri.core.notifications.api import create_summarylog
 from kolibri.core.notifications.api import parse_attemptslog
 from kolibri.core.notifications.api import parse_summarylog
 from kolibri.core.notifications.api import quiz_answered_notification
 from kolibri.core.notifications.api import quiz_completed_notification
 from kolibri.core.notifications.api import quiz_started_notification
+from kolibri.utils.tests.helpers import override_option
 from kolibri.utils.time_utils import local_now
 
 
@@ -1390,6 +1394,121 @@ class ProgressTrackingViewSetLoggedInUpdateSessionTestCase(
         self.client.logout()
 
 
+@override_option("Server", "PROGRESS_WRITE_BEHIND", True)
+class ProgressTrackingViewSetLoggedInUpdateSessionWriteBehindTestCase(
+    ProgressTrackingViewSetLoggedInUpdateSessionTestCase
+):
+    def setUp(self):
+        super(
+            ProgressTrackingViewSetLoggedInUpdateSessionWriteBehindTestCase, self
+        ).setUp()
+        # Flush explicitly, rather than from a background thread
+        start_patcher = patch.object(progress_queue, "start")
+        start_patcher.start()
+        self.addCleanup(start_patcher.stop)
+        self.addCleanup(progress_queue.pending.clear)
+
+    def _put(self, data):
+        data["context"] = {"node_id": self.node.id}
+        return self.client.put(
+            reverse(
+                "kolibri:core:trackprogress-detail", kwargs={"pk": self.session_log.id}
+            ),
+            data=data,
+            format="json",
+        )
+
+    def _make_request(self, data):
+        response = self._put(data)
+        progress_queue.flush()
+        return response
+
+    def test_updates_saved_on_flush(self):
+        self._update_logs("progress", 0.1)
+        self._update_logs("time_spent", 10)
+        self._put({"progress_delta": 0.2, "time_spent_delta": 5})
+        response = self._put({"progress_delta": 0.3, "time_spent_delta": 5})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["complete"], False)
+        self._assert_logs_value("progress", 0.1)
+        self.assertEqual(len(progress_queue.pending), 1)
+
+        progress_queue.flush()
+
+        self.assertEqual(len(progress_queue.pending), 0)
+        self._assert_logs_value("progress", 0.6)
+        self._assert_logs_value("time_spent", 20)
+
+    def test_absolute_progress_replaces_pending_progress_delta(self):
+        self._update_logs("progress", 0.1)
+        self._put({"progress_delta": 0.5})
+        self._put({"progress": 0.25})
+        self._put({"progress_delta": 0.25})
+
+        progress_queue.flush()
+
+        self._assert_logs_value("progress", 0.5)
+
+    def test_completion_returned_before_flush(self):
+        self._update_logs("progress", 0.9)
+        response = self._put({"progress_delta": 0.1})
+
+        self.assertEqual(response.json()["complete"], True)
+        self._assert_logs_value("progress", 0.9)
+
+    def test_failed_flush_is_retried(self):
+        self._update_logs("progress", 0.1)
+        self._put({"progress_delta": 0.2})
+        with patch.object(progress_queue, "apply_update", side_effect=OperationalError):
+            progress_queue.flush()
+        self._put({"progress_delta": 0.3})
+
+        progress_queue.flush()
+
+        self._assert_logs_value("progress", 0.6)
+
+    def test_failed_update_is_retried(self):
+        self._update_logs("progress", 0.25)
+        self._put({"progress_delta": 0.25})
+        with patch.object(progress_queue, "apply_update", side_effect=ValueError):
+            progress_queue.flush()
+        self.assertEqual(len(progress_queue.pending), 1)
+
+        progress_queue.flush()
+
+        self._assert_logs_value("progress", 0.5)
+
+    def test_failed_update_dropped_after_max_attempts(self):
+        self._update_logs("progress", 0.25)
+        self._put({"progress_delta": 0.25})
+        with patch.object(progress_queue, "apply_update", side_effect=ValueError):
+            for _ in range(MAX_APPLY_ATTEMPTS):
+                progress_queue.flush()
+        self.assertEqual(len(progress_queue.pending), 0)
+        self._assert_logs_value("progress", 0.25)
+
+    def test_start_session_saves_pending_updates(self):
+        self._update_logs("progress", 0.25)
+        self._put({"progress_delta": 0.25, "extra_fields": {"contentState": "saved"}})
+
+        response = self.client.post(
+            reverse("kolibri:core:trackprogress-list"),
+            data={
+                "node_id": self.node.id,
+                "content_id": self.content_id,
+                "channel_id": self.channel_id,
+                "kind": content_kinds.VIDEO,
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(progress_queue.pending), 0)
+        self.assertEqual(response.json()["progress"], 0.5)
+        self.assertEqual(response.json()["extra_fields"], {"contentState": "saved"})
+
+
 class ProgressTrackingViewSetUpdateSessionAssessmentBase(object):
     def _make_request(self, data):
         return self.client.put(
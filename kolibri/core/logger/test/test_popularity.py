@@ -0,0 +1,102 @@
+import uuid
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+from django.utils import timezone
+
+from kolibri.core.auth.models import Facility
+from kolibri.core.auth.models import FacilityUser
+from kolibri.core.logger.models import ContentPopularity
+from kolibri.core.logger.models import ContentSessionLog
+from kolibri.core.logger.utils.popularity import get_popular_content_ids
+from kolibri.core.logger.utils.popularity import recount_content_popularity
+
+
+class ContentPopularityTestCase(TestCase):
+    def setUp(self):
+        facility = Facility.objects.create(name="MyFac")
+        self.user = FacilityUser.objects.create(username="user", facility=facility)
+        self.content_ids = [uuid.uuid4().hex for _ in range(3)]
+        for content_id, count in zip(self.content_ids, (3, 1, 2)):
+            self._create_session_logs(content_id, count)
+
+    def _create_session_logs(self, content_id, count):
+        for _ in range(count):
+            ContentSessionLog.objects.create(
+                user=self.user,
+                channel_id=uuid.uuid4().hex,
+                content_id=content_id,
+                start_timestamp=timezone.now(),
+                kind="video",
+            )
+
+    def _get_counts(self):
+        return dict(
+            ContentPopularity.objects.values_list("content_id", "session_count")
+        )
+
+    def test_created_session_logs_counted(self):
+        self.assertEqual(
+            self._get_counts(),
+            {
+                self.content_ids[0]: 3,
+                self.content_ids[1]: 1,
+                self.content_ids[2]: 2,
+            },
+        )
+
+    def test_updated_session_logs_not_counted(self):
+        log = ContentSessionLog.objects.filter(content_id=self.content_ids[1]).first()
+        log.progress = 0.5
+        log.save()
+        self.assertEqual(self._get_counts()[self.content_ids[1]], 1)
+
+    def test_get_popular_content_ids(self):
+        self.assertEqual(
+            get_popular_content_ids(self.content_ids, 2),
+            [self.content_ids[0], self.content_ids[2]],
+        )
+
+    def test_get_popular_content_ids_filtered(self):
+        self.assertEqual(
+            get_popular_content_ids(self.content_ids[1:], 2),
+            [self.content_ids[2], self.content_ids[1]],
+        )
+
+    def test_recount_content_ids(self):
+        ContentSessionLog.objects.filter(content_id=self.content_ids[0]).delete()
+        ContentPopularity.objects.filter(content_id=self.content_ids[1]).update(
+            session_count=10
+        )
+        recount_content_popularity([self.content_ids[0]])
+        self.assertEqual(
+            self._get_counts(),
+            {self.content_ids[1]: 10, self.content_ids[2]: 2},
+        )
+
+    def test_recount_all(self):
+        ContentSessionLog.objects.filter(content_id=self.content_ids[0]).delete()
+        ContentPopularity.objects.filter(content_id=self.content_ids[1]).update(
+            session_count=10
+        )
+        recount_content_popularity()
+        self.assertEqual(
+            self._get_counts(),
+            {self.content_ids[1]: 1, self.content_ids[2]: 2},
+        )
+
+    def test_migration_counts_existing_session_logs(self):
+        migration = import_module(
+            "kolibri.core.logger.migrations.0015_contentpopularity"
+        )
+        ContentPopularity.objects.all().delete()
+        migration.populate_content_popularity(apps, None)
+        self.assertEqual(
+            self._get_counts(),
+            {
+                self.content_ids[0]: 3,
+                self.content_ids[1]: 1,
+                self.content_ids[2]: 2,
+            },
+        )
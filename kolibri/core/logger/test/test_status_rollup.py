@@ -0,0 +1,95 @@
+import datetime
+
+import mock
+from django.test import TestCase
+from django.utils import timezone
+
+from .helpers import EvaluationMixin
+from kolibri.core.logger.models import AttemptLog
+from kolibri.core.logger.models import ContentStatusRollup
+from kolibri.core.logger.models import ContentSummaryLog
+from kolibri.core.logger.models import MasteryLog
+from kolibri.core.logger.utils import status_rollup
+from kolibri.core.logger.utils.status_rollup import _calculate_rollups
+from kolibri.core.logger.utils.status_rollup import get_status_rollups
+
+
+class StatusRollupTestCase(EvaluationMixin, TestCase):
+    def _get_rollups(self):
+        return {
+            log["id"]: log
+            for log in get_status_rollups(ContentSummaryLog.objects.all())
+        }
+
+    def test_rollups_saved_on_read(self):
+        rollups = self._get_rollups()
+        self.assertEqual(
+            ContentStatusRollup.objects.filter(calculated=True).count(),
+            ContentSummaryLog.objects.count(),
+        )
+        expected = _calculate_rollups(list(rollups.keys()))
+        for summarylog_id, rollup in rollups.items():
+            for field, value in expected[summarylog_id].items():
+                self.assertEqual(rollup[field], value)
+
+    def test_saved_rollups_not_recalculated(self):
+        self._get_rollups()
+        with mock.patch.object(
+            status_rollup, "_calculate_rollups", wraps=_calculate_rollups
+        ) as calculate_mock:
+            rollups = self._get_rollups()
+        calculate_mock.assert_not_called()
+        try_log = self.user_tries[0][0]
+        self.assertEqual(rollups[try_log.summarylog_id]["num_correct"], 3)
+        self.assertTrue(rollups[try_log.summarylog_id]["quiz_complete"])
+
+    def test_attemptlog_change_invalidates_rollup(self):
+        self._get_rollups()
+        try_log = self.user_tries[0][0]
+        with self.captureOnCommitCallbacks(execute=True):
+            AttemptLog.objects.filter(masterylog=try_log).first().delete()
+        self.assertFalse(
+            ContentStatusRollup.objects.filter(
+                summarylog_id=try_log.summarylog_id
+            ).exists()
+        )
+        rollups = self._get_rollups()
+        self.assertEqual(rollups[try_log.summarylog_id]["num_correct"], 2)
+        self.assertEqual(rollups[try_log.summarylog_id]["num_answered"], 2)
+
+    def test_masterylog_change_invalidates_rollup(self):
+        self._get_rollups()
+        summarylog = self.summary_logs[0][0]
+        tries = MasteryLog.objects.filter(summarylog=summarylog).count()
+        with self.captureOnCommitCallbacks(execute=True):
+            MasteryLog.objects.create(
+                user=summarylog.user,
+                summarylog=summarylog,
+                start_timestamp=timezone.now(),
+                end_timestamp=timezone.now() + datetime.timedelta(minutes=1),
+                mastery_level=-1,
+            )
+        rollups = self._get_rollups()
+        self.assertEqual(rollups[summarylog.id]["tries"], tries + 1)
+        self.assertFalse(rollups[summarylog.id]["quiz_complete"])
+
+    def test_rollup_invalidated_while_calculating_not_saved(self):
+        summarylog = self.summary_logs[0][0]
+
+        def calculate_and_invalidate(summarylog_ids):
+            rollups = _calculate_rollups(summarylog_ids)
+            ContentStatusRollup.objects.filter(summarylog_id=summarylog.id).delete()
+            return rollups
+
+        with mock.patch.object(
+            status_rollup, "_calculate_rollups", side_effect=calculate_and_invalidate
+        ):
+            rollups = self._get_rollups()
+        self.assertIn(summarylog.id, rollups)
+        self.assertFalse(
+            ContentStatusRollup.objects.filter(summarylog_id=summarylog.id).exists()
+        )
+        self.assertEqual(
+            ContentStatusRollup.objects.filter(calculated=True).count(),
+            ContentSummaryLog.objects.count() - 1,
+        )
@@ -17,6 +17,7 @@ from kolibri.core.logger.models import MasteryLog
 from kolibri.core.logger.utils.attempt_log_consolidation import (
     consolidate_quiz_attempt_logs,
 )
+from kolibri.core.logger.utils.status_rollup import invalidate_status_rollups
 from kolibri.utils.time_utils import local_now
 
 
@@ -54,6 +55,7 @@ def _update_mastery_log(log):
             "completion_timestamp", Value(log.completion_timestamp)
         ),
     )
+    invalidate_status_rollups([log.summarylog_id])
 
 
 # Field that we want to update
@@ -117,6 +119,9 @@ def _update_attempt_logs(masterylog_id, logs):
             log.sessionlog_id = sessionlog_id
             to_create.append(log)
     _bulk_create(AttemptLog, to_create)
+    invalidate_status_rollups(
+        MasteryLog.objects.filter(id=masterylog_id).values("summarylog_id")
+    )
 
 
 # ExamAttemptLog properties that we do not want
@@ -0,0 +1,96 @@
+"""
+Counts of the ContentSessionLogs for each content_id, that are used to recommend
+popular content to learners.
+
+Counts are stored in the ContentPopularity model, incremented as session logs are
+created, and recounted from the session logs for any logs that are saved without
+sending signals, such as those received during a sync.
+"""
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import F
+
+from kolibri.core.logger.models import ContentPopularity
+from kolibri.core.logger.models import ContentSessionLog
+
+
+# Number of content_ids to recount at a time
+RECOUNT_BATCH_SIZE = 500
+
+
+def increment_content_popularity(content_id):
+    """
+    Add one to the number of session logs for content_id.
+    """
+    if (
+        ContentPopularity.objects.filter(content_id=content_id).update(
+            session_count=F("session_count") + 1
+        )
+        == 0
+    ):
+        try:
+            with transaction.atomic():
+                ContentPopularity.objects.create(content_id=content_id, session_count=1)
+        except IntegrityError:
+            # Created by another request since we tried to update it
+            ContentPopularity.objects.filter(content_id=content_id).update(
+                session_count=F("session_count") + 1
+            )
+
+
+def _session_counts(session_logs):
+    return (
+        session_logs.order_by()
+        .values_list("content_id")
+        .annotate(session_count=Count("id"))
+        .values_list("content_id", "session_count")
+    )
+
+
+def _replace_counts(counts, content_ids=None):
+    with transaction.atomic():
+        deleted = ContentPopularity.objects.all()
+        if content_ids is not None:
+            deleted = deleted.filter(content_id__in=content_ids)
+        deleted.delete()
+        ContentPopularity.objects.bulk_create(
+            [
+                ContentPopularity(content_id=content_id, session_count=session_count)
+                for content_id, session_count in counts
+            ],
+            batch_size=RECOUNT_BATCH_SIZE,
+        )
+
+
+def recount_content_popularity(content_ids=None):
+    """
+    Recount the number of session logs for each of content_ids, or for all content if
+    content_ids is None.
+    """
+    if content_ids is None:
+        _replace_counts(list(_session_counts(ContentSessionLog.objects.all())))
+        return
+    content_ids = list(content_ids)
+    for i in range(0, len(content_ids), RECOUNT_BATCH_SIZE):
+        batch = content_ids[i : i + RECOUNT_BATCH_SIZE]
+        _replace_counts(
+            list(
+                _session_counts(ContentSessionLog.objects.filter(content_id__in=batch))
+            ),
+            content_ids=batch,
+        )
+
+
+def get_popular_content_ids(content_ids, limit):
+    """
+    Return up to limit of content_ids, with the most session logs first.
+    content_ids can be a list, or a values queryset.
+    """
+    return list(
+        ContentPopularity.objects.filter(
+            content_id__in=content_ids, session_count__gt=0
+        )
+        .order_by("-session_count", "content_id")
+        .values_list("content_id", flat=True)[:limit]
+    )
@@ -0,0 +1,216 @@
+"""
+Rollups of the MasteryLogs and AttemptLogs for each ContentSummaryLog, that coach reports
+use to determine the status of learners on resources and quizzes.
+
+Rollups are stored in the ContentStatusRollup model, and deleted whenever the logs that
+they summarize change, so that reading the status of many learners only requires
+recalculating the rollups for the logs that have changed since they were last read.
+"""
+import logging
+
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import Exists
+from django.db.models import Max
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.utils import OperationalError
+
+from kolibri.core.logger.models import AttemptLog
+from kolibri.core.logger.models import ContentStatusRollup
+from kolibri.core.logger.models import ContentSummaryLog
+from kolibri.core.logger.models import MasteryLog
+from kolibri.core.logger.utils.quiz import annotate_response_summary
+from kolibri.core.query import SQCount
+
+logger = logging.getLogger(__name__)
+
+
+# Number of summary logs to calculate rollups for at a time
+ROLLUP_BATCH_SIZE = 500
+
+summarylog_fields = (
+    "id",
+    "user_id",
+    "content_id",
+    "end_timestamp",
+    "time_spent",
+    "progress",
+    "kind",
+)
+
+rollup_fields = (
+    "attempts_exist",
+    "tries",
+    "quiz_complete",
+    "quiz_last_activity",
+    "num_correct",
+    "num_answered",
+    "previous_num_correct",
+)
+
+
+def _empty_rollup():
+    return {
+        "attempts_exist": False,
+        "tries": 0,
+        "quiz_complete": None,
+        "quiz_last_activity": None,
+        "num_correct": None,
+        "num_answered": None,
+        "previous_num_correct": None,
+    }
+
+
+def get_quiz_status(queryset):
+    """
+    Return the status of the most recent quiz try in a MasteryLog queryset
+    for each ContentSummaryLog.
+    """
+    queryset = queryset.filter(
+        mastery_level__lt=0,
+    ).order_by("-end_timestamp")
+    queryset = queryset.annotate(
+        previous_masterylog=Subquery(
+            queryset.filter(
+                summarylog=OuterRef("summarylog"),
+                end_timestamp__lt=OuterRef("end_timestamp"),
+            ).values_list("id")[:1]
+        ),
+    )
+    queryset = annotate_response_summary(queryset)
+    items = []
+    statuses = queryset.annotate(
+        last_activity=Max("attemptlogs__end_timestamp"),
+        previous_num_correct=SQCount(
+            AttemptLog.objects.filter(
+                masterylog=OuterRef("previous_masterylog"), correct=1
+            )
+            .order_by()
+            .values_list("item")
+            .distinct(),
+            field="item",
+        ),
+    ).values(
+        "summarylog_id",
+        "complete",
+        "last_activity",
+        "num_correct",
+        "num_answered",
+        "previous_num_correct",
+    )
+    seen = set()
+    for item in statuses:
+        if item["summarylog_id"] not in seen:
+            items.append(item)
+            seen.add(item["summarylog_id"])
+    return items
+
+
+def _calculate_rollups(summarylog_ids):
+    rollups = {}
+    for log in (
+        ContentSummaryLog.objects.filter(id__in=summarylog_ids)
+        .annotate(
+            attempts_exist=Exists(
+                AttemptLog.objects.filter(masterylog__summarylog=OuterRef("id"))
+            ),
+            tries=SQCount(
+                MasteryLog.objects.filter(summarylog=OuterRef("id")),
+                field="id",
+            ),
+        )
+        .values("id", "attempts_exist", "tries")
+    ):
+        rollup = _empty_rollup()
+        rollup["attempts_exist"] = log["attempts_exist"]
+        rollup["tries"] = log["tries"]
+        rollups[log["id"]] = rollup
+
+    for item in get_quiz_status(
+        MasteryLog.objects.filter(summarylog_id__in=summarylog_ids)
+    ):
+        rollup = rollups.get(item["summarylog_id"])
+        if rollup is not None:
+            rollup.update(
+                quiz_complete=item["complete"],
+                quiz_last_activity=item["last_activity"],
+                num_correct=item["num_correct"],
+                num_answered=item["num_answered"],
+                previous_num_correct=item["previous_num_correct"],
+            )
+    return rollups
+
+
+def _create_placeholders(summarylog_ids):
+    # Placeholders are created before the logs are read, so that if the logs change
+    # while their rollups are being calculated, the placeholders are deleted, and
+    # the out of date rollups are not saved.
+    try:
+        ContentStatusRollup.objects.bulk_create(
+            [
+                ContentStatusRollup(summarylog_id=summarylog_id)
+                for summarylog_id in summarylog_ids
+            ],
+            ignore_conflicts=True,
+        )
+    except (IntegrityError, OperationalError) as e:
+        logger.debug("Could not create content status rollups: {}".format(e))
+
+
+def _save_rollups(rollups):
+    try:
+        with transaction.atomic():
+            placeholders = list(
+                ContentStatusRollup.objects.select_for_update().filter(
+                    summarylog_id__in=rollups.keys(), calculated=False
+                )
+            )
+            for placeholder in placeholders:
+                for field, value in rollups[placeholder.summarylog_id].items():
+                    setattr(placeholder, field, value)
+                placeholder.calculated = True
+            ContentStatusRollup.objects.bulk_update(
+                placeholders, ("calculated",) + rollup_fields
+            )
+    except OperationalError as e:
+        # The rollups will be calculated again the next time that they are read
+        logger.debug("Could not save content status rollups: {}".format(e))
+
+
+def get_status_rollups(summarylogs):
+    """
+    Return the values of a ContentSummaryLog queryset, along with the rollup of the
+    MasteryLogs and AttemptLogs of each summary log, calculating any rollups that
+    are missing or out of date.
+    """
+    logs = list(summarylogs.values(*summarylog_fields))
+    rollups = {
+        rollup.pop("summarylog_id"): rollup
+        for rollup in ContentStatusRollup.objects.filter(
+            summarylog_id__in=summarylogs.values("id"), calculated=True
+        ).values("summarylog_id", *rollup_fields)
+    }
+    stale_ids = [log["id"] for log in logs if log["id"] not in rollups]
+    for i in range(0, len(stale_ids), ROLLUP_BATCH_SIZE):
+        batch = stale_ids[i : i + ROLLUP_BATCH_SIZE]
+        _create_placeholders(batch)
+        calculated_rollups = _calculate_rollups(batch)
+        _save_rollups(calculated_rollups)
+        rollups.update(calculated_rollups)
+    for log in logs:
+        log.update(rollups.get(log["id"]) or _empty_rollup())
+    return logs
+
+
+def invalidate_status_rollups(summarylog_ids):
+    """
+    Delete the rollups for the ContentSummaryLogs with summarylog_ids, once the current
+    transaction has been committed, so that they are recalculated when they are next read.
+    summarylog_ids can be a list, or a values queryset that is evaluated after the commit.
+    """
+
+    def delete_rollups():
+        ContentStatusRollup.objects.filter(summarylog_id__in=summarylog_ids).delete()
+
+    transaction.on_commit(delete_rollups)
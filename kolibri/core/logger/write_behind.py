@@ -0,0 +1,277 @@
+"""
+Hold progress updates for content sessions in memory, and save them to the database
+in batches, so that frequent progress updates from many learners do not each need their
+own write transaction.
+
+Successive updates to the same session are coalesced into a single update, which is
+applied in the same way as an update made directly to the database.
+"""
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from math import ceil
+
+from django.db import connection
+from django.db import transaction
+from django.db.utils import OperationalError
+
+from kolibri.core.auth.models import dataset_cache
+from kolibri.core.tasks.utils import InfiniteLoopThread
+from kolibri.utils import conf
+
+logger = logging.getLogger(__name__)
+
+# Number of times that saving the updates for a session can fail, other than because the
+# database is unavailable, before the updates are dropped
+MAX_APPLY_ATTEMPTS = 3
+
+
+def normalize_progress(progress):
+    # Round progress to three decimal places
+    # but always rounding up.
+    progress = ceil(progress * 1000) / float(1000)
+    return max(0, min(1.0, progress))
+
+
+def coalesce_progress_update(pending, data):
+    """
+    Update the pending progress update in place so that applying it has the same
+    effect as applying pending, and then data.
+    """
+    if "progress" in data:
+        pending.pop("progress_delta", None)
+        pending["progress"] = data["progress"]
+    elif "progress_delta" in data:
+        if "progress" in pending:
+            pending["progress"] = min(1.0, pending["progress"] + data["progress_delta"])
+        else:
+            pending["progress_delta"] = (
+                pending.get("progress_delta", 0) + data["progress_delta"]
+            )
+    if "time_spent_delta" in data:
+        pending["time_spent_delta"] = (
+            pending.get("time_spent_delta", 0) + data["time_spent_delta"]
+        )
+    if "extra_fields" in data:
+        pending["extra_fields"] = data["extra_fields"]
+    return pending
+
+
+class PendingSession(object):
+    """
+    The progress updates for a content session that have not yet been saved, along
+    with enough of the session's state to respond to further updates from memory.
+    """
+
+    __slots__ = (
+        "session_id",
+        "user",
+        "content_id",
+        "context",
+        "progress",
+        "validated_data",
+        "end_timestamp",
+        "failed_attempts",
+    )
+
+    def __init__(self, session_id, user, content_id, context, progress):
+        self.session_id = session_id
+        self.user = user
+        self.content_id = content_id
+        self.context = context
+        # The progress of the summarylog, or of the sessionlog for anonymous users,
+        # including the updates that have not yet been saved.
+        self.progress = progress
+        self.validated_data = {}
+        self.end_timestamp = None
+        self.failed_attempts = 0
+
+    def add(self, validated_data, end_timestamp):
+        if "progress_delta" in validated_data:
+            self.progress = normalize_progress(
+                self.progress + validated_data["progress_delta"]
+            )
+        elif "progress" in validated_data:
+            self.progress = normalize_progress(validated_data["progress"])
+        coalesce_progress_update(self.validated_data, validated_data)
+        self.end_timestamp = end_timestamp
+
+    def merge(self, newer):
+        """
+        Fold the updates of a newer pending session for the same session into this one.
+        """
+        coalesce_progress_update(self.validated_data, newer.validated_data)
+        self.progress = newer.progress
+        self.end_timestamp = newer.end_timestamp
+
+
+class ProgressWriteBehindQueue(object):
+    def __init__(self):
+        # Map of session id to PendingSession, in the order that the sessions were first updated
+        self.pending = OrderedDict()
+        self.lock = threading.Lock()
+        # Held while saving, so that only one batch is saved at a time
+        self.flush_lock = threading.Lock()
+        # The function used to save the pending updates for a session to the database,
+        # set once by the API that adds the updates, when it is imported
+        self.apply_update = None
+        self.thread = None
+
+    @property
+    def enabled(self):
+        return conf.OPTIONS["Server"]["PROGRESS_WRITE_BEHIND"]
+
+    @property
+    def interval(self):
+        return conf.OPTIONS["Server"]["PROGRESS_WRITE_BEHIND_INTERVAL"]
+
+    @property
+    def max_sessions(self):
+        return conf.OPTIONS["Server"]["PROGRESS_WRITE_BEHIND_MAX_SESSIONS"]
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = InfiniteLoopThread(
+                self._flush_from_thread,
+                thread_name="PROGRESSWRITEBEHIND",
+                wait_between_runs=self.interval,
+                daemon=True,
+            )
+            self.thread.start()
+        if conf.OPTIONS["Server"]["PROGRESS_WRITE_BEHIND_FLUSH_ON_SHUTDOWN"]:
+            atexit.register(self.flush)
+
+    def add(self, session_id, user, validated_data, end_timestamp, get_state):
+        """
+        Add a progress update for a session, and return the session's progress
+        after the update, or None if the session's updates cannot be held in memory,
+        in which case the update should be saved directly.
+        get_state is called with session_id and user if the session has no pending updates,
+        and should return the content_id and context of the session and its current progress,
+        or None if its updates should not be held in memory.
+        """
+        self.start()
+        progress = self._add_to_pending(session_id, user, validated_data, end_timestamp)
+        if progress is None:
+            state = get_state(session_id, user)
+            if state is None:
+                return None
+            progress = self._add_to_pending(
+                session_id, user, validated_data, end_timestamp, state
+            )
+        if progress is not None and len(self.pending) >= self.max_sessions:
+            self.flush()
+        return progress
+
+    def _add_to_pending(
+        self, session_id, user, validated_data, end_timestamp, state=None
+    ):
+        with self.lock:
+            pending_session = self.pending.get(session_id)
+            if pending_session is None:
+                if state is None:
+                    return None
+                content_id, context, progress = state
+                pending_session = PendingSession(
+                    session_id, user, content_id, context, progress
+                )
+                self.pending[session_id] = pending_session
+            elif pending_session.user != user:
+                return None
+            pending_session.add(validated_data, end_timestamp)
+            return pending_session.progress
+
+    def _take_pending(self, session_id=None):
+        with self.lock:
+            if session_id is None:
+                pending_sessions = list(self.pending.values())
+                self.pending.clear()
+            else:
+                pending_session = self.pending.pop(session_id, None)
+                pending_sessions = [pending_session] if pending_session else []
+        return pending_sessions
+
+    def _take_pending_for_content(self, user, content_id):
+        with self.lock:
+            pending_sessions = [
+                pending_session
+                for pending_session in self.pending.values()
+                if pending_session.user == user
+                and pending_session.content_id == content_id
+            ]
+            for pending_session in pending_sessions:
+                del self.pending[pending_session.session_id]
+        return pending_sessions
+
+    def _requeue(self, pending_sessions):
+        # Put back updates that could not be saved, ahead of any newer updates
+        with self.lock:
+            for pending_session in pending_sessions:
+                newer = self.pending.pop(pending_session.session_id, None)
+                if newer is not None:
+                    pending_session.merge(newer)
+                self.pending[pending_session.session_id] = pending_session
+
+    def _requeue_failed(self, failed_sessions):
+        retried_sessions = []
+        for pending_session in failed_sessions:
+            pending_session.failed_attempts += 1
+            if pending_session.failed_attempts < MAX_APPLY_ATTEMPTS:
+                retried_sessions.append(pending_session)
+            else:
+                logger.error(
+                    "Dropping progress updates for session {} after {} failed attempts".format(
+                        pending_session.session_id, pending_session.failed_attempts
+                    )
+                )
+        self._requeue(retried_sessions)
+
+    def flush(self, session_id=None):
+        """
+        Save pending updates to the database, for all sessions, or only for session_id.
+        """
+        with self.flush_lock:
+            self._save(self._take_pending(session_id))
+
+    def flush_content(self, user, content_id):
+        """
+        Save pending updates to the database for the sessions of user on content_id.
+        """
+        with self.flush_lock:
+            self._save(self._take_pending_for_content(user, content_id))
+
+    def _save(self, pending_sessions):
+        if not pending_sessions:
+            return
+        failed_sessions = []
+        try:
+            with transaction.atomic(), dataset_cache:
+                for pending_session in pending_sessions:
+                    try:
+                        with transaction.atomic():
+                            self.apply_update(pending_session)
+                    except OperationalError:
+                        raise
+                    except Exception as e:
+                        # Retry updates that cannot be applied later, rather than failing the batch
+                        logger.warning(
+                            "Could not save progress for session {}: {}".format(
+                                pending_session.session_id, e
+                            )
+                        )
+                        failed_sessions.append(pending_session)
+        except OperationalError as e:
+            logger.warning("Could not save progress updates: {}".format(e))
+            self._requeue(pending_sessions)
+            return
+        self._requeue_failed(failed_sessions)
+
+    def _flush_from_thread(self):
+        self.flush()
+        connection.close()
+
+
+progress_queue = ProgressWriteBehindQueue()
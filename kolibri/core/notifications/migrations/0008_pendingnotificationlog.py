@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:11
+import morango.models.fields.uuids
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "notifications",
+            "0007_learnerprogressnotification_notificatio_timesta_8ba8b0_idx",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingNotificationLog",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "log_type",
+                    models.CharField(
+                        choices=[
+                            ("AttemptLog", "AttemptLog"),
+                            ("MasteryLog", "MasteryLog"),
+                            ("SummaryLog", "SummaryLog"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("log_id", morango.models.fields.uuids.UUIDField()),
+            ],
+        ),
+    ]
@@ -130,6 +130,27 @@ class LearnerProgressNotification(models.Model):
         ]
 
 
+class PendingLogType(ChoicesEnum):
+    SummaryLog = "SummaryLog"
+    AttemptLog = "AttemptLog"
+    MasteryLog = "MasteryLog"
+
+
+class PendingNotificationLog(models.Model):
+    """
+    A record of a log that has been saved, for which notifications have not yet been generated.
+    Recorded in the database rather than in memory, so that they persist across restarts, and
+    can be processed in batches by whichever process claims them.
+    """
+
+    id = models.AutoField(primary_key=True)
+    log_type = models.CharField(max_length=20, choices=PendingLogType.choices())
+    log_id = UUIDField()
+
+    class Meta:
+        app_label = "notifications"
+
+
 class NotificationsLog(models.Model):
     id = (
         models.AutoField(
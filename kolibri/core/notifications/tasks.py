@@ -4,14 +4,104 @@ import time
 
 from django.db import connection
 from django.db import connections
+from django.db import router
 from django.db import transaction
+from django.db.utils import DatabaseError
 from django.db.utils import OperationalError
 
+from kolibri.core.notifications.api import batch_process_attemptlogs
+from kolibri.core.notifications.api import batch_process_masterylogs_for_quizzes
+from kolibri.core.notifications.api import batch_process_summarylogs
+from kolibri.core.notifications.api import create_summarylog
+from kolibri.core.notifications.api import parse_attemptslog
+from kolibri.core.notifications.api import parse_summarylog
+from kolibri.core.notifications.api import quiz_answered_notification
+from kolibri.core.notifications.api import quiz_completed_notification
+from kolibri.core.notifications.api import quiz_started_notification
+from kolibri.core.notifications.models import PendingLogType
+from kolibri.core.notifications.models import PendingNotificationLog
 from kolibri.core.sqlite.utils import repair_sqlite_db
 from kolibri.deployment.default.sqlite_db_names import NOTIFICATIONS
 
 logging = logger.getLogger(__name__)
 
+# The maximum number of pending logs to generate notifications for in one transaction
+PENDING_LOG_BATCH_SIZE = 500
+
+# Map from the notification functions called with a log when it is saved,
+# to the type of log that they generate notifications for. Calls to these functions
+# are recorded as pending logs, and processed in batches with the batch_process functions.
+pending_log_types = {
+    create_summarylog: PendingLogType.SummaryLog,
+    parse_summarylog: PendingLogType.SummaryLog,
+    parse_attemptslog: PendingLogType.AttemptLog,
+    quiz_answered_notification: PendingLogType.AttemptLog,
+    quiz_started_notification: PendingLogType.MasteryLog,
+    quiz_completed_notification: PendingLogType.MasteryLog,
+}
+
+
+def _get_batch_process_calls(log_ids):
+    return (
+        (batch_process_summarylogs, (log_ids[PendingLogType.SummaryLog],)),
+        # Both of these filter the attemptlogs by whether they are from a coach assigned quiz
+        (batch_process_attemptlogs, (log_ids[PendingLogType.AttemptLog],)),
+        (
+            batch_process_masterylogs_for_quizzes,
+            (log_ids[PendingLogType.MasteryLog], log_ids[PendingLogType.AttemptLog]),
+        ),
+    )
+
+
+def process_pending_logs(batch_size=PENDING_LOG_BATCH_SIZE):
+    """
+    Generate notifications for a batch of pending logs, and delete them.
+    The pending logs are claimed by the transaction that generates their notifications,
+    so that each is only processed once, even when several processes are processing them.
+    Returns the number of pending logs that were processed.
+    """
+    using = router.db_for_write(PendingNotificationLog)
+    with transaction.atomic(using=using):
+        pending_logs = PendingNotificationLog.objects.using(using).order_by("id")
+        if connections[using].features.has_select_for_update_skip_locked:
+            pending_logs = pending_logs.select_for_update(skip_locked=True)
+        pending_logs = list(
+            pending_logs.values_list("id", "log_type", "log_id")[:batch_size]
+        )
+        if not pending_logs:
+            return 0
+        log_ids = {log_type: set() for log_type, _ in PendingLogType.choices()}
+        for _, log_type, log_id in pending_logs:
+            log_ids[log_type].add(log_id)
+        for fn, args in _get_batch_process_calls(log_ids):
+            try:
+                with transaction.atomic(using=using):
+                    fn(*args)
+            except OperationalError:
+                raise
+            except Exception as e:
+                # Discard these logs, rather than failing on them every time they are processed
+                logging.warning(
+                    "Exception raised during background notification calculation: %s",
+                    e,
+                )
+        PendingNotificationLog.objects.using(using).filter(
+            id__in=[pending_log_id for pending_log_id, _, _ in pending_logs]
+        ).delete()
+    return len(pending_logs)
+
+
+def _record_pending_log(log_type, log_id):
+    # Called once the log has been saved, so errors must not fail the request that saved it
+    try:
+        PendingNotificationLog.objects.create(log_type=log_type, log_id=log_id)
+    except DatabaseError as e:
+        logging.warning(
+            "Could not record log {} for notification calculation: {}".format(log_id, e)
+        )
+        return
+    log_queue.ensure_started()
+
 
 class AsyncNotificationQueue:
     def __init__(self):
@@ -29,12 +119,15 @@ class AsyncNotificationQueue:
         # flag to decide if the async queue must be started
         self.started = False
 
+    def ensure_started(self):
+        if not self.started:
+            AsyncNotificationsThread.start_command()
+
     def append(self, fn):
         """
         Convenience method to append log saving function to the current queue
         """
-        if not self.started:
-            AsyncNotificationsThread.start_command()
+        self.ensure_started()
         self.queue.append(fn)
 
     def toggle_queue(self):
@@ -75,12 +168,26 @@ class AsyncNotificationQueue:
                         )
             connection.close()
 
+    def run_pending_logs(self):
+        """
+        Generate notifications for all the logs recorded as pending, in batches
+        """
+        try:
+            while process_pending_logs() == PENDING_LOG_BATCH_SIZE:
+                pass
+        except OperationalError as e:
+            # The pending logs are left to be processed on the next run
+            logging.warning("Could not process pending notification logs: %s", e)
+            repair_sqlite_db(connections[NOTIFICATIONS])
+        connection.close()
+
     def start(self):
         self.started = True
         while True:
             self.toggle_queue()
             self.run()
             self.clear_running()
+            self.run_pending_logs()
             time.sleep(self.log_saving_interval)
 
 
@@ -92,6 +199,13 @@ def add_to_save_queue(fn):
 
 
 def wrap_to_save_queue(fn, *args):
+    if fn in pending_log_types:
+        # Record the log as pending once it has been committed, rather than holding the call in memory
+        transaction.on_commit(
+            lambda: _record_pending_log(pending_log_types[fn], args[0].id)
+        )
+        return
+
     def wrapper():
         fn(*args)
 
@@ -1,7 +1,17 @@
+import uuid
+
+from django.db.utils import OperationalError
 from django.test import TestCase
 from mock import MagicMock
+from mock import patch
 
+from ..api import parse_attemptslog
+from ..api import parse_summarylog
+from ..models import PendingLogType
+from ..models import PendingNotificationLog
 from ..tasks import AsyncNotificationQueue
+from ..tasks import process_pending_logs
+from ..tasks import wrap_to_save_queue
 
 
 class TaskQueueTest(TestCase):
@@ -56,3 +66,104 @@ class TaskQueueTest(TestCase):
         log_queue = AsyncNotificationQueue()
         log_queue.append(1)
         self.assertEqual(log_queue.queue[0], 1)
+
+
+class PendingNotificationLogTest(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        patcher = patch("kolibri.core.notifications.tasks.log_queue.ensure_started")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _create_pending_logs(self, log_type, count):
+        log_ids = [uuid.uuid4().hex for _ in range(count)]
+        for log_id in log_ids:
+            PendingNotificationLog.objects.create(log_type=log_type, log_id=log_id)
+        return log_ids
+
+    def test_wrap_to_save_queue_records_pending_log(self):
+        summarylog = MagicMock(id=uuid.uuid4().hex)
+        with self.captureOnCommitCallbacks(execute=True):
+            wrap_to_save_queue(parse_summarylog, summarylog)
+        pending_log = PendingNotificationLog.objects.get()
+        self.assertEqual(pending_log.log_type, PendingLogType.SummaryLog)
+        self.assertEqual(pending_log.log_id, summarylog.id)
+
+    def test_wrap_to_save_queue_database_error_not_raised(self):
+        with patch.object(
+            PendingNotificationLog.objects, "create", side_effect=OperationalError
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                wrap_to_save_queue(parse_summarylog, MagicMock(id=uuid.uuid4().hex))
+        self.assertFalse(PendingNotificationLog.objects.exists())
+
+    def test_wrap_to_save_queue_records_nothing_until_commit(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            wrap_to_save_queue(parse_attemptslog, MagicMock(id=uuid.uuid4().hex))
+        self.assertFalse(PendingNotificationLog.objects.exists())
+
+    def test_wrap_to_save_queue_other_function_queued(self):
+        fn = MagicMock()
+        with patch("kolibri.core.notifications.tasks.log_queue.queue", []) as queue:
+            wrap_to_save_queue(fn, 1)
+            self.assertEqual(len(queue), 1)
+        self.assertFalse(PendingNotificationLog.objects.exists())
+
+    @patch("kolibri.core.notifications.tasks.batch_process_masterylogs_for_quizzes")
+    @patch("kolibri.core.notifications.tasks.batch_process_attemptlogs")
+    @patch("kolibri.core.notifications.tasks.batch_process_summarylogs")
+    def test_process_pending_logs(
+        self, summarylogs_mock, attemptlogs_mock, masterylogs_mock
+    ):
+        summarylog_ids = self._create_pending_logs(PendingLogType.SummaryLog, 2)
+        # Duplicate pending logs are processed once
+        summarylog_ids += summarylog_ids[:1]
+        PendingNotificationLog.objects.create(
+            log_type=PendingLogType.SummaryLog, log_id=summarylog_ids[0]
+        )
+        attemptlog_ids = self._create_pending_logs(PendingLogType.AttemptLog, 3)
+        masterylog_ids = self._create_pending_logs(PendingLogType.MasteryLog, 1)
+
+        self.assertEqual(process_pending_logs(), 7)
+
+        summarylogs_mock.assert_called_once_with(set(summarylog_ids))
+        attemptlogs_mock.assert_called_once_with(set(attemptlog_ids))
+        masterylogs_mock.assert_called_once_with(
+            set(masterylog_ids), set(attemptlog_ids)
+        )
+        self.assertFalse(PendingNotificationLog.objects.exists())
+
+    @patch("kolibri.core.notifications.tasks.batch_process_masterylogs_for_quizzes")
+    @patch("kolibri.core.notifications.tasks.batch_process_attemptlogs")
+    @patch("kolibri.core.notifications.tasks.batch_process_summarylogs")
+    def test_process_pending_logs_in_batches(
+        self, summarylogs_mock, attemptlogs_mock, masterylogs_mock
+    ):
+        summarylog_ids = self._create_pending_logs(PendingLogType.SummaryLog, 3)
+
+        self.assertEqual(process_pending_logs(batch_size=2), 2)
+        summarylogs_mock.assert_called_once_with(set(summarylog_ids[:2]))
+        self.assertEqual(process_pending_logs(batch_size=2), 1)
+        self.assertEqual(process_pending_logs(batch_size=2), 0)
+
+    @patch(
+        "kolibri.core.notifications.tasks.batch_process_summarylogs",
+        side_effect=Exception("Just because!"),
+    )
+    def test_process_pending_logs_discards_failed_batch(self, summarylogs_mock):
+        self._create_pending_logs(PendingLogType.SummaryLog, 2)
+        self.assertEqual(process_pending_logs(), 2)
+        self.assertFalse(PendingNotificationLog.objects.exists())
+
+    @patch(
+        "kolibri.core.notifications.tasks.batch_process_summarylogs",
+        side_effect=OperationalError("database is locked"),
+    )
+    def test_process_pending_logs_keeps_batch_on_operational_error(
+        self, summarylogs_mock
+    ):
+        self._create_pending_logs(PendingLogType.SummaryLog, 2)
+        with self.assertRaises(OperationalError):
+            process_pending_logs()
+        self.assertEqual(PendingNotificationLog.objects.count(), 2)
@@ -40,6 +40,7 @@ from kolibri.core.content.models import ContentNode
 from kolibri.core.content.models import LocalFile
 from kolibri.core.content.serializers import PublicChannelSerializer
 from kolibri.core.content.utils.file_availability import checksum_regex
+from kolibri.core.content.utils.file_availability import generate_checksum_bitset
 from kolibri.core.content.utils.file_availability import generate_checksum_integer_mask
 from kolibri.core.device import soud
 from kolibri.core.device.models import SyncQueue
@@ -190,37 +191,42 @@ def get_public_channel_lookup(request, version, identifier):
 @csrf_exempt
 @gzip_page
 def get_public_file_checksums(request, version):
-    """ Endpoint: /public/<version>/file_checksums/ """
-    if version == "v1":
-        if request.content_type == "application/json":
-            data = request.body
-        elif request.content_type == "application/gzip":
-            with gzip.GzipFile(fileobj=io.BytesIO(request.body)) as f:
-                data = f.read()
-        else:
-            return HttpResponseBadRequest("POST body must be either json or gzip")
-        try:
-            checksums = json.loads(data.decode("utf-8"))
-        except ValueError:
-            return HttpResponseBadRequest("POST body must be valid json")
-
-        checksums = [
-            checksum for checksum in checksums if checksum_regex.match(checksum)
-        ]
-        available_checksums = set(
-            LocalFile.objects.filter(available=True)
-            .filter_by_uuids(checksums)
-            .values_list("id", flat=True)
-            .distinct()
-        )
-        return HttpResponse(
-            generate_checksum_integer_mask(checksums, available_checksums),
-            content_type="application/octet-stream",
+    """
+    Endpoint: /public/<version>/file_checksums/
+
+    v1 returns the availability of the POSTed checksums as a decimal encoded integer mask,
+    v2 returns it as a packed bitset, which is smaller, and can be encoded and decoded in
+    linear time. Both are compressed by gzip_page when the client accepts it.
+    """
+    if version not in ("v1", "v2"):
+        return HttpResponseNotFound(
+            json.dumps({"id": error_constants.NOT_FOUND, "metadata": {"view": ""}}),
+            content_type="application/json",
         )
-    return HttpResponseNotFound(
-        json.dumps({"id": error_constants.NOT_FOUND, "metadata": {"view": ""}}),
-        content_type="application/json",
+    if request.content_type == "application/json":
+        data = request.body
+    elif request.content_type == "application/gzip":
+        with gzip.GzipFile(fileobj=io.BytesIO(request.body)) as f:
+            data = f.read()
+    else:
+        return HttpResponseBadRequest("POST body must be either json or gzip")
+    try:
+        checksums = json.loads(data.decode("utf-8"))
+    except ValueError:
+        return HttpResponseBadRequest("POST body must be valid json")
+
+    checksums = [checksum for checksum in checksums if checksum_regex.match(checksum)]
+    available_checksums = set(
+        LocalFile.objects.filter(available=True)
+        .filter_by_uuids(checksums)
+        .values_list("id", flat=True)
+        .distinct()
     )
+    if version == "v1":
+        content = generate_checksum_integer_mask(checksums, available_checksums)
+    else:
+        content = generate_checksum_bitset(checksums, available_checksums)
+    return HttpResponse(content, content_type="application/octet-stream")
 
 
 class QueueDeserializer(serializers.Serializer):
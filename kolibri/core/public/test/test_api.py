@@ -265,6 +265,48 @@ class PublicAPITestCase(APITestCase):
         )
         self.assertEqual(int(response.content), 2)
 
+    def test_public_checksum_lookup_v2_no_checksums(self):
+        response = self.client.post(
+            reverse("kolibri:core:get_public_file_checksums", kwargs={"version": "v2"}),
+            data=[],
+            format="json",
+        )
+        self.assertEqual(response.content, b"")
+
+    def test_public_checksum_lookup_v2_one_available(self):
+        LocalFile.objects.all().update(available=True)
+        ids = LocalFile.objects.all().order_by("id")[:2].values_list("id", flat=True)
+        test = LocalFile.objects.all().order_by("id")[0]
+        test.available = False
+        test.save()
+        response = self.client.post(
+            reverse("kolibri:core:get_public_file_checksums", kwargs={"version": "v2"}),
+            data=ids,
+            format="json",
+        )
+        self.assertEqual(response.content, b"\x02")
+
+    def test_public_checksum_lookup_v2_multiple_bytes(self):
+        LocalFile.objects.all().update(available=True)
+        ids = list(
+            LocalFile.objects.all().order_by("id")[:4].values_list("id", flat=True)
+        )
+        ids = ids + [uuid.uuid4().hex for _ in range(4)] + ids[:1]
+        response = self.client.post(
+            reverse("kolibri:core:get_public_file_checksums", kwargs={"version": "v2"}),
+            data=ids,
+            format="json",
+        )
+        self.assertEqual(response.content, b"\x0f\x01")
+
+    def test_public_checksum_lookup_no_version(self):
+        response = self.client.post(
+            reverse("kolibri:core:get_public_file_checksums", kwargs={"version": "v3"}),
+            data=[],
+            format="json",
+        )
+        self.assertEqual(response.status_code, 404)
+
     def test_public_filter_unlisted(self):
         set_device_settings(allow_peer_unlisted_channel_import=False)
         unlisted_channel_id = uuid.uuid4().hex
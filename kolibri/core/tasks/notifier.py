@@ -0,0 +1,198 @@
+"""
+Notify workers when jobs have been enqueued, canceled or have finished, so that they
+can check the job storage straight away, rather than waiting for their next poll.
+
+Within a process, notifications are delivered by setting a threading Event.
+Notifications are also sent to other processes: when the job storage is a Postgres
+database, using LISTEN/NOTIFY, and when it is a SQLite database file, by sending a
+datagram to a local socket, whose port is written to a file next to the database.
+"""
+import logging
+import os
+import select
+import socket
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+
+NOTIFY_CHANNEL = "kolibri_job_storage"
+
+# Events for each listener in this process, that are set whenever
+# the job storage is changed in a way that a worker should act on.
+_listeners = set()
+_listeners_lock = threading.Lock()
+
+
+def add_listener():
+    """
+    Returns an event that will be set on every job storage change notification.
+    """
+    event = threading.Event()
+    with _listeners_lock:
+        _listeners.add(event)
+    return event
+
+
+def remove_listener(event):
+    with _listeners_lock:
+        _listeners.discard(event)
+
+
+def _set_listeners():
+    with _listeners_lock:
+        for event in _listeners:
+            event.set()
+
+
+def get_notify_port_filepath(engine):
+    """
+    Returns the path of the file that the port of the socket listening for notifications
+    about the SQLite database file of engine is written to, or None if engine is not for one.
+    """
+    if engine.dialect.name != "sqlite":
+        return None
+    database = engine.url.database
+    if not database or database == ":memory:":
+        return None
+    return database + ".notify"
+
+
+def _notify_socket_listener(engine):
+    filepath = get_notify_port_filepath(engine)
+    if filepath is None:
+        return
+    try:
+        with open(filepath) as f:
+            port = int(f.read())
+    except (OSError, ValueError):
+        # No worker is listening for notifications
+        return
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.sendto(b"\0", ("127.0.0.1", port))
+    except OSError as e:
+        logger.debug("Could not notify job storage listeners: {}".format(e))
+    finally:
+        sock.close()
+
+
+def notify_job_storage_changed(engine=None):
+    """
+    Wake up any worker in this process, and if engine is given,
+    any worker listening for notifications in other processes.
+    """
+    _set_listeners()
+    if engine is None:
+        return
+    if engine.dialect.name == "postgresql":
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("NOTIFY {}".format(NOTIFY_CHANNEL)))
+        except SQLAlchemyError as e:
+            logger.debug("Could not notify job storage listeners: {}".format(e))
+    else:
+        _notify_socket_listener(engine)
+
+
+class PostgresListenerThread(threading.Thread):
+    """
+    Listens for notifications sent by notify_job_storage_changed from other processes,
+    and passes them on to the listeners in this process.
+    """
+
+    def __init__(self, engine, timeout=1):
+        super(PostgresListenerThread, self).__init__(name="JOBLISTENER", daemon=True)
+        self.engine = engine
+        self.timeout = timeout
+        self.shutdown_event = threading.Event()
+
+    def run(self):
+        try:
+            connection = self.engine.raw_connection()
+        except SQLAlchemyError as e:
+            logger.warning(
+                "Could not listen for job storage notifications: {}".format(e)
+            )
+            return
+        # Detach the connection from the pool, as we change its isolation level
+        connection.detach()
+        try:
+            dbapi_connection = connection.connection
+            # Notifications are only received outside of a transaction
+            dbapi_connection.autocommit = True
+            cursor = dbapi_connection.cursor()
+            cursor.execute("LISTEN {}".format(NOTIFY_CHANNEL))
+            while not self.shutdown_event.is_set():
+                if select.select([dbapi_connection], [], [], self.timeout)[0]:
+                    dbapi_connection.poll()
+                    if dbapi_connection.notifies:
+                        del dbapi_connection.notifies[:]
+                        _set_listeners()
+        except Exception as e:
+            logger.warning(
+                "Stopped listening for job storage notifications: {}".format(e)
+            )
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.shutdown_event.set()
+
+
+class SocketListenerThread(threading.Thread):
+    """
+    Listens for notifications sent by notify_job_storage_changed from other processes,
+    for a SQLite job storage, and passes them on to the listeners in this process.
+    """
+
+    def __init__(self, engine, timeout=1):
+        super(SocketListenerThread, self).__init__(name="JOBLISTENER", daemon=True)
+        self.filepath = get_notify_port_filepath(engine)
+        self.timeout = timeout
+        self.shutdown_event = threading.Event()
+
+    def run(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.bind(("127.0.0.1", 0))
+            sock.settimeout(self.timeout)
+            port = str(sock.getsockname()[1])
+            with open(self.filepath, "w") as f:
+                f.write(port)
+        except OSError as e:
+            logger.warning(
+                "Could not listen for job storage notifications: {}".format(e)
+            )
+            sock.close()
+            return
+        try:
+            while not self.shutdown_event.is_set():
+                try:
+                    sock.recv(1)
+                except socket.timeout:
+                    continue
+                _set_listeners()
+        except OSError as e:
+            logger.warning(
+                "Stopped listening for job storage notifications: {}".format(e)
+            )
+        finally:
+            sock.close()
+            self._remove_port_file(port)
+
+    def _remove_port_file(self, port):
+        # Only remove the file if another listener has not since replaced it
+        try:
+            with open(self.filepath) as f:
+                if f.read() != port:
+                    return
+            os.remove(self.filepath)
+        except OSError:
+            pass
+
+    def stop(self):
+        self.shutdown_event.set()
@@ -1,4 +1,6 @@
 import logging
+import threading
+import time
 from contextlib import contextmanager
 from datetime import datetime
 from datetime import timedelta
@@ -6,6 +8,7 @@ from datetime import timedelta
 import pytz
 from sqlalchemy import Column
 from sqlalchemy import DateTime
+from sqlalchemy import Float
 from sqlalchemy import func as sql_func
 from sqlalchemy import Index
 from sqlalchemy import Integer
@@ -27,6 +30,7 @@ from kolibri.core.tasks.exceptions import JobRunning
 from kolibri.core.tasks.hooks import StorageHook
 from kolibri.core.tasks.job import Job
 from kolibri.core.tasks.job import State
+from kolibri.core.tasks.notifier import notify_job_storage_changed
 from kolibri.core.tasks.validation import validate_interval
 from kolibri.core.tasks.validation import validate_priority
 from kolibri.core.tasks.validation import validate_repeat
@@ -67,6 +71,12 @@ class ORMJob(Base):
     # The JSON string that represents the job
     saved_job = Column(String)
 
+    # The job's progress. Inflated here so that progress can be updated
+    # without rewriting the saved_job JSON, these take precedence over the
+    # progress values in saved_job.
+    progress = Column(Float, nullable=True)
+    total_progress = Column(Float, nullable=True)
+
     time_created = Column(DateTime(timezone=True), server_default=sql_func.now())
     time_updated = Column(DateTime(timezone=True), onupdate=sql_func.now())
 
@@ -93,9 +103,35 @@ class ORMJob(Base):
 
 NO_VALUE = object()
 
+# Minimum number of seconds between database writes of progress and
+# metadata updates for a job, updates made in between are coalesced.
+UPDATE_FLUSH_INTERVAL = 0.5
+
+# Job states that workers should be notified about, as they may
+# need to start or cancel a job, or have a worker free to start a job.
+NOTIFY_STATES = {
+    State.QUEUED,
+    State.CANCELING,
+    State.CANCELED,
+    State.COMPLETED,
+    State.FAILED,
+}
+
+FINISHED_STATES = {State.CANCELED, State.COMPLETED, State.FAILED}
+
+
+def _progress_value(value):
+    # Progress is stored as a float, but is most often an integer count,
+    # so return it as an int in that case, as it was originally set.
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
 
 class Storage(object):
-    def __init__(self, connection, Base=Base):
+    def __init__(
+        self, connection, Base=Base, update_flush_interval=UPDATE_FLUSH_INTERVAL
+    ):
         self.engine = connection
         if self.engine.name == "sqlite":
             self.set_sqlite_pragmas()
@@ -103,6 +139,12 @@ class Storage(object):
         self.Base.metadata.create_all(self.engine)
         self.sessionmaker = sessionmaker(bind=self.engine)
         self._hooks = list(StorageHook.registered_hooks)
+        self.update_flush_interval = update_flush_interval
+        # Progress and metadata updates for each job, that have yet to be written
+        self._pending_updates = {}
+        self._last_flushed = {}
+        self._flush_timers = {}
+        self._pending_lock = threading.Lock()
 
     @contextmanager
     def session_scope(self):
@@ -171,6 +213,13 @@ class Storage(object):
         can update itself.
         """
         job = Job.from_json(orm_job.saved_job)
+        # Not all queries select the progress columns, and
+        # jobs saved before they existed will not have them set.
+        progress = getattr(orm_job, "progress", None)
+        total_progress = getattr(orm_job, "total_progress", None)
+        if progress is not None and total_progress is not None:
+            job.progress = _progress_value(progress)
+            job.total_progress = _progress_value(total_progress)
 
         job.storage = self
         return job
@@ -332,6 +381,22 @@ class Storage(object):
 
             return job
 
+    def get_seconds_until_next_scheduled_job(self):
+        """
+        Returns the number of seconds until the next queued job that is scheduled
+        to run in the future, or None if there are no such jobs.
+        """
+        naive_utc_now = datetime.utcnow()
+        with self.engine.connect() as conn:
+            scheduled_time = conn.execute(
+                select(sql_func.min(ORMJob.scheduled_time))
+                .where(ORMJob.state == State.QUEUED)
+                .where(ORMJob.scheduled_time > naive_utc_now)
+            ).scalar()
+        if scheduled_time is None:
+            return None
+        return (scheduled_time - naive_utc_now).total_seconds()
+
     def filter_jobs(
         self, queue=None, queues=None, state=None, repeating=None, func=None
     ):
@@ -497,6 +562,8 @@ class Storage(object):
     def update_job_progress(self, job_id, progress, total_progress):
         """
         Update the job given by job_id's progress info.
+        Updates are written at most once every update_flush_interval seconds,
+        and before any other update to the job.
         :type total_progress: int
         :type progress: int
         :type job_id: str
@@ -505,7 +572,60 @@ class Storage(object):
         :param total_progress: The total progress achievable by the job.
         :return: None
         """
-        self._update_job(job_id, progress=progress, total_progress=total_progress)
+        self._coalesce_update(job_id, progress=progress, total_progress=total_progress)
+
+    def _coalesce_update(self, job_id, **kwargs):
+        with self._pending_lock:
+            self._pending_updates.setdefault(job_id, {}).update(kwargs)
+            wait = (
+                self._last_flushed.get(job_id, 0)
+                + self.update_flush_interval
+                - time.time()
+            )
+            if wait > 0:
+                # Make sure that the last update is written even if no more follow
+                if job_id not in self._flush_timers:
+                    timer = threading.Timer(
+                        wait, self.flush_job_updates, args=(job_id,)
+                    )
+                    timer.daemon = True
+                    self._flush_timers[job_id] = timer
+                    timer.start()
+                return
+        self.flush_job_updates(job_id)
+
+    def _pop_pending_updates(self, job_id, finished=False):
+        with self._pending_lock:
+            timer = self._flush_timers.pop(job_id, None)
+            if timer is not None:
+                timer.cancel()
+            if finished:
+                self._last_flushed.pop(job_id, None)
+            else:
+                self._last_flushed[job_id] = time.time()
+            return self._pending_updates.pop(job_id, {})
+
+    def flush_job_updates(self, job_id):
+        """
+        Write any pending progress and metadata updates for the job given by job_id.
+        """
+        kwargs = self._pop_pending_updates(job_id)
+        if not kwargs:
+            return
+        try:
+            if "extra_metadata" in kwargs or self._hooks:
+                self._update_job(job_id, **kwargs)
+            else:
+                # Only the progress columns need updating, so avoid
+                # reading and rewriting the whole saved_job.
+                with self.engine.begin() as conn:
+                    conn.execute(
+                        update(ORMJob).where(ORMJob.id == job_id).values(**kwargs)
+                    )
+        except Exception as e:
+            logger.error(
+                "Error writing updates for job with id {}: {}".format(job_id, e)
+            )
 
     def mark_job_as_failed(self, job_id, exception, traceback):
         """
@@ -532,7 +652,7 @@ class Storage(object):
         self._update_job(job_id, State.COMPLETED, result=result)
 
     def save_job_meta(self, job):
-        self._update_job(job.job_id, extra_metadata=job.extra_metadata)
+        self._coalesce_update(job.job_id, extra_metadata=dict(job.extra_metadata))
 
     def save_job_as_cancellable(self, job_id, cancellable=True):
         self._update_job(job_id, cancellable=cancellable)
@@ -654,6 +774,9 @@ class Storage(object):
             self.schedule(new_scheduled_time, job, **kwargs)
 
     def _update_job(self, job_id, state=None, **kwargs):
+        # Include any pending updates, so that they are written in order
+        pending = self._pop_pending_updates(job_id, finished=state in FINISHED_STATES)
+        kwargs = dict(pending, **kwargs)
         with self.session_scope() as session:
             try:
                 job, orm_job = self._get_job_and_orm_job(job_id, session)
@@ -669,13 +792,14 @@ class Storage(object):
                             )
                         )
                 orm_job.saved_job = job.to_json()
+                orm_job.progress = job.progress
+                orm_job.total_progress = job.total_progress
                 session.add(orm_job)
                 try:
                     session.commit()
                 except Exception as e:
                     logger.error("Got an error running session.commit(): {}".format(e))
-                for hook in self._hooks:
-                    hook.update(job, orm_job, state=state, **kwargs)
+                self._run_update_hooks(job, orm_job, state=state, **kwargs)
                 return job, orm_job
             except JobNotFound:
                 if state:
@@ -691,6 +815,12 @@ class Storage(object):
                         )
                     )
 
+    def _run_update_hooks(self, job, orm_job, state=None, **kwargs):
+        for hook in self._hooks:
+            hook.update(job, orm_job, state=state, **kwargs)
+        if state in NOTIFY_STATES:
+            notify_job_storage_changed(self.engine)
+
     def _get_job_and_orm_job(self, job_id, session):
         orm_job = session.query(ORMJob).filter_by(id=job_id).one_or_none()
         if orm_job is None:
@@ -793,6 +923,8 @@ class Storage(object):
                 retry_interval=retry_interval,
                 scheduled_time=naive_utc_datetime(dt),
                 saved_job=job.to_json(),
+                progress=job.progress,
+                total_progress=job.total_progress,
             )
             session.merge(orm_job)
             try:
@@ -802,7 +934,9 @@ class Storage(object):
 
             self._run_scheduled_hooks(orm_job)
 
-            return job.job_id
+        notify_job_storage_changed(self.engine)
+
+        return job.job_id
 
     def _run_scheduled_hooks(self, orm_job):
         job = self._orm_to_job(orm_job)
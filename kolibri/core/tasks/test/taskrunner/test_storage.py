@@ -12,6 +12,8 @@ from kolibri.core.tasks.decorators import register_task
 from kolibri.core.tasks.exceptions import JobNotRestartable
 from kolibri.core.tasks.job import Job
 from kolibri.core.tasks.job import State
+from kolibri.core.tasks.notifier import add_listener
+from kolibri.core.tasks.notifier import remove_listener
 from kolibri.core.tasks.registry import TaskRegistry
 from kolibri.core.tasks.storage import Storage
 from kolibri.core.tasks.test.base import connection
@@ -226,6 +228,107 @@ class TestBackend:
         # Assert that the last queued job matches the expected job
         assert last_queued_job_id == job3_id
 
+    def test_seconds_until_next_scheduled_job(self, defaultbackend, simplejob):
+        assert defaultbackend.get_seconds_until_next_scheduled_job() is None
+
+        defaultbackend.schedule(
+            local_now() + datetime.timedelta(seconds=30), simplejob, QUEUE
+        )
+
+        seconds = defaultbackend.get_seconds_until_next_scheduled_job()
+        assert 0 < seconds <= 30
+
+    def test_seconds_until_next_scheduled_job_ignores_due_jobs(
+        self, defaultbackend, simplejob
+    ):
+        defaultbackend.enqueue_job(simplejob, QUEUE)
+
+        assert defaultbackend.get_seconds_until_next_scheduled_job() is None
+
+    def test_enqueue_notifies_listeners(self, defaultbackend, simplejob):
+        event = add_listener()
+        try:
+            defaultbackend.enqueue_job(simplejob, QUEUE)
+            assert event.is_set()
+        finally:
+            remove_listener(event)
+
+    def test_cancel_notifies_listeners(self, defaultbackend, simplejob):
+        job_id = defaultbackend.enqueue_job(simplejob, QUEUE)
+        event = add_listener()
+        try:
+            defaultbackend.mark_job_as_canceling(job_id)
+            assert event.is_set()
+        finally:
+            remove_listener(event)
+
+    def test_progress_does_not_notify_listeners(self, defaultbackend, simplejob):
+        job_id = defaultbackend.enqueue_job(simplejob, QUEUE)
+        event = add_listener()
+        try:
+            defaultbackend.update_job_progress(job_id, 1, 10)
+            assert not event.is_set()
+        finally:
+            remove_listener(event)
+
+    def test_update_job_progress(self, defaultbackend, simplejob):
+        job_id = defaultbackend.enqueue_job(simplejob, QUEUE)
+
+        defaultbackend.update_job_progress(job_id, 1, 10)
+
+        job = defaultbackend.get_job(job_id)
+        assert job.progress == 1
+        assert job.total_progress == 10
+
+    def test_update_job_progress_does_not_rewrite_saved_job(
+        self, defaultbackend, simplejob
+    ):
+        job_id = defaultbackend.enqueue_job(simplejob, QUEUE)
+        saved_job = defaultbackend.get_orm_job(job_id).saved_job
+
+        defaultbackend.update_job_progress(job_id, 1, 10)
+
+        assert defaultbackend.get_orm_job(job_id).saved_job == saved_job
+
+    def test_update_job_progress_coalesces_writes(self, defaultbackend, simplejob):
+        job_id = defaultbackend.enqueue_job(simplejob, QUEUE)
+        defaultbackend.update_flush_interval = 60
+
+        for i in range(1, 11):
+            defaultbackend.update_job_progress(job_id, i, 10)
+        # The first update is written straight away, later ones are held back
+        assert defaultbackend.get_job(job_id).progress == 1
+        defaultbackend.flush_job_updates(job_id)
+        assert defaultbackend.get_job(job_id).progress == 10
+
+    def test_update_job_progress_written_after_interval(
+        self, defaultbackend, simplejob
+    ):
+        job_id = defaultbackend.enqueue_job(simplejob, QUEUE)
+        defaultbackend.update_flush_interval = 0.1
+
+        defaultbackend.update_job_progress(job_id, 1, 10)
+        defaultbackend.update_job_progress(job_id, 2, 10)
+        assert defaultbackend.get_job(job_id).progress == 1
+
+        time.sleep(0.5)
+        assert defaultbackend.get_job(job_id).progress == 2
+
+    def test_pending_updates_written_on_state_change(self, defaultbackend, simplejob):
+        job_id = defaultbackend.enqueue_job(simplejob, QUEUE)
+        defaultbackend.update_flush_interval = 60
+
+        defaultbackend.update_job_progress(job_id, 1, 10)
+        defaultbackend.update_job_progress(job_id, 10, 10)
+        simplejob.extra_metadata["done"] = True
+        defaultbackend.save_job_meta(simplejob)
+        defaultbackend.complete_job(job_id)
+
+        job = defaultbackend.get_job(job_id)
+        assert job.state == State.COMPLETED
+        assert job.progress == 10
+        assert job.extra_metadata["done"] is True
+
     def test_get_canceling_jobs(self, defaultbackend):
         # Schedule jobs
         schedule_time = local_now() + datetime.timedelta(hours=1)
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import datetime
+import os
 import time
 
 import pytest
@@ -6,10 +8,16 @@ import pytest
 from kolibri.core.tasks.constants import Priority
 from kolibri.core.tasks.job import Job
 from kolibri.core.tasks.job import State
+from kolibri.core.tasks.notifier import _notify_socket_listener
+from kolibri.core.tasks.notifier import add_listener
+from kolibri.core.tasks.notifier import get_notify_port_filepath
+from kolibri.core.tasks.notifier import remove_listener
 from kolibri.core.tasks.test.base import connection
 from kolibri.core.tasks.test.taskrunner.test_job_running import EventProxy
+from kolibri.core.tasks.worker import JOB_CHECK_FALLBACK_INTERVAL
 from kolibri.core.tasks.worker import Worker
 from kolibri.utils import conf
+from kolibri.utils.time_utils import local_now
 
 QUEUE = "pytest"
 
@@ -182,3 +190,39 @@ class TestWorker:
 
         # Worker must get this job since its a 'high' priority job.
         assert isinstance(job, Job) is True
+
+    def test_enqueued_job_starts_before_fallback_poll(self, worker):
+        # Let the job checker settle into waiting for its fallback poll
+        time.sleep(0.5)
+        start = time.time()
+        job = Job(id, args=(9,))
+        worker.storage.enqueue_job(job, QUEUE)
+
+        while job.state != State.COMPLETED:
+            job = worker.storage.get_job(job.job_id)
+            time.sleep(0.05)
+
+        assert time.time() - start < JOB_CHECK_FALLBACK_INTERVAL
+
+    def test_check_jobs_shortens_wait_for_scheduled_job(self, worker):
+        job = Job(id, args=(9,))
+        worker.storage.schedule(local_now() + datetime.timedelta(seconds=2), job, QUEUE)
+
+        corrected_time = worker.check_jobs()
+
+        assert corrected_time >= JOB_CHECK_FALLBACK_INTERVAL - 2
+
+    def test_notification_from_other_process_wakes_listeners(self, worker):
+        filepath = get_notify_port_filepath(worker.storage.engine)
+        deadline = time.time() + 5
+        while not os.path.exists(filepath):
+            if time.time() > deadline:
+                pytest.fail("Job listener did not start")
+            time.sleep(0.01)
+        event = add_listener()
+        try:
+            # Only send the notification that another process would receive
+            _notify_socket_listener(worker.storage.engine)
+            assert event.wait(2)
+        finally:
+            remove_listener(event)
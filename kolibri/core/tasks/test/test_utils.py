@@ -3,6 +3,7 @@ import time
 
 from mock import patch
 
+from kolibri.core.tasks.utils import fd_safe_max_connections
 from kolibri.core.tasks.utils import InfiniteLoopThread
 
 
@@ -30,3 +31,33 @@ class TestBaseCloseableThread(object):
             t.start()
             time.sleep(1)
         t.shutdown()
+
+    def test_wake_event_ends_wait_early(self):
+        calls = []
+        wake_event = threading.Event()
+        t = InfiniteLoopThread(
+            lambda: calls.append(time.time()),
+            thread_name="test",
+            wait_between_runs=60,
+            wake_event=wake_event,
+        )
+        t.start()
+        time.sleep(0.5)
+        wake_event.set()
+        time.sleep(0.5)
+        t.shutdown()
+        assert len(calls) == 2
+
+
+class TestFdSafeMaxConnections(object):
+    @patch("kolibri.core.tasks.utils._get_max_descriptors_per_task", return_value=1000)
+    def test_allows_max_connections(self, mock_max_descriptors):
+        assert fd_safe_max_connections(4) == 4
+
+    @patch("kolibri.core.tasks.utils._get_max_descriptors_per_task", return_value=12)
+    def test_limits_connections_to_descriptors(self, mock_max_descriptors):
+        assert fd_safe_max_connections(4) == 3
+
+    @patch("kolibri.core.tasks.utils._get_max_descriptors_per_task", return_value=2)
+    def test_allows_one_connection(self, mock_max_descriptors):
+        assert fd_safe_max_connections(4) == 1
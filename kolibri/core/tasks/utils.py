@@ -69,12 +69,15 @@ class InfiniteLoopThread(Thread):
 
     DEFAULT_TIMEOUT_SECONDS = 0.001
 
-    def __init__(self, func, thread_name, wait_between_runs=1, *args, **kwargs):
+    def __init__(
+        self, func, thread_name, wait_between_runs=1, wake_event=None, *args, **kwargs
+    ):
         """
         Run the given func continuously until either shutdown_event is set, or the python interpreter exits.
         :param func: the function to run. This should accept no arguments.
         :param thread_name: the name of the thread to use during logging and debugging
         :param wait_between_runs: how many seconds to wait in between func calls.
+        :param wake_event: an optional event that, when set, ends the wait before the next func call early.
         """
         self.shutdown_event = multiprocessing_compat.Event()
         self.thread_name = thread_name
@@ -90,6 +93,7 @@ class InfiniteLoopThread(Thread):
         )
         self.func = func
         self.wait = wait_between_runs
+        self.wake_event = wake_event
 
     def run(self):
         self.logger.debug(
@@ -129,10 +133,19 @@ class InfiniteLoopThread(Thread):
         wait = self.wait - (corrected_time if corrected_time is not None else 0)
 
         if wait > 0:
-            time.sleep(wait)
+            if self.wake_event is not None:
+                self.wake_event.wait(wait)
+            else:
+                time.sleep(wait)
+        if self.wake_event is not None:
+            # Clear before the next func call, so that any wake up
+            # that happens during it will still be acted on.
+            self.wake_event.clear()
 
     def stop(self):
         self.shutdown_event.set()
+        if self.wake_event is not None:
+            self.wake_event.set()
 
     def shutdown(self):
         self.stop()
@@ -336,22 +349,23 @@ class JobProgressMixin(object):
             return True
 
 
-def fd_safe_executor(fds_per_task=2):
-    """
-    Context manager to give an executor that should be safe for not overloading
-    file descriptors.
-    """
-    # We should be deferring to conf.OPTIONS["Tasks"]["USE_WORKER_MULTIPROCESSING"]
-    # for this value, but unfortunately, the current way that the import logic
-    # is setup relies on shared memory that can only be used with threads.
-    use_multiprocessing = False
-
-    executor = (
-        concurrent.futures.ProcessPoolExecutor
-        if use_multiprocessing
-        else concurrent.futures.ThreadPoolExecutor
+def _get_max_descriptors_per_task():
+    # The number of concurrent tasks that might be downloading files is determined
+    # by the number of regular workers running in the task runner
+    # (although the high priority task queue could also be running a channel database download).
+    server_reserved_fd_count = (
+        FD_PER_THREAD * conf.OPTIONS["Server"]["CHERRYPY_THREAD_POOL"]
     )
+    return (get_fd_limit() - server_reserved_fd_count) / conf.OPTIONS["Tasks"][
+        "REGULAR_PRIORITY_WORKERS"
+    ]
+
 
+def fd_safe_max_workers(fds_per_task=2, use_multiprocessing=False):
+    """
+    Returns the number of workers that an executor can use while
+    still being safe for not overloading file descriptors.
+    """
     max_workers = 10
 
     if not use_multiprocessing:
@@ -361,15 +375,7 @@ def fd_safe_executor(fds_per_task=2):
         # This is a heuristic method, where we know there can be issues if
         # the max number of file descriptors for a process is 256, and we use 10
         # workers, with potentially 4 concurrent tasks downloading files.
-        # The number of concurrent tasks that might be downloading files is determined
-        # by the number of regular workers running in the task runner
-        # (although the high priority task queue could also be running a channel database download).
-        server_reserved_fd_count = (
-            FD_PER_THREAD * conf.OPTIONS["Server"]["CHERRYPY_THREAD_POOL"]
-        )
-        max_descriptors_per_task = (
-            get_fd_limit() - server_reserved_fd_count
-        ) / conf.OPTIONS["Tasks"]["REGULAR_PRIORITY_WORKERS"]
+        max_descriptors_per_task = _get_max_descriptors_per_task()
         # Each task only needs to have a maximum of `fds_per_task` open file descriptors at once.
         # To add tolerance, we divide the number of file descriptors that could be allocated to
         # this task by double this number which should give us leeway in case of unforeseen
@@ -378,4 +384,37 @@ def fd_safe_executor(fds_per_task=2):
             max_workers, min(1, max_descriptors_per_task // (fds_per_task * 2))
         )
 
-    return executor(max_workers=max_workers)
+    return max_workers
+
+
+def fd_safe_max_connections(max_connections, fds_per_connection=2):
+    """
+    Returns the number of connections, up to max_connections, that a single task can use
+    to download a file concurrently while still being safe for not overloading file descriptors.
+    """
+    # As for workers, allow double the file descriptors that each connection needs
+    safe_connections = int(_get_max_descriptors_per_task() // (fds_per_connection * 2))
+    return max(1, min(max_connections, safe_connections))
+
+
+def fd_safe_executor(fds_per_task=2):
+    """
+    Context manager to give an executor that should be safe for not overloading
+    file descriptors.
+    """
+    # We should be deferring to conf.OPTIONS["Tasks"]["USE_WORKER_MULTIPROCESSING"]
+    # for this value, but unfortunately, the current way that the import logic
+    # is setup relies on shared memory that can only be used with threads.
+    use_multiprocessing = False
+
+    executor = (
+        concurrent.futures.ProcessPoolExecutor
+        if use_multiprocessing
+        else concurrent.futures.ThreadPoolExecutor
+    )
+
+    return executor(
+        max_workers=fd_safe_max_workers(
+            fds_per_task=fds_per_task, use_multiprocessing=use_multiprocessing
+        )
+    )
@@ -4,6 +4,12 @@ from concurrent.futures import CancelledError
 from django.db import connection as django_connection
 
 from kolibri.core.tasks.constants import Priority
+from kolibri.core.tasks.notifier import add_listener
+from kolibri.core.tasks.notifier import get_notify_port_filepath
+from kolibri.core.tasks.notifier import notify_job_storage_changed
+from kolibri.core.tasks.notifier import PostgresListenerThread
+from kolibri.core.tasks.notifier import remove_listener
+from kolibri.core.tasks.notifier import SocketListenerThread
 from kolibri.core.tasks.storage import Storage
 from kolibri.core.tasks.utils import db_connection
 from kolibri.core.tasks.utils import InfiniteLoopThread
@@ -11,6 +17,10 @@ from kolibri.utils.multiprocessing_compat import PoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# The worker is notified of enqueued, canceled and finished jobs, so only poll the job
+# storage at this interval as a fallback, for notifications that are not received.
+JOB_CHECK_FALLBACK_INTERVAL = 5
+
 
 def execute_job(
     job_id,
@@ -84,6 +94,7 @@ class Worker(object):
         self.log_queue = log_queue
 
         self.workers = self.start_workers()
+        self.job_listener = self.start_job_listener()
         self.job_checker = self.start_job_checker()
 
     def requeue_stalled_jobs(self):
@@ -122,24 +133,52 @@ class Worker(object):
                 self.storage.mark_job_as_canceled(job.job_id)
         except KeyError:
             pass
+        # A worker is now free, so check for the next job to run
+        notify_job_storage_changed()
 
     def shutdown(self, wait=True):
         logger.info("Asking job schedulers to shut down.")
         self.job_checker.stop()
+        if self.job_listener is not None:
+            self.job_listener.stop()
         # Wait for the job checker to finish
         # before attempting to pause any running jobs
         if wait:
             self.job_checker.join()
+            if self.job_listener is not None:
+                self.job_listener.join()
+        remove_listener(self.job_checker.wake_event)
         self.shutdown_workers(wait=wait)
 
+    def start_job_listener(self):
+        """
+        Starts a thread to receive notifications of job storage changes made by other processes,
+        when the job storage supports it.
+        Returns: the Thread object, or None.
+        """
+        engine = self.storage.engine
+        if engine.dialect.name == "postgresql":
+            t = PostgresListenerThread(engine)
+        elif get_notify_port_filepath(engine) is not None:
+            t = SocketListenerThread(engine)
+        else:
+            return None
+        t.start()
+        return t
+
     def start_job_checker(self):
         """
         Starts up the job checker thread, that starts scheduled jobs when there are workers free,
         and checks for cancellation requests for jobs currently assigned to a worker.
+        The thread runs whenever it is notified of a change to the job storage, and otherwise
+        polls the job storage every JOB_CHECK_FALLBACK_INTERVAL seconds.
         Returns: the Thread object.
         """
         t = InfiniteLoopThread(
-            self.check_jobs, thread_name="JOBCHECKER", wait_between_runs=0.2
+            self.check_jobs,
+            thread_name="JOBCHECKER",
+            wait_between_runs=JOB_CHECK_FALLBACK_INTERVAL,
+            wake_event=add_listener(),
         )
         t.start()
         return t
@@ -148,7 +187,8 @@ class Worker(object):
         """
         Checks for the next job to run and also checks for jobs that should be cancelled.
 
-        Returns: None
+        Returns: the number of seconds to shorten the wait before the next check by,
+        so that jobs scheduled to run before the next poll are started on time.
         """
         job_to_start = self.get_next_job()
         while job_to_start:
@@ -162,6 +202,11 @@ class Worker(object):
             else:
                 self.storage.mark_job_as_canceled(job_id)
 
+        seconds_until_next_job = self.storage.get_seconds_until_next_scheduled_job()
+        if seconds_until_next_job is not None:
+            return max(JOB_CHECK_FALLBACK_INTERVAL - seconds_until_next_job, 0)
+        return None
+
     def get_next_job(self):
         """
         Fetches the next potential QUEUED job.
@@ -8,6 +8,7 @@ from django.test import TestCase
 from redis import Redis
 
 from kolibri.core.device.models import SQLiteLock
+from kolibri.core.utils.cache import InMemoryCache
 from kolibri.core.utils.cache import RedisSettingsHelper
 from kolibri.core.utils.lock import db_lock
 from kolibri.core.utils.lock import retry_on_db_lock
@@ -156,3 +157,45 @@ class RedisSettingsHelperTestCase(TestCase):
         self.client.info.return_value = {"used_memory": 123}
         self.assertEqual(123, self.helper.get_used_memory())
         self.client.info.assert_called_once_with(section="memory")
+
+
+class InMemoryCacheTestCase(SimpleTestCase):
+    def _get_cache(self, name, max_size=100):
+        return InMemoryCache(name, {"OPTIONS": {"MAX_SIZE": max_size}})
+
+    def test_values_are_not_copied(self):
+        cache = self._get_cache("not_copied")
+        value = [b"content"]
+        cache.set("key", value)
+        self.assertIs(cache.get("key"), value)
+
+    def test_shared_between_instances(self):
+        self._get_cache("shared").set("key", b"value")
+        self.assertEqual(self._get_cache("shared").get("key"), b"value")
+
+    def test_add(self):
+        cache = self._get_cache("add")
+        self.assertTrue(cache.add("key", b"value"))
+        self.assertFalse(cache.add("key", b"other"))
+        self.assertEqual(cache.get("key"), b"value")
+
+    def test_size_bounded(self):
+        cache = self._get_cache("bounded", max_size=10)
+        cache.set("a", b"123456")
+        cache.set("b", b"123456")
+        self.assertFalse(cache.has_key("a"))
+        self.assertTrue(cache.has_key("b"))
+
+    def test_zero_timeout(self):
+        cache = self._get_cache("zero_timeout")
+        cache.set("key", b"value", timeout=0)
+        self.assertIsNone(cache.get("key"))
+
+    def test_delete_and_clear(self):
+        cache = self._get_cache("delete")
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        self.assertTrue(cache.delete("a"))
+        self.assertIsNone(cache.get("a"))
+        cache.clear()
+        self.assertIsNone(cache.get("b"))
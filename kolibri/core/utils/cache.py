@@ -1,9 +1,14 @@
 import logging
+import threading
 
 from django.core.cache import caches
 from django.core.cache import InvalidCacheBackendError
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
 from django.utils.functional import SimpleLazyObject
 
+from kolibri.utils.memory_cache import MemoryCache
+
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +23,85 @@ def __get_process_cache():
 process_cache = SimpleLazyObject(__get_process_cache)
 
 
+# Django instantiates a cache backend per thread, so share the underlying
+# storage between instances with the same location, as LocMemCache does.
+_memory_caches = {}
+_memory_caches_lock = threading.Lock()
+
+_missing = object()
+
+
+class InMemoryCache(BaseCache):
+    """
+    An in process cache that, unlike Django's LocMemCache, stores values without
+    pickling them, and is bounded by the total size of its values in bytes (the MAX_SIZE option)
+    as well as by their number. Values must not be mutated once they have been cached.
+    """
+
+    def __init__(self, name, params):
+        super(InMemoryCache, self).__init__(params)
+        max_size = params.get("OPTIONS", {}).get("MAX_SIZE", 0)
+        with _memory_caches_lock:
+            if name not in _memory_caches:
+                _memory_caches[name] = MemoryCache(
+                    max_size, max_entries=self._max_entries
+                )
+            self._cache = _memory_caches[name]
+
+    def _get_timeout(self, timeout):
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        return timeout
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        if key in self._cache:
+            return False
+        return self._set(key, value, timeout)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._cache.get(key, default)
+
+    def _set(self, key, value, timeout):
+        timeout = self._get_timeout(timeout)
+        if timeout is not None and timeout <= 0:
+            self._cache.delete(key)
+            return False
+        return self._cache.set(key, value, timeout=timeout)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._set(key, value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        value = self._cache.get(key, _missing)
+        if value is _missing:
+            return False
+        return self._set(key, value, timeout)
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._cache.delete(key)
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key in self._cache
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
 class RedisSettingsHelper(object):
     """
     Small wrapper for the Redis client to explicitly get/set values from the client
@@ -35,6 +35,19 @@ process_cache = {
     },
 }
 
+# Setup an in process cache for rendered API responses, so that the most frequently
+# requested responses can be returned without being read from and deserialized
+# from the main cache.
+response_cache = {
+    "BACKEND": "kolibri.core.utils.cache.InMemoryCache",
+    "LOCATION": "response_cache",
+    "TIMEOUT": cache_options["CACHE_TIMEOUT"],
+    "OPTIONS": {
+        "MAX_ENTRIES": cache_options["CACHE_MAX_ENTRIES"],
+        "MAX_SIZE": cache_options["RESPONSE_CACHE_SIZE"],
+    },
+}
+
 
 if cache_options["CACHE_BACKEND"] == "redis":
     base_cache = {
@@ -60,6 +73,7 @@ if cache_options["CACHE_BACKEND"] == "redis":
 CACHES = {
     # Default cache
     "default": default_cache,
+    "response_cache": response_cache,
 }
 
 if cache_options["CACHE_BACKEND"] != "redis":
@@ -1,10 +1,6 @@
 from django.db import connections
-from django.db.models import Exists
 from django.db.models import F
-from django.db.models import Max
-from django.db.models import OuterRef
 from django.db.models import Q
-from django.db.models import Subquery
 from django.db.utils import OperationalError
 from django.shortcuts import get_object_or_404
 from le_utils.constants import content_kinds
@@ -20,11 +16,10 @@ from kolibri.core.content.models import ContentNode
 from kolibri.core.exams.api import ExamViewset
 from kolibri.core.lessons.viewsets import LessonViewset
 from kolibri.core.logger import models as logger_models
-from kolibri.core.logger.utils.quiz import annotate_response_summary
+from kolibri.core.logger.utils.status_rollup import get_status_rollups
 from kolibri.core.notifications.models import LearnerProgressNotification
 from kolibri.core.notifications.models import NotificationEventType
 from kolibri.core.query import annotate_array_aggregate
-from kolibri.core.query import SQCount
 from kolibri.core.sqlite.utils import repair_sqlite_db
 from kolibri.deployment.default.sqlite_db_names import NOTIFICATIONS
 
@@ -41,49 +36,6 @@ exam_viewset = ExamViewset()
 lesson_viewset = LessonViewset()
 
 
-def _get_quiz_status(queryset):
-    queryset = queryset.filter(
-        mastery_level__lt=0,
-    ).order_by("-end_timestamp")
-    queryset = queryset.annotate(
-        previous_masterylog=Subquery(
-            queryset.filter(
-                summarylog=OuterRef("summarylog"),
-                end_timestamp__lt=OuterRef("end_timestamp"),
-            ).values_list("id")[:1]
-        ),
-    )
-    queryset = annotate_response_summary(queryset)
-    items = []
-    statuses = queryset.annotate(
-        last_activity=Max("attemptlogs__end_timestamp"),
-        previous_num_correct=SQCount(
-            logger_models.AttemptLog.objects.filter(
-                masterylog=OuterRef("previous_masterylog"), correct=1
-            )
-            .order_by()
-            .values_list("item")
-            .distinct(),
-            field="item",
-        ),
-    ).values(
-        "summarylog__content_id",
-        "complete",
-        "last_activity",
-        "num_correct",
-        "num_answered",
-        "previous_num_correct",
-        learner_id=F("user_id"),
-    )
-    seen = set()
-    for item in statuses:
-        key = "{}-{}".format(item["learner_id"], item["summarylog__content_id"])
-        if key not in seen:
-            items.append(item)
-            seen.add(key)
-    return items
-
-
 def content_status_serializer(lesson_data, learners_data, classroom):  # noqa C901
 
     # First generate a unique set of content node ids from all the lessons
@@ -105,45 +57,15 @@ def content_status_serializer(lesson_data, learners_data, classroom):  # noqa C9
 
     content_ids = set(content_map.values())
 
-    # Get all the values we need from the summary logs to be able to summarize current status on the
-    # relevant content items.
-    content_log_values = (
+    # Get all the values we need from the summary logs, and the rollups of their mastery logs and
+    # attempt logs, to be able to summarize current status on the relevant content items.
+    content_log_values = get_status_rollups(
         logger_models.ContentSummaryLog.objects.filter(
             content_id__in=content_ids,
             user__in=learner_ids,
         )
-        .annotate(
-            attempts_exist=Exists(
-                logger_models.AttemptLog.objects.filter(
-                    masterylog__summarylog=OuterRef("id")
-                )
-            ),
-            tries=SQCount(
-                logger_models.MasteryLog.objects.filter(summarylog=OuterRef("id")),
-                field="id",
-            ),
-        )
-        .values(
-            "user_id",
-            "content_id",
-            "end_timestamp",
-            "time_spent",
-            "progress",
-            "kind",
-            "attempts_exist",
-            "tries",
-        )
-    )
-
-    masterylog_queryset = logger_models.MasteryLog.objects.filter(
-        summarylog__content_id__in=content_ids, user__in=learner_ids
     )
 
-    practice_quiz_data = {
-        "{}-{}".format(s.pop("learner_id"), s.pop("summarylog__content_id")): s
-        for s in _get_quiz_status(masterylog_queryset)
-    }
-
     # In order to make the lookup speedy, generate a unique key for each user/node that we find
     # listed in the needs help notifications that are relevant. We can then just check
     # existence of this key in the set in order to see whether this user has been flagged as needing
@@ -215,30 +137,45 @@ def content_status_serializer(lesson_data, learners_data, classroom):  # noqa C9
             "time_spent": log["time_spent"],
             "tries": log["tries"],
         }
-        key = "{}-{}".format(log["user_id"], log["content_id"])
-        if key in practice_quiz_data:
-            output.update(practice_quiz_data[key])
+        if log["quiz_complete"] is not None:
+            output.update(_map_quiz_status(log))
         return output
 
     return list(map(map_content_logs, content_log_values))
 
 
-def _map_exam_status(item):
+def _map_quiz_status(log):
+    return {
+        "complete": log["quiz_complete"],
+        "last_activity": log["quiz_last_activity"],
+        "num_correct": log["num_correct"],
+        "num_answered": log["num_answered"],
+        "previous_num_correct": log["previous_num_correct"],
+    }
+
+
+def _map_exam_status(log):
+    item = _map_quiz_status(log)
     complete = item.pop("complete")
     item["status"] = COMPLETED if complete else STARTED
-    item["exam_id"] = item.pop("summarylog__content_id")
+    item["exam_id"] = log["content_id"]
+    item["learner_id"] = log["user_id"]
     return item
 
 
 def serialize_coach_assigned_quiz_status(exam_data):
-    queryset = logger_models.MasteryLog.objects.filter(
+    summarylogs = logger_models.ContentSummaryLog.objects.filter(
         # DraftExam models have an integer pk, but also won't have any MasteryLogs associated with them,
         # so we filter them out here to avoid a ValueError if we feed it into the query here.
-        summarylog__content_id__in=[
+        content_id__in=[
             exam["id"] for exam in exam_data if not isinstance(exam["id"], int)
         ],
-    ).order_by()
-    return list(map(_map_exam_status, _get_quiz_status(queryset)))
+    )
+    return [
+        _map_exam_status(log)
+        for log in get_status_rollups(summarylogs)
+        if log["quiz_complete"] is not None
+    ]
 
 
 def serialize_groups(queryset):
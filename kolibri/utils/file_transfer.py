@@ -3,8 +3,10 @@ import logging
 import math
 import os
 import shutil
+import threading
 from abc import ABCMeta
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from io import BufferedIOBase
 from sqlite3 import OperationalError
@@ -37,6 +39,10 @@ except NameError:
 
 RETRY_STATUS_CODE = {502, 503, 504, 521, 522, 523, 524}
 
+# The smallest segment of a file to download over its own connection,
+# when downloading a file over multiple connections.
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +67,10 @@ class TransferFailed(Exception):
     pass
 
 
+class _SegmentDownloadStopped(Exception):
+    pass
+
+
 def retry_import(e):
     """
     When an exception occurs during channel/content import, if
@@ -84,6 +94,19 @@ def retry_import(e):
     return False
 
 
+def create_session(pool_size=requests.adapters.DEFAULT_POOLSIZE):
+    """
+    Create a requests session that keeps up to pool_size connections to each host alive,
+    so that they can be reused by up to pool_size transfers running concurrently in
+    different threads, without new connections being made and then discarded.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def replace(file_path, new_file_path):
     """
     Do a replace type operation.
@@ -592,6 +615,7 @@ class FileDownload(Transfer):
         timeout=Transfer.DEFAULT_TIMEOUT,
         retry_wait=30,
         full_ranges=True,
+        max_connections=1,
     ):
 
         # allow an existing requests.Session instance to be passed in, so it can be reused for speed
@@ -606,6 +630,10 @@ class FileDownload(Transfer):
         # chunks of the file.
         self.full_ranges = full_ranges
 
+        # The maximum number of connections to use to download
+        # different segments of a large file concurrently.
+        self.max_connections = max_connections
+
         self.set_range(start_range, end_range)
 
         self.timeout = timeout
@@ -778,58 +806,153 @@ class FileDownload(Transfer):
             self._set_headers()
         self.started = True
 
+    def _download_chunk_range(
+        self, chunk_indices, start_byte, end_byte, progress_callback
+    ):
+        with self.dest_file_obj.lock_chunks(*chunk_indices):
+            if not any(
+                self.dest_file_obj.chunk_complete(chunk) for chunk in chunk_indices
+            ):
+                # If while waiting for a lock on a chunk, any of the chunks we were trying to
+                # download were already downloaded, then we can skip downloading those chunks.
+                # Easiest to just start over and get the fresh list of chunks to download.
+                response = self.session.get(
+                    self.source,
+                    headers={"Range": "bytes={}-{}".format(start_byte, end_byte)},
+                    stream=True,
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+
+                range_response_supported = response.headers.get(
+                    "content-range", ""
+                ) == "bytes {}-{}/{}".format(start_byte, end_byte, self.total_size)
+
+                data_generator = response.iter_content(self.dest_file_obj.chunk_size)
+                if range_response_supported:
+                    self.dest_file_obj.write_chunks(
+                        chunk_indices,
+                        data_generator,
+                        progress_callback=progress_callback,
+                    )
+                else:
+                    # Lock all chunks except the chunks we already locked, so as to avoid trying
+                    # to acquire the same lock twice, and also so that no one else tries to download
+                    # the same chunks while we are streaming them.
+                    with self.dest_file_obj.lock_chunks(
+                        self.dest_file_obj.all_chunks(*chunk_indices)
+                    ):
+                        self.dest_file_obj.write_all(
+                            data_generator, progress_callback=progress_callback
+                        )
+                return range_response_supported
+        return True
+
     def _run_byte_range_download(self, progress_callback):
         chunk_indices, start_byte, end_byte = self.dest_file_obj.get_next_missing_range(
             start=self.range_start, end=self.range_end, full_range=self.full_ranges
         )
         while chunk_indices is not None:
-            with self.dest_file_obj.lock_chunks(*chunk_indices):
-                if not any(
-                    self.dest_file_obj.chunk_complete(chunk) for chunk in chunk_indices
-                ):
-                    # If while waiting for a lock on a chunk, any of the chunks we were trying to
-                    # download were already downloaded, then we can skip downloading those chunks.
-                    # Easiest to just start over and get the fresh list of chunks to download.
-                    response = self.session.get(
-                        self.source,
-                        headers={"Range": "bytes={}-{}".format(start_byte, end_byte)},
-                        stream=True,
-                        timeout=self.timeout,
-                    )
-                    response.raise_for_status()
+            self._download_chunk_range(
+                chunk_indices, start_byte, end_byte, progress_callback
+            )
+            (
+                chunk_indices,
+                start_byte,
+                end_byte,
+            ) = self.dest_file_obj.get_next_missing_range(
+                start=self.range_start,
+                end=self.range_end,
+                full_range=self.full_ranges,
+            )
 
-                    range_response_supported = response.headers.get(
-                        "content-range", ""
-                    ) == "bytes {}-{}/{}".format(start_byte, end_byte, self.total_size)
+    def _get_missing_segments(self):
+        """
+        Split the missing chunks of the file into contiguous segments of roughly
+        equal size, one for each connection, but no smaller than MIN_SEGMENT_SIZE.
+        """
+        missing_chunks = [
+            chunk_index
+            for chunk_index, _, _ in self.dest_file_obj.missing_chunks_generator(
+                start=self.range_start, end=self.range_end
+            )
+        ]
+        chunk_size = self.dest_file_obj.chunk_size
+        segment_chunks = max(
+            int(math.ceil(float(len(missing_chunks)) / self.max_connections)),
+            MIN_SEGMENT_SIZE // chunk_size,
+        )
+        segments = []
+        for chunk_index in missing_chunks:
+            if (
+                segments
+                and chunk_index == segments[-1][-1] + 1
+                and len(segments[-1]) < segment_chunks
+            ):
+                segments[-1].append(chunk_index)
+            else:
+                segments.append([chunk_index])
+        return [
+            (
+                tuple(segment),
+                segment[0] * chunk_size,
+                min((segment[-1] + 1) * chunk_size, self.total_size) - 1,
+            )
+            for segment in segments
+        ]
 
-                    data_generator = response.iter_content(
-                        self.dest_file_obj.chunk_size
-                    )
-                    if range_response_supported:
-                        self.dest_file_obj.write_chunks(
-                            chunk_indices,
-                            data_generator,
-                            progress_callback=progress_callback,
-                        )
-                    else:
-                        # Lock all chunks except the chunks we already locked, so as to avoid trying
-                        # to acquire the same lock twice, and also so that no one else tries to download
-                        # the same chunks while we are streaming them.
-                        with self.dest_file_obj.lock_chunks(
-                            self.dest_file_obj.all_chunks(*chunk_indices)
-                        ):
-                            self.dest_file_obj.write_all(
-                                data_generator, progress_callback=progress_callback
-                            )
-                (
-                    chunk_indices,
-                    start_byte,
-                    end_byte,
-                ) = self.dest_file_obj.get_next_missing_range(
-                    start=self.range_start,
-                    end=self.range_end,
-                    full_range=self.full_ranges,
+    def _run_parallel_byte_range_download(self, progress_callback):
+        """
+        Download disjoint segments of the file concurrently, over up to max_connections
+        connections. Any chunks still missing afterwards, for example because another
+        download of the same file held their locks, are downloaded sequentially.
+        """
+        segments = self._get_missing_segments()
+        if len(segments) > 1:
+            # Download the first segment on its own, to check that the server
+            # supports range requests, otherwise it sends the whole file.
+            first_segment = segments.pop(0)
+            if self._download_chunk_range(*first_segment, progress_callback):
+                self._download_segments(segments, progress_callback)
+        self._run_byte_range_download(progress_callback)
+
+    def _download_next_segments(self, segments, lock, errors, progress_callback):
+        def segment_progress_callback(data):
+            if errors:
+                # Stop downloading this segment as another has failed
+                raise _SegmentDownloadStopped()
+            progress_callback(data)
+
+        while not errors:
+            with lock:
+                segment = next(segments, None)
+            if segment is None:
+                return
+            try:
+                self._download_chunk_range(*segment, segment_progress_callback)
+            except _SegmentDownloadStopped:
+                return
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                return
+
+    def _download_segments(self, segments, progress_callback):
+        segments = iter(segments)
+        lock = threading.Lock()
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.max_connections) as executor:
+            for _ in range(self.max_connections):
+                executor.submit(
+                    self._download_next_segments,
+                    segments,
+                    lock,
+                    errors,
+                    progress_callback,
                 )
+        if errors:
+            # Raise the first error, so that it can be retried or reported
+            raise errors[0]
 
     def _run_no_byte_range_download(self, progress_callback):
         with self.dest_file_obj.lock_chunks(self.dest_file_obj.all_chunks()):
@@ -864,7 +987,10 @@ class FileDownload(Transfer):
         # by trying to make a range request, and if it fails, we need to fall back to the old
         # behavior of downloading the whole file.
         if self.content_length_header and not self.compressed:
-            self._run_byte_range_download(progress_callback)
+            if self.max_connections > 1:
+                self._run_parallel_byte_range_download(progress_callback)
+            else:
+                self._run_byte_range_download(progress_callback)
         elif self.total_size:
             self._run_no_byte_range_download(progress_callback)
         else:
@@ -1,3 +1,4 @@
+import io
 import os
 import re
 import stat
@@ -8,6 +9,7 @@ from io import BufferedIOBase
 from urllib.parse import parse_qs
 from urllib.parse import urljoin
 from wsgiref.headers import Headers
+from wsgiref.util import FileWrapper
 
 from django.contrib.staticfiles import finders
 from django.core.exceptions import SuspiciousFileOperation
@@ -22,11 +24,23 @@ from whitenoise.responders import StaticFile
 from whitenoise.string_utils import decode_path_info
 
 from kolibri.utils.file_transfer import RemoteFile
+from kolibri.utils.memory_cache import MemoryCache
+from kolibri.utils.memory_cache import sizeof
 from kolibri.utils.urls import validator
 
 
 compressed_file_extensions = ("gz",)
 
+# The maximum estimated memory used by the entries for dynamic files, such as
+# content files, that are cached after they are first requested.
+DYNAMIC_FILES_CACHE_MAX_SIZE = 32 * 1024 * 1024
+
+# An estimate of the memory used by a file entry object, besides its URL, paths and headers.
+FILE_ENTRY_OVERHEAD = 512
+
+# The size of the blocks that files are read in, when they cannot be sent with sendfile.
+FILE_WRAPPER_BLOCK_SIZE = 64 * 1024
+
 
 class NotFoundStaticFile(object):
     """
@@ -120,6 +134,36 @@ class SlicedFile(BufferedIOBase):
         self.fileobj.close()
 
 
+class SendfileWrapper(FileWrapper):
+    """
+    A WSGI file wrapper that lets a server send the file being served with os.sendfile,
+    including the byte range of a SlicedFile, when it is a regular file on disk,
+    rather than reading it into Python in blocks.
+    """
+
+    def __init__(self, filelike, blksize=FILE_WRAPPER_BLOCK_SIZE):
+        super(SendfileWrapper, self).__init__(filelike, blksize)
+
+    def get_sendfile_args(self):
+        """
+        Returns the file, the offset to start sending from, and the number of bytes to send,
+        or None if the number of bytes is not limited, or returns None if the file cannot
+        be sent with os.sendfile.
+        """
+        if not hasattr(os, "sendfile"):
+            return None
+        fileobj = self.filelike
+        count = None
+        if isinstance(fileobj, SlicedFile):
+            count = fileobj.remaining
+            fileobj = fileobj.fileobj
+        # Compressed files that are decompressed as they are read, and remote files,
+        # are not regular files, so must be read in Python.
+        if not isinstance(fileobj, io.BufferedReader):
+            return None
+        return fileobj, fileobj.tell(), count
+
+
 COMPRESSED_FILE_FOR_REGULAR_PATH = ".compressed_file_for_regular_path"
 
 
@@ -307,6 +351,14 @@ def add_headers_function(headers, path, url):
     headers["Accept-Ranges"] = "bytes"
 
 
+def sizeof_file_entry(url, static_file):
+    return (
+        sizeof(url)
+        + sizeof(getattr(static_file, "alternatives", ()))
+        + FILE_ENTRY_OVERHEAD
+    )
+
+
 class DynamicWhiteNoise(WhiteNoise):
     index_file = "index.html"
 
@@ -317,6 +369,7 @@ class DynamicWhiteNoise(WhiteNoise):
         static_prefix=None,
         writable_locations=(0,),
         app_paths=None,
+        dynamic_cache_size=DYNAMIC_FILES_CACHE_MAX_SIZE,
         **kwargs
     ):
         whitenoise_settings = {
@@ -332,6 +385,10 @@ class DynamicWhiteNoise(WhiteNoise):
         kwargs.update(whitenoise_settings)
         super(DynamicWhiteNoise, self).__init__(application, **kwargs)
         self.dynamic_finder = FileFinder(dynamic_locations or [])
+        # Files found in dynamic locations are cached separately from the files
+        # found when the application starts, which are always kept, so that the
+        # cached dynamic files can be evicted when the cache is full.
+        self.dynamic_files = MemoryCache(dynamic_cache_size)
         # Generate a regex to check if a path matches one of our dynamic
         # location prefixes
         self.dynamic_check = (
@@ -371,13 +428,57 @@ class DynamicWhiteNoise(WhiteNoise):
         if static_file is None and (
             self.app_path_check is None or not self.app_path_check.match(path)
         ):
-            static_file = self.find_and_cache_dynamic_file(path, remote_baseurl)
+            static_file = self.dynamic_files.get(path)
+            if static_file is None:
+                static_file = self.find_and_cache_dynamic_file(path, remote_baseurl)
         if static_file is None:
             return self.application(environ, start_response)
         return self.serve(static_file, environ, start_response)
 
+    @staticmethod
+    def serve(static_file, environ, start_response):
+        """
+        Vendored from Whitenoise to use our own file wrapper, which reads files
+        in larger blocks, when the server does not provide one.
+        """
+        response = static_file.get_response(environ["REQUEST_METHOD"], environ)
+        status_line = "{} {}".format(response.status, response.status.phrase)
+        start_response(status_line, list(response.headers))
+        if response.file is not None:
+            file_wrapper = environ.get("wsgi.file_wrapper", SendfileWrapper)
+            return file_wrapper(response.file)
+        else:
+            return []
+
+    def cache_dynamic_file(self, url, static_file):
+        self.dynamic_files.set(
+            url, static_file, size=sizeof_file_entry(url, static_file)
+        )
+
+    def add_dynamic_file_to_cache(self, url, path, stat_cache=None):
+        """
+        Vendored from Whitenoise add_file_to_dictionary to add the file to the
+        dynamic files cache, rather than the files dictionary.
+        """
+        if self.is_compressed_variant(path, stat_cache=stat_cache):
+            return None
+        requested_file = None
+        if self.index_file and url.endswith("/" + self.index_file):
+            index_url = url[: -len(self.index_file)]
+            index_no_slash = index_url.rstrip("/")
+            requested_file = self.redirect(url, index_url)
+            self.cache_dynamic_file(url, requested_file)
+            self.cache_dynamic_file(
+                index_no_slash, self.redirect(index_no_slash, index_url)
+            )
+            url = index_url
+        static_file = self.get_static_file(path, url, stat_cache=stat_cache)
+        self.cache_dynamic_file(url, static_file)
+        return requested_file or static_file
+
     def find_and_cache_dynamic_file(self, url, remote_baseurl):
         path = self.get_dynamic_path(url)
+        static_file = None
         if path:
             file_stat = os.stat(path)
             # Only try to do matches for regular files.
@@ -389,20 +490,24 @@ class DynamicWhiteNoise(WhiteNoise):
                         stat_cache[comp_path] = os.stat(comp_path)
                     except (IOError, OSError):
                         pass
-                self.add_file_to_dictionary(url, path, stat_cache=stat_cache)
+                static_file = self.add_dynamic_file_to_cache(
+                    url, path, stat_cache=stat_cache
+                )
         elif (
             remote_baseurl is not None
             and self.writable_check is not None
             and self.writable_check.match(url)
         ):
-            self.files[url] = self.get_streaming_static_file(url, remote_baseurl)
+            static_file = self.get_streaming_static_file(url, remote_baseurl)
+            self.cache_dynamic_file(url, static_file)
         elif (
             path is None
             and self.static_prefix is not None
             and url.startswith(self.static_prefix)
         ):
-            self.files[url] = NOT_FOUND
-        return self.files.get(url)
+            static_file = NOT_FOUND
+            self.cache_dynamic_file(url, static_file)
+        return static_file
 
     def get_dynamic_path(self, url):
         try:
@@ -0,0 +1,124 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def sizeof(value):
+    """
+    Estimate the memory used by a value, counting the contents of
+    bytes, strings and containers rather than just their object overhead.
+    """
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class MemoryCache(object):
+    """
+    A thread safe, in process, least recently used cache that stores
+    values as is, without serialization.
+
+    The cache is bounded by the total size of its values, and optionally
+    by the number of values it holds. When either bound is exceeded, the least
+    recently used values are evicted, and passed to on_evict if it is set.
+    """
+
+    def __init__(self, max_size, max_entries=None, on_evict=None, sizeof=sizeof):
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self.sizeof = sizeof
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Map of key to a tuple of (value, size, expiry)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._get_entry(key) is not None
+
+    def _get_entry(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] is not None and entry[2] < time.time():
+            self._remove(key)
+            return None
+        return entry
+
+    def _remove(self, key, evicted=False):
+        value, size, _ = self._entries.pop(key)
+        self.size -= size
+        if evicted:
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(key, value)
+
+    def _evict(self):
+        while self._entries and (
+            self.size > self.max_size
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key, evicted=True)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, timeout=None, size=None):
+        """
+        Store value under key, expiring after timeout seconds if set.
+        Returns False if the value is too large to be cached at all.
+        """
+        if size is None:
+            size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_size:
+                return False
+            expiry = time.time() + timeout if timeout is not None else None
+            self._entries[key] = (value, size, expiry)
+            self.size += size
+            self._evict()
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                return True
+        return False
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._entries)
+            for key in keys:
+                self._remove(key, evicted=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size": self.size,
+                "max_size": self.max_size,
+            }
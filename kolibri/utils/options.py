@@ -451,6 +451,15 @@ base_option_spec = {
             "default": "",
             "description": "Eviction policy to use when using Redis for caching, Redis only.",
         },
+        "RESPONSE_CACHE_SIZE": {
+            "type": "bytes",
+            "default": "20MB",
+            "description": """
+                Memory to be used in each server process for caching frequently requested content API responses,
+                in front of the main cache, so that they can be returned without being deserialized. Set to 0 to disable.
+                Value can either be a number suffixed with a unit (e.g. MB, GB, TB) or an integer number of bytes.
+            """,
+        },
         "STREAMED_FILE_CACHE_SIZE": {
             "type": "bytes",
             "default": "500MB",
@@ -532,6 +541,15 @@ base_option_spec = {
                 Increasing this may help situations where requests are instantly refused by the server.
             """,
         },
+        "SENDFILE": {
+            "type": "boolean",
+            "default": True,
+            "description": """
+                Send static and content files from disk with the sendfile system call, where it is available,
+                rather than reading them into the server, so that serving large media files takes up less
+                of the server's thread pool.
+            """,
+        },
         "PROFILE": {
             "type": "boolean",
             "default": False,
@@ -548,6 +566,34 @@ base_option_spec = {
             "default": False,
             "description": "Activate debug logging for Django ORM operations.",
         },
+        "PROGRESS_WRITE_BEHIND": {
+            "type": "boolean",
+            "default": False,
+            "description": """
+                Acknowledge learner progress updates from memory, and save them to the database in batches,
+                rather than saving each one in its own transaction. This reduces contention for the database
+                when many learners are active at once, at the cost of losing up to PROGRESS_WRITE_BEHIND_INTERVAL
+                seconds of progress if the server process ends abruptly.
+            """,
+        },
+        "PROGRESS_WRITE_BEHIND_INTERVAL": {
+            "type": "float",
+            "default": 5.0,
+            "description": "How many seconds to hold learner progress updates in memory before saving them.",
+        },
+        "PROGRESS_WRITE_BEHIND_MAX_SESSIONS": {
+            "type": "integer",
+            "default": 500,
+            "description": """
+                How many content sessions can have progress updates held in memory,
+                before they are saved without waiting for PROGRESS_WRITE_BEHIND_INTERVAL.
+            """,
+        },
+        "PROGRESS_WRITE_BEHIND_FLUSH_ON_SHUTDOWN": {
+            "type": "boolean",
+            "default": True,
+            "description": "Save any learner progress updates held in memory when the server process exits.",
+        },
     },
     "Paths": {
         "CONTENT_DIR": {
@@ -757,6 +803,14 @@ base_option_spec = {
                 The number of workers to spin up for high priority asynchronous tasks.
             """,
         },
+        "FILE_DOWNLOAD_CONNECTIONS": {
+            "type": "integer",
+            "default": 4,
+            "description": """
+                The maximum number of connections to use to download different parts of a single large file concurrently,
+                when importing content from a server that supports range requests.
+            """,
+        },
         "JOB_STORAGE_FILEPATH": {
             "type": "path",
             "default": "job_storage.sqlite3",
@@ -12,6 +12,7 @@ from subprocess import check_output
 
 import ifaddr
 import requests
+from cheroot.wsgi import Gateway_10
 from cheroot.wsgi import Server as BaseServer
 from django.conf import settings
 from django.core.management import call_command
@@ -32,6 +33,7 @@ from .system import become_daemon
 from .system import pid_exists
 from kolibri.utils import conf
 from kolibri.utils.android import on_android
+from kolibri.utils.kolibri_whitenoise import SendfileWrapper
 from kolibri.utils.logger import cleanup_queue_logging
 from kolibri.utils.logger import setup_queue_logging
 
@@ -115,7 +117,69 @@ class RunningException(PortOccupied):
     pass
 
 
+class SendfileGateway(Gateway_10):
+    """
+    A WSGI gateway that provides SendfileWrapper as the wsgi.file_wrapper, and sends
+    the files in responses wrapped with it using sendfile, so that their bytes are not
+    copied through Python by the server's threads.
+    """
+
+    def get_environ(self):
+        env = super(SendfileGateway, self).get_environ()
+        env["wsgi.file_wrapper"] = SendfileWrapper
+        return env
+
+    def respond(self):
+        """
+        Vendored from cheroot to send files with sendfile where possible.
+        """
+        response = self.req.server.wsgi_app(self.env, self.start_response)
+        try:
+            if not (isinstance(response, SendfileWrapper) and self.sendfile(response)):
+                for chunk in filter(None, response):
+                    if not isinstance(chunk, bytes):
+                        raise ValueError("WSGI Applications must yield bytes")
+                    self.write(chunk)
+        finally:
+            # Send headers if not already sent
+            self.req.ensure_headers_sent()
+            if hasattr(response, "close"):
+                response.close()
+
+    def sendfile(self, response):
+        """
+        Send the file wrapped by response with sendfile, returning False if it
+        could not be sent this way, and so should be read and written instead.
+        """
+        sendfile_args = response.get_sendfile_args()
+        sock = self.req.conn.socket
+        # Without a Content-Length the response is sent with chunked encoding,
+        # which needs each chunk to be framed, so cannot be sent directly from the file.
+        if (
+            sendfile_args is None
+            or self.remaining_bytes_out is None
+            or not hasattr(sock, "sendfile")
+        ):
+            return False
+        fileobj, offset, count = sendfile_args
+        if count is None or count > self.remaining_bytes_out:
+            count = self.remaining_bytes_out
+        self.req.ensure_headers_sent()
+        # Make sure the headers have been written to the socket before the file
+        self.req.conn.wfile.flush()
+        if count:
+            sent = sock.sendfile(fileobj, offset, count)
+            self.req.conn.wfile.bytes_written += sent
+            self.remaining_bytes_out -= sent
+        return True
+
+
 class Server(BaseServer):
+    def __init__(self, *args, **kwargs):
+        super(Server, self).__init__(*args, **kwargs)
+        if conf.OPTIONS["Server"]["SENDFILE"]:
+            self.gateway = SendfileGateway
+
     def error_log(self, msg="", level=20, traceback=False):
         if traceback:
             if traceback is True:
@@ -256,6 +320,7 @@ class DefaultScheduledTasksPlugin(SimplePlugin):
         from kolibri.core.analytics.tasks import schedule_ping
         from kolibri.core.deviceadmin.tasks import schedule_vacuum
         from kolibri.core.deviceadmin.tasks import schedule_streamed_cache_cleanup
+        from kolibri.core.logger.tasks import schedule_content_popularity
 
         # schedule the pingback job if not already scheduled
         schedule_ping()
@@ -266,6 +331,9 @@ class DefaultScheduledTasksPlugin(SimplePlugin):
         # schedule the streamed cache cleanup job if not already scheduled
         schedule_streamed_cache_cleanup()
 
+        # schedule the content popularity recount job if not already scheduled
+        schedule_content_popularity()
+
 
 class ServicesPlugin(SimplePlugin):
     def __init__(self, bus):
@@ -273,6 +341,7 @@ class ServicesPlugin(SimplePlugin):
         self.worker = None
 
     def START(self):
+        from kolibri.core.notifications.tasks import log_queue as notifications_queue
         from kolibri.core.tasks.main import initialize_workers
 
         # Initialize the iceqube engine to handle queued tasks
@@ -280,6 +349,9 @@ class ServicesPlugin(SimplePlugin):
         # by getting any log_queue that might be present on the bus
         self.worker = initialize_workers(log_queue=getattr(self.bus, "log_queue", None))
 
+        # Generate any notifications that were still pending when Kolibri last stopped
+        notifications_queue.ensure_started()
+
     def STOP(self):
         if self.worker is not None:
             self.worker.shutdown(wait=True)
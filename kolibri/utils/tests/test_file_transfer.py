@@ -15,6 +15,7 @@ from requests.exceptions import RequestException
 from requests.exceptions import Timeout
 
 from kolibri.utils.file_transfer import ChunkedFile
+from kolibri.utils.file_transfer import create_session
 from kolibri.utils.file_transfer import FileCopy
 from kolibri.utils.file_transfer import FileDownload
 from kolibri.utils.file_transfer import RemoteFile
@@ -253,6 +254,72 @@ class TestTransferDownloadByteRangeSupport(BaseTestTransfer):
         )
         self._assert_request_calls()
 
+    @patch("kolibri.utils.file_transfer.MIN_SEGMENT_SIZE", ChunkedFile.chunk_size * 2)
+    def test_parallel_download_run(self):
+        with FileDownload(
+            self.source,
+            self.dest,
+            self.checksum,
+            session=self.mock_session,
+            full_ranges=self.full_ranges,
+            max_connections=3,
+        ) as fd:
+            fd.run()
+        self._assert_downloaded_content()
+        if self.byte_range_support and self.attempt_byte_range:
+            # Each chunk should have been requested exactly once
+            requested_chunks = []
+            for _, kwargs in self.mock_session.get.call_args_list:
+                start, end = map(
+                    int, kwargs["headers"]["Range"].replace("bytes=", "").split("-")
+                )
+                requested_chunks.extend(
+                    range(
+                        start // ChunkedFile.chunk_size,
+                        end // ChunkedFile.chunk_size + 1,
+                    )
+                )
+            self.assertEqual(sorted(requested_chunks), list(range(self.chunks_count)))
+            self.assertEqual(self.mock_session.get.call_count, 3)
+        else:
+            self.assertEqual(self.mock_session.get.call_count, 1)
+
+    @patch("kolibri.utils.file_transfer.MIN_SEGMENT_SIZE", ChunkedFile.chunk_size * 2)
+    def test_parallel_partial_download_run(self):
+        self.set_test_data(partial=True)
+        with FileDownload(
+            self.source,
+            self.dest,
+            self.checksum,
+            session=self.mock_session,
+            full_ranges=self.full_ranges,
+            max_connections=3,
+        ) as fd:
+            fd.run()
+        self._assert_downloaded_content()
+
+    @patch("kolibri.utils.file_transfer.MIN_SEGMENT_SIZE", ChunkedFile.chunk_size * 2)
+    def test_parallel_download_error_raised(self):
+        if not (self.byte_range_support and self.attempt_byte_range):
+            self.skipTest("Files are only downloaded in parallel with byte ranges")
+
+        def mock_get_request(url, headers=None, **kwargs):
+            if headers and headers["Range"].startswith("bytes=0-"):
+                return self.mock_get_request(url, headers=headers, **kwargs)
+            raise HTTPError("Not Found", response=MagicMock(status_code=404))
+
+        self.mock_session.get.side_effect = mock_get_request
+        with self.assertRaises(HTTPError):
+            with FileDownload(
+                self.source,
+                self.dest,
+                self.checksum,
+                session=self.mock_session,
+                full_ranges=self.full_ranges,
+                max_connections=3,
+            ) as fd:
+                fd.run()
+
     def test_download_run_fully_downloaded_not_finalized(self):
         self.set_test_data(finished=True)
         with FileDownload(
@@ -937,6 +1004,16 @@ class TestTransferCopy(BaseTestTransfer):
         self.assertTrue(os.path.isfile(self.dest))
 
 
+class TestCreateSession(unittest.TestCase):
+    def test_connection_pool_size(self):
+        session = create_session(pool_size=24)
+        for prefix in ("http://", "https://"):
+            adapter = session.get_adapter(prefix + "example.com")
+            self.assertEqual(adapter._pool_maxsize, 24)
+            pool = adapter.poolmanager.connection_from_url(prefix + "example.com")
+            self.assertEqual(pool.pool.maxsize, 24)
+
+
 class TestRetryImport(unittest.TestCase):
     def _retry_import_helper(self, exception_class, *args, **kwargs):
         e = exception_class(*args, **kwargs)
@@ -1,5 +1,6 @@
 import os
 import re
+import shutil
 import tempfile
 from gzip import GzipFile
 from http import HTTPStatus
@@ -15,6 +16,7 @@ from kolibri.utils.kolibri_whitenoise import DynamicWhiteNoise
 from kolibri.utils.kolibri_whitenoise import EndRangeStaticFile
 from kolibri.utils.kolibri_whitenoise import FileFinder
 from kolibri.utils.kolibri_whitenoise import NOT_FOUND
+from kolibri.utils.kolibri_whitenoise import sizeof_file_entry
 from kolibri.utils.kolibri_whitenoise import SlicedFile
 
 
@@ -120,6 +122,45 @@ def test_dynamic_whitenoise_suspicious_file():
     os.removedirs(tempdir12)
 
 
+def test_dynamic_whitenoise_cache_evicts_dynamic_files():
+    tempdir = tempfile.mkdtemp()
+    staticdir = tempfile.mkdtemp()
+    prefix = "/test"
+    filenames = []
+    for i in range(3):
+        filename = "file{}.txt".format(i)
+        with open(os.path.join(tempdir, filename), "w") as f:
+            f.write("test")
+        filenames.append(filename)
+    with open(os.path.join(staticdir, "app.js"), "w") as f:
+        f.write("test")
+    dynamic_whitenoise = DynamicWhiteNoise(
+        MagicMock(),
+        dynamic_locations=[(prefix, tempdir)],
+        dynamic_cache_size=1,
+    )
+    dynamic_whitenoise.add_files(staticdir, prefix="/static/")
+    first_url = prefix + "/" + filenames[0]
+    entry_size = sizeof_file_entry(
+        first_url, dynamic_whitenoise.find_and_cache_dynamic_file(first_url, None)
+    )
+    dynamic_whitenoise.dynamic_files.max_size = entry_size * 2
+    for filename in filenames:
+        url = prefix + "/" + filename
+        if dynamic_whitenoise.dynamic_files.get(url) is None:
+            assert dynamic_whitenoise.find_and_cache_dynamic_file(url, None)
+    assert len(dynamic_whitenoise.dynamic_files) == 2
+    assert prefix + "/" + filenames[0] not in dynamic_whitenoise.dynamic_files
+    assert dynamic_whitenoise.files.get("/static/app.js") is not None
+    stats = dynamic_whitenoise.dynamic_files.stats()
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 1
+    assert dynamic_whitenoise.dynamic_files.get(prefix + "/" + filenames[2])
+    assert dynamic_whitenoise.dynamic_files.stats()["hits"] == 1
+    shutil.rmtree(tempdir)
+    shutil.rmtree(staticdir)
+
+
 @pytest.fixture
 def mock_stat():
     with patch("os.stat") as mock_stat:
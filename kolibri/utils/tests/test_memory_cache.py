@@ -0,0 +1,99 @@
+import mock
+from django.test import SimpleTestCase
+
+from kolibri.utils.memory_cache import MemoryCache
+from kolibri.utils.memory_cache import sizeof
+
+
+class SizeOfTestCase(SimpleTestCase):
+    def test_bytes(self):
+        self.assertEqual(sizeof(b"abcd"), 4)
+
+    def test_nested(self):
+        self.assertEqual(sizeof((200, (("a", "bc"),), b"defg")), 7 + sizeof(200))
+
+
+class MemoryCacheTestCase(SimpleTestCase):
+    def test_get_set(self):
+        cache = MemoryCache(100)
+        self.assertTrue(cache.set("a", b"1234"))
+        self.assertEqual(cache.get("a"), b"1234")
+        self.assertEqual(cache.size, 4)
+        self.assertEqual(cache.hits, 1)
+
+    def test_miss(self):
+        cache = MemoryCache(100)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("a", "default"), "default")
+        self.assertEqual(cache.misses, 2)
+
+    def test_replace_updates_size(self):
+        cache = MemoryCache(100)
+        cache.set("a", b"1234")
+        cache.set("a", b"12")
+        self.assertEqual(cache.size, 2)
+        self.assertEqual(len(cache), 1)
+
+    def test_evicts_least_recently_used_by_size(self):
+        cache = MemoryCache(10)
+        cache.set("a", b"1234")
+        cache.set("b", b"1234")
+        cache.get("a")
+        cache.set("c", b"1234")
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.size, 8)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_evicts_by_entries(self):
+        on_evict = mock.Mock()
+        cache = MemoryCache(100, max_entries=2, on_evict=on_evict)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.set("c", b"3")
+        self.assertNotIn("a", cache)
+        on_evict.assert_called_once_with("a", b"1")
+
+    def test_too_large(self):
+        cache = MemoryCache(2)
+        self.assertFalse(cache.set("a", b"123"))
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.size, 0)
+
+    def test_disabled(self):
+        cache = MemoryCache(0)
+        self.assertFalse(cache.set("a", b"1"))
+
+    def test_explicit_size(self):
+        cache = MemoryCache(10)
+        cache.set("a", object(), size=6)
+        cache.set("b", object(), size=6)
+        self.assertNotIn("a", cache)
+
+    @mock.patch("kolibri.utils.memory_cache.time.time")
+    def test_timeout(self, time_mock):
+        time_mock.return_value = 100
+        cache = MemoryCache(10)
+        cache.set("a", b"1", timeout=10)
+        self.assertEqual(cache.get("a"), b"1")
+        time_mock.return_value = 111
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.size, 0)
+
+    def test_delete(self):
+        cache = MemoryCache(10)
+        cache.set("a", b"1")
+        self.assertTrue(cache.delete("a"))
+        self.assertFalse(cache.delete("a"))
+        self.assertEqual(cache.size, 0)
+
+    def test_clear(self):
+        on_evict = mock.Mock()
+        cache = MemoryCache(10, on_evict=on_evict)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+        self.assertEqual(on_evict.call_count, 2)
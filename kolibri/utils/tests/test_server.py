@@ -2,16 +2,23 @@
 Tests for `kolibri.utils.server` module.
 """
 import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
 from unittest import TestCase
 
 import mock
 import pytest
+import requests
 
 from kolibri.core.tasks.job import Job
 from kolibri.core.tasks.storage import Storage
 from kolibri.core.tasks.test.base import connection
 from kolibri.utils import server
 from kolibri.utils.constants import installation_types
+from kolibri.utils.kolibri_whitenoise import DynamicWhiteNoise
 
 
 class TestServerInstallation(object):
@@ -91,12 +98,14 @@ def job_storage():
 class TestServerServices(object):
     @mock.patch("kolibri.core.deviceadmin.tasks.schedule_vacuum")
     @mock.patch("kolibri.core.analytics.tasks.schedule_ping")
+    @mock.patch("kolibri.core.notifications.tasks.log_queue.ensure_started")
     @mock.patch("kolibri.core.tasks.main.initialize_workers")
     @mock.patch("kolibri.core.discovery.utils.network.broadcast.KolibriBroadcast")
     def test_required_services_initiate_on_start(
         self,
         mock_kolibri_broadcast,
         initialize_workers,
+        notifications_ensure_started,
         schedule_ping,
         schedule_vacuum,
     ):
@@ -107,6 +116,9 @@ class TestServerServices(object):
         # Do we initialize workers when services start?
         initialize_workers.assert_called_once()
 
+        # Do we process notifications left pending from before a restart?
+        notifications_ensure_started.assert_called_once()
+
         mock_kolibri_broadcast.assert_not_called()
 
     def test_services_shutdown_on_stop(self):
@@ -156,24 +168,27 @@ class TestServerDefaultScheduledTasks(object):
             from kolibri.core.analytics.tasks import DEFAULT_PING_JOB_ID
             from kolibri.core.deviceadmin.tasks import SCH_VACUUM_JOB_ID
             from kolibri.core.deviceadmin.tasks import STREAMED_CACHE_CLEANUP_JOB_ID
+            from kolibri.core.logger.tasks import CONTENT_POPULARITY_JOB_ID
 
-            assert len(job_storage) == 5
+            assert len(job_storage) == 6
             assert job_storage.get_job(test1) is not None
             assert job_storage.get_job(test2) is not None
             assert job_storage.get_job(DEFAULT_PING_JOB_ID) is not None
             assert job_storage.get_job(SCH_VACUUM_JOB_ID) is not None
             assert job_storage.get_job(STREAMED_CACHE_CLEANUP_JOB_ID) is not None
+            assert job_storage.get_job(CONTENT_POPULARITY_JOB_ID) is not None
 
             # Restart services
             default_scheduled_tasks_plugin.START()
 
             # Make sure all scheduled jobs persist after restart
-            assert len(job_storage) == 5
+            assert len(job_storage) == 6
             assert job_storage.get_job(test1) is not None
             assert job_storage.get_job(test2) is not None
             assert job_storage.get_job(DEFAULT_PING_JOB_ID) is not None
             assert job_storage.get_job(SCH_VACUUM_JOB_ID) is not None
             assert job_storage.get_job(STREAMED_CACHE_CLEANUP_JOB_ID) is not None
+            assert job_storage.get_job(CONTENT_POPULARITY_JOB_ID) is not None
 
 
 class TestZeroConfPlugin(object):
@@ -291,3 +306,57 @@ class ServerSignalHandlerTestCase(TestCase):
         signal_handler = server.SignalHandler(bus_mock)
         signal_handler.subscribe()
         bus_mock.subscribe.assert_called_with("ENTER", signal_handler.ENTER)
+
+
+class TestSendfileGateway(object):
+    @pytest.fixture
+    def content_server(self):
+        tempdir = tempfile.mkdtemp()
+        with open(os.path.join(tempdir, "video.mp4"), "wb") as f:
+            f.write(bytes(range(256)) * 1024)
+        application = DynamicWhiteNoise(
+            mock.MagicMock(), dynamic_locations=[("/content", tempdir)]
+        )
+        httpserver = server.Server(("127.0.0.1", 0), application)
+        thread = threading.Thread(target=httpserver.safe_start)
+        thread.daemon = True
+        thread.start()
+        deadline = time.time() + 10
+        while not httpserver.ready:
+            if time.time() > deadline:
+                httpserver.stop()
+                pytest.fail("Content server did not start")
+            time.sleep(0.01)
+        yield "http://127.0.0.1:{}/content/video.mp4".format(httpserver.bind_addr[1])
+        httpserver.stop()
+        thread.join()
+        shutil.rmtree(tempdir)
+
+    def test_sendfile_gateway_used(self):
+        assert server.Server(("127.0.0.1", 0), None).gateway is server.SendfileGateway
+
+    def _get(self, url, headers=None):
+        with mock.patch.object(
+            socket.socket,
+            "sendfile",
+            autospec=True,
+            side_effect=socket.socket.sendfile,
+        ) as sendfile_mock:
+            response = requests.get(url, headers=headers)
+        assert sendfile_mock.call_count == 1
+        return response
+
+    def test_full_response(self, content_server):
+        response = self._get(content_server)
+        assert response.status_code == 200
+        assert response.content == bytes(range(256)) * 1024
+
+    def test_range_response(self, content_server):
+        response = self._get(content_server, headers={"Range": "bytes=1000-1999"})
+        assert response.status_code == 206
+        assert response.content == (bytes(range(256)) * 1024)[1000:2000]
+
+    def test_range_response_to_end(self, content_server):
+        response = self._get(content_server, headers={"Range": "bytes=-100"})
+        assert response.status_code == 206
+        assert response.content == (bytes(range(256)) * 1024)[-100:]